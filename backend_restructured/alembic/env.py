@@ -19,7 +19,8 @@ from app.models import (
     user_model, client_model, project_model, financial_model, api_key_model,
     user_preference_model, client_history_model, client_note_model,
     automated_task_model, notification_model, project_milestone_model,
-    report_template_model, scheduled_report_model
+    report_template_model, scheduled_report_model, email_outbox_model,
+    client_ai_analysis_model
 )
 
 # add your model's MetaData object here
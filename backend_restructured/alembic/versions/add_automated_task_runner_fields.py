@@ -0,0 +1,34 @@
+"""Add task runner claim fields and due-task index to automated_tasks
+
+Revision ID: add_automated_task_runner_fields
+Revises: add_is_admin_field
+Create Date: 2024-02-05 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_automated_task_runner_fields'
+down_revision: Union[str, None] = 'add_is_admin_field'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('automated_tasks', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('automated_tasks', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+    op.add_column('automated_tasks', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('automated_tasks', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index('ix_automated_tasks_due', 'automated_tasks', ['is_completed', 'scheduled_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_automated_tasks_due', table_name='automated_tasks')
+    op.drop_column('automated_tasks', 'last_error')
+    op.drop_column('automated_tasks', 'attempts')
+    op.drop_column('automated_tasks', 'claimed_at')
+    op.drop_column('automated_tasks', 'claimed_by')
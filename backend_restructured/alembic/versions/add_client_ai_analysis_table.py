@@ -0,0 +1,42 @@
+"""Add client_ai_analysis table
+
+Revision ID: add_client_ai_analysis_table
+Revises: add_notification_listing_index
+Create Date: 2024-03-04 14:22:51.370428
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_client_ai_analysis_table'
+down_revision: Union[str, None] = 'add_notification_listing_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'client_ai_analysis',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('analysis_type', sa.String(), nullable=False),
+        sa.Column('result', sa.Text(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('prompt_hash', sa.String(length=64), nullable=False),
+        sa.Column('data_version', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('client_id', 'analysis_type', name='uq_client_ai_analysis_client_type')
+    )
+    op.create_index(op.f('ix_client_ai_analysis_id'), 'client_ai_analysis', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_client_ai_analysis_id'), table_name='client_ai_analysis')
+    op.drop_table('client_ai_analysis')
@@ -0,0 +1,43 @@
+"""Add import_jobs table
+
+Revision ID: add_import_jobs_table
+Revises: add_scheduled_report_run_state
+Create Date: 2024-03-22 09:48:12.337915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_import_jobs_table'
+down_revision: Union[str, None] = 'add_scheduled_report_run_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inserted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.Column('error_file', sa.String(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_jobs_user_started', 'import_jobs', ['user_id', 'started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_user_started', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,28 @@
+"""Add listing index to notifications
+
+Revision ID: add_notification_listing_index
+Revises: add_email_outbox_table
+Create Date: 2024-02-26 09:31:14.882036
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_notification_listing_index'
+down_revision: Union[str, None] = 'add_email_outbox_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_user_read_created', table_name='notifications')
@@ -0,0 +1,26 @@
+"""Add an index for notification retention pruning
+
+Revision ID: add_notification_prune_index
+Revises: share_email_outbox_content
+Create Date: 2024-03-19 10:07:53.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_notification_prune_index'
+down_revision: Union[str, None] = 'share_email_outbox_content'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_notifications_read_created', 'notifications', ['is_read', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_read_created', table_name='notifications')
@@ -0,0 +1,26 @@
+"""Add due-report index to scheduled_reports
+
+Revision ID: add_scheduled_report_due_index
+Revises: add_automated_task_runner_fields
+Create Date: 2024-02-12 16:40:03.517920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_scheduled_report_due_index'
+down_revision: Union[str, None] = 'add_automated_task_runner_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_scheduled_reports_due', 'scheduled_reports', ['is_active', 'next_run_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scheduled_reports_due', table_name='scheduled_reports')
@@ -0,0 +1,38 @@
+"""Add run day and failed run count to scheduled_reports
+
+Revision ID: add_scheduled_report_run_state
+Revises: add_notification_prune_index
+Create Date: 2024-03-21 11:35:18.604233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_scheduled_report_run_state'
+down_revision: Union[str, None] = 'add_notification_prune_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+scheduled_reports = sa.table(
+    'scheduled_reports', sa.column('next_run_at', sa.DateTime), sa.column('run_day', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('scheduled_reports') as batch_op:
+        batch_op.add_column(sa.Column('run_day', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('failed_runs', sa.Integer(), nullable=False, server_default='0'))
+
+    # The current slot is the best record of the intended day; slots already
+    # clamped to a short month cannot be told apart from a genuine 28th
+    op.execute(scheduled_reports.update().values(run_day=sa.extract('day', scheduled_reports.c.next_run_at)))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scheduled_reports') as batch_op:
+        batch_op.drop_column('failed_runs')
+        batch_op.drop_column('run_day')
@@ -0,0 +1,56 @@
+"""Store API keys as SHA-256 hashes
+
+Revision ID: hash_api_keys
+Revises: add_client_ai_analysis_table
+Create Date: 2024-03-11 09:48:12.513904
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'hash_api_keys'
+down_revision: Union[str, None] = 'add_client_ai_analysis_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.add_column(sa.Column('key_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('prefix', sa.String(length=8), nullable=True))
+
+    connection = op.get_bind()
+    api_keys = sa.table('api_keys', sa.column('id', sa.Integer), sa.column('key', sa.String),
+                        sa.column('key_hash', sa.String), sa.column('prefix', sa.String))
+    rows = connection.execute(sa.select(api_keys.c.id, api_keys.c.key)).all()
+    if rows:
+        connection.execute(
+            api_keys.update().where(api_keys.c.id == sa.bindparam('row_id')),
+            [
+                {'row_id': row_id, 'key_hash': hashlib.sha256(key.encode()).hexdigest(), 'prefix': key[:8]}
+                for row_id, key in rows
+            ],
+        )
+
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.drop_index('ix_api_keys_key')
+        batch_op.drop_column('key')
+        batch_op.alter_column('key_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('prefix', existing_type=sa.String(length=8), nullable=False)
+        batch_op.create_index(batch_op.f('ix_api_keys_key_hash'), ['key_hash'], unique=True)
+
+
+def downgrade() -> None:
+    # The raw keys cannot be recovered from their hashes, so existing keys are dropped
+    op.execute('DELETE FROM api_keys')
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_api_keys_key_hash'))
+        batch_op.drop_column('prefix')
+        batch_op.drop_column('key_hash')
+        batch_op.add_column(sa.Column('key', sa.String(), nullable=False))
+        batch_op.create_index('ix_api_keys_key', ['key'], unique=True)
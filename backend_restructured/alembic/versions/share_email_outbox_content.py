@@ -0,0 +1,100 @@
+"""Store email outbox content once per message
+
+Revision ID: share_email_outbox_content
+Revises: hash_api_keys
+Create Date: 2024-03-18 14:22:40.118260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'share_email_outbox_content'
+down_revision: Union[str, None] = 'hash_api_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTENT_COLUMNS = ('subject', 'html_content', 'plain_text_content', 'attachments', 'content_key')
+
+email_outbox = sa.table(
+    'email_outbox', sa.column('id', sa.Integer), sa.column('content_id', sa.Integer),
+    sa.column('subject', sa.String), sa.column('html_content', sa.Text), sa.column('plain_text_content', sa.Text),
+    sa.column('attachments', sa.JSON), sa.column('content_key', sa.String), sa.column('created_at', sa.DateTime),
+)
+# A full Table, so inserts report the new primary key
+email_outbox_content = sa.Table(
+    'email_outbox_content', sa.MetaData(), sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('subject', sa.String), sa.Column('html_content', sa.Text), sa.Column('plain_text_content', sa.Text),
+    sa.Column('attachments', sa.JSON), sa.Column('content_key', sa.String), sa.Column('created_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_outbox_content',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('html_content', sa.Text(), nullable=False),
+        sa.Column('plain_text_content', sa.Text(), nullable=True),
+        sa.Column('attachments', sa.JSON(), nullable=True),
+        sa.Column('content_key', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_outbox_content_id'), 'email_outbox_content', ['id'], unique=False)
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.add_column(sa.Column('content_id', sa.Integer(), nullable=True))
+
+    # Messages with equal content keys have identical content, so each key becomes one content row
+    connection = op.get_bind()
+    first_ids = sa.select(sa.func.min(email_outbox.c.id)).group_by(email_outbox.c.content_key)
+    rows = connection.execute(
+        sa.select(*(email_outbox.c[name] for name in CONTENT_COLUMNS), email_outbox.c.created_at)
+        .where(email_outbox.c.id.in_(first_ids))
+    ).mappings().all()
+    for row in rows:
+        content_id = connection.execute(email_outbox_content.insert().values(**row)).inserted_primary_key[0]
+        connection.execute(
+            email_outbox.update()
+            .where(email_outbox.c.content_key == row['content_key'])
+            .values(content_id=content_id)
+        )
+
+    with op.batch_alter_table('email_outbox') as batch_op:
+        for name in CONTENT_COLUMNS:
+            batch_op.drop_column(name)
+        batch_op.alter_column('content_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_email_outbox_content_id', 'email_outbox_content', ['content_id'], ['id']
+        )
+        batch_op.create_index('ix_email_outbox_message_content', ['content_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.add_column(sa.Column('subject', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('html_content', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('plain_text_content', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('attachments', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('content_key', sa.String(length=64), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(email_outbox_content.c.id, *(email_outbox_content.c[name] for name in CONTENT_COLUMNS))
+    ).mappings().all()
+    for row in rows:
+        values = {name: row[name] for name in CONTENT_COLUMNS}
+        connection.execute(email_outbox.update().where(email_outbox.c.content_id == row['id']).values(**values))
+
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.drop_index('ix_email_outbox_message_content')
+        batch_op.drop_constraint('fk_email_outbox_content_id', type_='foreignkey')
+        batch_op.drop_column('content_id')
+        batch_op.alter_column('subject', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('html_content', existing_type=sa.Text(), nullable=False)
+        batch_op.alter_column('content_key', existing_type=sa.String(length=64), nullable=False)
+    op.drop_index(op.f('ix_email_outbox_content_id'), table_name='email_outbox_content')
+    op.drop_table('email_outbox_content')
@@ -11,6 +11,7 @@ from .endpoints import (
     api_key_endpoints,
     automated_task_endpoints,
     backup_endpoints,
+    batch_endpoints,
     client_endpoints,
     client_history_endpoints,
     client_note_endpoints,
@@ -34,6 +35,7 @@ api_router.include_router(ai_endpoints.router, prefix="/ai", tags=["ai"])
 api_router.include_router(api_key_endpoints.router, prefix="/api-keys", tags=["api-keys"])
 api_router.include_router(automated_task_endpoints.router, prefix="/automated-tasks", tags=["automated-tasks"])
 api_router.include_router(backup_endpoints.router, prefix="/backup", tags=["backup"])
+api_router.include_router(batch_endpoints.router, prefix="/batch", tags=["batch"])
 api_router.include_router(user_endpoints.router, prefix="/users", tags=["users"])
 api_router.include_router(user_preference_endpoints.router, prefix="/user-preferences", tags=["user-preferences"])
 api_router.include_router(client_endpoints.router, prefix="/clients", tags=["clients"])
@@ -2,8 +2,8 @@
 Reusable API dependencies for filtering, sorting, and pagination.
 """
 
-from fastapi import Query
-from typing import Optional
+from fastapi import HTTPException, Query, status
+from typing import Iterable, List, Optional
 
 def get_pagination_params(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -22,3 +22,28 @@ def get_sorting_params(
     Returns sorting parameters (sort_by, sort_order).
     """
     return {"sort_by": sort_by, "sort_order": sort_order}
+
+def get_include_params(allowed: Iterable[str]):
+    """
+    Returns a dependency that parses the comma-separated ``include`` parameter.
+
+    The dependency returns the requested relationship names, each at most
+    once, and rejects names not in ``allowed`` with 400.
+    """
+    allowed = list(allowed)
+
+    def include_params(
+        include: Optional[str] = Query(
+            None, description=f"Comma-separated related records to embed ({', '.join(allowed)})"
+        ),
+    ) -> List[str]:
+        names = list(dict.fromkeys(name.strip() for name in (include or "").split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot include {', '.join(unknown)}; allowed: {', '.join(allowed)}"
+            )
+        return names
+
+    return include_params
@@ -10,6 +10,7 @@ from . import (
     api_key_endpoints,
     automated_task_endpoints,
     backup_endpoints,
+    batch_endpoints,
     client_endpoints,
     client_history_endpoints,
     client_note_endpoints,
@@ -31,6 +32,7 @@ __all__ = [
     "api_key_endpoints",
     "automated_task_endpoints",
     "backup_endpoints",
+    "batch_endpoints",
     "client_endpoints",
     "client_history_endpoints",
     "client_note_endpoints",
@@ -2,23 +2,76 @@
 AI-powered API endpoints for Smart CRM SaaS application.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Dict, List, TypeVar
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from ...core.config import settings
 from ...core.database import get_database_session
 from ...core.security import get_current_user
 from ...models.user_model import User
-from ...models.client_model import Client
+from ...models.client_ai_analysis_model import ClientAIAnalysis
 from ...schemas.ai_schemas import (
     ClientAnalysisRequest, 
     ClientAnalysisResponse,
+    ClientBatchAnalysisItem,
+    ClientBatchAnalysisRequest,
     FinancialAnalysisRequest,
     FinancialAnalysisResponse
 )
-from ...services.openai_client import get_openai_client
+from ...services.client_analysis_service import (
+    ClientSnapshot,
+    client_analysis,
+    get_stored_analyses,
+    is_stale,
+    load_client_snapshots
+)
+from ...services.openai_client import AIServiceError, AITimeoutError, get_ai_client
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+
+async def _run_ai(call: Awaitable[T]) -> T:
+    """Await a model call, mapping provider failures to HTTP errors."""
+    try:
+        return await call
+    except AITimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"OpenAI API error: {e}"
+        )
+    except AIServiceError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"OpenAI API error: {e}"
+        )
+
+
+def _check_analysis_type(analysis_type: str):
+    if analysis_type != "summary":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid analysis type"
+        )
+
+
+def _load_snapshot(db: Session, client_id: int) -> ClientSnapshot:
+    snapshot = load_client_snapshots(db, [client_id]).get(client_id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    return snapshot
+
 
 @router.post("/client-analysis", response_model=ClientAnalysisResponse)
 async def analyze_client(
@@ -28,41 +81,150 @@ async def analyze_client(
 ):
     """
     Perform smart analysis on client data using AI.
+
+    The stored result is returned if the client data has not changed since it
+    was generated; otherwise the analysis is regenerated and stored.
     """
-    client = db.query(Client).filter(Client.id == request.client_id).first()
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Client not found"
+    snapshot = _load_snapshot(db, request.client_id)
+    _check_analysis_type(request.analysis_type)
+
+    stored = get_stored_analyses(db, [snapshot.client_id], request.analysis_type).get(snapshot.client_id)
+    if not is_stale(stored, snapshot):
+        return ClientAnalysisResponse(
+            client_id=snapshot.client_id,
+            analysis_type=request.analysis_type,
+            result=stored.result,
+            generated_at=stored.updated_at
+        )
+    result, generated_at = await _run_ai(client_analysis.generate(snapshot, request.analysis_type))
+    return ClientAnalysisResponse(
+        client_id=snapshot.client_id,
+        analysis_type=request.analysis_type,
+        result=result,
+        generated_at=generated_at
+    )
+
+
+@router.get("/client-analysis/{client_id}", response_model=ClientAnalysisResponse)
+async def get_client_analysis(
+    client_id: int,
+    background_tasks: BackgroundTasks,
+    analysis_type: str = Query("summary"),
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the stored analysis of a client.
+
+    A stored result is returned immediately. If the client data changed since
+    it was generated, it is marked stale and regenerated in the background.
+    A client that has never been analyzed is analyzed inline.
+    """
+    snapshot = _load_snapshot(db, client_id)
+    _check_analysis_type(analysis_type)
+
+    stored = get_stored_analyses(db, [client_id], analysis_type).get(client_id)
+    if stored is None:
+        result, generated_at = await _run_ai(client_analysis.generate(snapshot, analysis_type))
+        return ClientAnalysisResponse(
+            client_id=client_id,
+            analysis_type=analysis_type,
+            result=result,
+            generated_at=generated_at
         )
 
-    openai_client = get_openai_client()
-
-    # Example: Generate a summary of the client
-    if request.analysis_type == "summary":
-        prompt = f"Summarize the following client information: Company Name: {client.company_name}, Contact Person: {client.contact_person_name}, Email: {client.email}, Industry: {client.industry}, Notes: {client.general_notes}"
-        try:
-            response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            summary = response.choices[0].message.content.strip()
-            return ClientAnalysisResponse(
-                client_id=client.id,
-                analysis_type="summary",
-                result=summary
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"OpenAI API error: {e}"
-            )
-    else:
+    stale = is_stale(stored, snapshot)
+    if stale:
+        background_tasks.add_task(client_analysis.refresh, snapshot, analysis_type)
+    return ClientAnalysisResponse(
+        client_id=client_id,
+        analysis_type=analysis_type,
+        result=stored.result,
+        generated_at=stored.updated_at,
+        stale=stale
+    )
+
+
+async def _stream_batch_analysis(
+    snapshots: List[ClientSnapshot],
+    stored: Dict[int, ClientAIAnalysis],
+    missing: List[int],
+    analysis_type: str
+) -> AsyncIterator[str]:
+    """Yield one NDJSON line per client, in completion order."""
+    for client_id in missing:
+        yield ClientBatchAnalysisItem(
+            client_id=client_id, analysis_type=analysis_type, error="Client not found"
+        ).model_dump_json() + "\n"
+
+    pending = []
+    for snapshot in snapshots:
+        previous = stored.get(snapshot.client_id)
+        if not is_stale(previous, snapshot):
+            yield ClientBatchAnalysisItem(
+                client_id=snapshot.client_id, analysis_type=analysis_type, result=previous.result, cached=True
+            ).model_dump_json() + "\n"
+        else:
+            pending.append(snapshot)
+
+    # Bound this batch separately so one large book cannot take every model slot
+    semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+
+    async def analyze(snapshot: ClientSnapshot) -> ClientBatchAnalysisItem:
+        async with semaphore:
+            try:
+                result, _ = await client_analysis.generate(snapshot, analysis_type)
+            except AIServiceError as e:
+                return ClientBatchAnalysisItem(client_id=snapshot.client_id, analysis_type=analysis_type, error=str(e))
+            except Exception as e:
+                # E.g. saving the analysis failed; report it on this client's line instead of cutting the stream
+                logger.error(f"Batch {analysis_type} analysis of client {snapshot.client_id} failed: {e}")
+                return ClientBatchAnalysisItem(
+                    client_id=snapshot.client_id, analysis_type=analysis_type, error="Analysis failed"
+                )
+        return ClientBatchAnalysisItem(client_id=snapshot.client_id, analysis_type=analysis_type, result=result)
+
+    tasks = [asyncio.create_task(analyze(snapshot)) for snapshot in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            yield item.model_dump_json() + "\n"
+    finally:
+        # The client disconnected; stop spending on results no one will read
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/client-analysis/batch", response_class=StreamingResponse)
+async def analyze_clients_batch(
+    request: ClientBatchAnalysisRequest,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze many clients in one request, streaming NDJSON results as they complete.
+
+    Each line is a ClientBatchAnalysisItem. Clients whose data has not changed
+    since their stored analysis are answered from it without a model call.
+    """
+    _check_analysis_type(request.analysis_type)
+    client_ids = list(dict.fromkeys(request.client_ids))
+    if len(client_ids) > settings.AI_BATCH_MAX_CLIENTS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid analysis type"
+            detail=f"A batch may contain at most {settings.AI_BATCH_MAX_CLIENTS} clients"
         )
 
+    # Load everything up front; the session is released before streaming starts
+    snapshots = load_client_snapshots(db, client_ids)
+    stored = get_stored_analyses(db, snapshots, request.analysis_type)
+    missing = [client_id for client_id in client_ids if client_id not in snapshots]
+
+    return StreamingResponse(
+        _stream_batch_analysis(list(snapshots.values()), stored, missing, request.analysis_type),
+        media_type="application/x-ndjson"
+    )
+
 
 @router.post("/financial-analysis", response_model=FinancialAnalysisResponse)
 async def analyze_financial_data(
@@ -73,26 +235,14 @@ async def analyze_financial_data(
     """
     Perform smart analysis on financial data using AI.
     """
-    openai_client = get_openai_client()
-
     prompt = f"Analyze the following financial data for the period {request.start_date} to {request.end_date}: {request.data}. Provide a summary of the financial performance, identify key trends, and offer recommendations."
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        analysis_result = response.choices[0].message.content.strip()
-
-        # You would parse the analysis_result to extract summary, trends, and recommendations
-        # For simplicity, we'll just return the raw result for now.
-        return FinancialAnalysisResponse(
-            analysis_period=f"{request.start_date} to {request.end_date}",
-            summary=analysis_result,
-            key_trends=["Trend 1", "Trend 2"],  # Placeholder
-            recommendations=["Recommendation 1", "Recommendation 2"]  # Placeholder
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"OpenAI API error: {e}"
-        )
+    analysis_result = await _run_ai(get_ai_client().complete(prompt))
+
+    # You would parse the analysis_result to extract summary, trends, and recommendations
+    # For simplicity, we'll just return the raw result for now.
+    return FinancialAnalysisResponse(
+        analysis_period=f"{request.start_date} to {request.end_date}",
+        summary=analysis_result,
+        key_trends=["Trend 1", "Trend 2"],  # Placeholder
+        recommendations=["Recommendation 1", "Recommendation 2"]  # Placeholder
+    )
@@ -3,7 +3,6 @@ API endpoints for authentication.
 This module contains login, logout, and token refresh endpoints.
 """
 
-from ...core.limiter import limiter
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -11,6 +10,7 @@ from sqlalchemy.orm import Session
 from ...auth.auth import (create_access_token, create_refresh_token,
                           verify_password)
 from ...core.database import get_database_session
+from ...core.executors import run_blocking
 from ...core.security import get_current_user
 from ...models.user_model import User
 from ...schemas.token_schemas import Token
@@ -20,14 +20,13 @@ router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-@limiter.limit("5/minute")
 async def login_for_access_token(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_database_session),
 ):
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await run_blocking("crypto", verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
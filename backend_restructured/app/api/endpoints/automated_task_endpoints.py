@@ -13,8 +13,9 @@ from ...core.security import get_current_user
 from ...models.user_model import User
 from ...models.automated_task_model import AutomatedTask
 from ...schemas.automated_task_schemas import (
-    AutomatedTaskCreate, AutomatedTaskUpdate, AutomatedTaskResponse
+    AutomatedTaskCreate, AutomatedTaskUpdate, AutomatedTaskResponse, TaskRunnerMetrics
 )
+from ...services.task_runner import task_runner
 
 router = APIRouter()
 
@@ -61,6 +62,16 @@ async def get_automated_tasks(
     return tasks
 
 
+@router.get("/runner/metrics", response_model=TaskRunnerMetrics)
+async def get_task_runner_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get completion and latency metrics for this process's task runner.
+    """
+    return task_runner.metrics.snapshot()
+
+
 @router.put("/{task_id}", response_model=AutomatedTaskResponse)
 async def update_automated_task(
     task_id: int,
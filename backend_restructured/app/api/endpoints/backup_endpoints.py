@@ -2,32 +2,59 @@
 API endpoints for database backup management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from ...core.executors import run_blocking
 from ...core.security import get_current_user
 from ...models.user_model import User
-from ...services.backup_service import create_database_backup
+from ...services.backup_service import backup_manager
 
 router = APIRouter()
 
 
-@router.post("/backup", status_code=status.HTTP_200_OK)
+def _require_admin(current_user: User):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can trigger backups."
+        )
+
+
+@router.post("/backup", status_code=status.HTTP_202_ACCEPTED)
 async def trigger_database_backup(
+    mode: str = Query("full", pattern="^(full|incremental)$"),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Trigger a manual database backup.
+    Start a database backup in the background and return its job handle.
+    An incremental backup stores only the pages changed since the previous
+    backup. If a backup is already running, its job is returned instead.
     (Requires admin privileges)
     """
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only administrators can trigger backups."
-        )
+    _require_admin(current_user)
     try:
-        backup_path = create_database_backup()
-        return {"message": "Database backup created successfully", "path": backup_path}
-    except Exception as e:
+        job = await run_blocking("io", backup_manager.start, current_user.id, mode)
+    except ValueError as e:
+        # File backups need a SQLite database or BACKUP_DIR
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return job.to_dict()
+
+
+@router.get("/backup/{job_id}")
+async def get_backup_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the progress and outcome of a backup job.
+    (Requires admin privileges)
+    """
+    _require_admin(current_user)
+    job = await run_blocking("io", backup_manager.get, job_id)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create database backup: {e}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Backup job not found"
         )
+    return job.to_dict()
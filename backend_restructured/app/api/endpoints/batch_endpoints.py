@@ -0,0 +1,214 @@
+"""
+API endpoints for batched requests.
+This module dispatches several read-only API calls in one round trip. The calls
+run concurrently in-process against the application's routes, share the
+caller's authentication and read from one database session. Each call is
+rate limited and admitted for its own route class, as if it had been made
+directly.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from ...core.admission import AdmissionControlMiddleware
+from ...core.config import settings
+from ...core.limiter import RateLimitMiddleware
+from ...core.database import create_snapshot_session, get_database_session, shared_session
+from ...core.security import get_current_user, shared_principal
+from ...models.user_model import User
+from ...schemas.batch_schemas import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Scope entries a sub-request inherits from the batch request
+_INHERITED_SCOPE_KEYS = ("asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state",
+                         "starlette.exception_handlers")
+# Headers a sub-request inherits so the rate limiter identifies the batch caller
+_INHERITED_HEADERS = (b"authorization", b"x-api-key", b"x-forwarded-for")
+# Middlewares whose limits apply to each sub-request
+_SUB_REQUEST_MIDDLEWARES = (RateLimitMiddleware, AdmissionControlMiddleware)
+
+
+def _sub_request_app(app):
+    """
+    Return the router wrapped in the app's rate limit and admission middlewares.
+
+    The wrappers are shallow copies of the installed middlewares, so they
+    share their token buckets and in-flight slots; a batch cannot get round
+    the limits of the routes it calls.
+    """
+    installed = []
+    layer = app.middleware_stack
+    while layer is not None and layer is not app.router:
+        if isinstance(layer, _SUB_REQUEST_MIDDLEWARES):
+            installed.append(layer)
+        layer = getattr(layer, "app", None)
+    inner = app.router
+    for middleware in reversed(installed):
+        wrapper = copy.copy(middleware)
+        wrapper.app = inner
+        inner = wrapper
+    return inner
+
+
+def _sub_scope(parent: dict, item: BatchSubRequest) -> dict:
+    url = urlsplit(item.path)
+    parent_headers = dict(parent["headers"])
+    headers = [(b"host", parent_headers.get(b"host", b"localhost")), (b"accept", b"application/json")]
+    headers += [(name, parent_headers[name]) for name in _INHERITED_HEADERS if name in parent_headers]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items()
+        if name.lower() not in ("host", "authorization", "x-api-key", "x-forwarded-for", "content-length")
+    ]
+    scope = {key: parent[key] for key in _INHERITED_SCOPE_KEYS if key in parent}
+    scope.update({
+        "type": "http",
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+    })
+    return scope
+
+
+async def _dispatch(app, scope: dict) -> Tuple[int, dict, bytes]:
+    """Run one sub-request through ``app`` and collect its response."""
+    response_status = 500
+    response_headers = {}
+    chunks: List[bytes] = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client of a sub-request never disconnects
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+            response_headers.update(
+                (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+            )
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response_status, response_headers, b"".join(chunks)
+
+
+async def _run_sub_request(
+    index: int,
+    item: BatchSubRequest,
+    request: Request,
+    app,
+    principal: User,
+    session: Session,
+) -> BatchSubResponse:
+    # Each sub-request runs in its own task, so these only apply to it
+    shared_principal.set(principal)
+    shared_session.set(session)
+    try:
+        response_status, headers, body = await _dispatch(app, _sub_scope(request.scope, item))
+    except StarletteHTTPException as e:
+        # Raised by the router itself for unknown paths, outside any route's handlers
+        response_status, headers = e.status_code, {"content-type": "application/json"}
+        body = json.dumps({"detail": e.detail}).encode()
+    except Exception as e:
+        logger.error(f"Batch sub-request GET {item.path} failed: {e}")
+        response_status, headers, body = 500, {}, json.dumps({"detail": "Internal server error"}).encode()
+    decoded = body.decode("utf-8", errors="replace")
+    if headers.get("content-type", "").startswith("application/json") and body:
+        decoded = json.loads(body)
+    headers.pop("content-length", None)
+    return BatchSubResponse(id=item.id, index=index, status=response_status, headers=headers, body=decoded)
+
+
+def _validate(batch: BatchRequest):
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+    batch_path = f"{settings.API_V1_STR}/batch"
+    for item in batch.requests:
+        path = urlsplit(item.path).path
+        if item.method.upper() != "GET":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Only GET requests can be batched, got {item.method} {item.path}"
+            )
+        if not path.startswith(f"{settings.API_V1_STR}/") or path.rstrip("/") == batch_path:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot batch a request to {item.path}"
+            )
+
+
+async def _run_batch(batch: BatchRequest, request: Request, principal_id: int, bind) -> AsyncIterator[BatchSubResponse]:
+    """Yield sub-responses as they complete."""
+    session = create_snapshot_session(bind)
+    try:
+        principal = session.get(User, principal_id)
+        app = _sub_request_app(request.app)
+        tasks = [
+            asyncio.ensure_future(_run_sub_request(index, item, request, app, principal, session))
+            for index, item in enumerate(batch.requests)
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        session.close()
+
+
+@router.post("/", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    stream: bool = Query(False, description="Stream results as NDJSON lines as they complete"),
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dispatch several GET requests to the API in one call.
+
+    The requests run concurrently as the current user and read from one
+    database session. Each one counts against the rate limit and admission
+    limit of its own route, and a request over a limit gets the 429 or 503
+    it would have got on its own. Results come back in request order, or with
+    ``stream=true`` as NDJSON lines in completion order, each carrying the
+    index of its request.
+    """
+    _validate(batch)
+    results = _run_batch(batch, request, current_user.id, db.get_bind())
+    if stream:
+        async def lines():
+            async for result in results:
+                yield result.model_dump_json() + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    responses: List[Optional[BatchSubResponse]] = [None] * len(batch.requests)
+    async for result in results:
+        responses[result.index] = result
+    return BatchResponse(responses=responses)
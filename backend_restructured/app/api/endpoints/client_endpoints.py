@@ -4,24 +4,55 @@ This module defines all client-related API routes including client management,
 client information retrieval, and client statistics.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
 from datetime import datetime, timedelta
-from ...core.database import get_database_session
+from ...core.config import settings
+from ...core.database import SessionLocal, call_with_new_session, get_database_session
+from ...core.executors import run_blocking
+from ...core.singleflight import single_flight
 from ...core.security import get_current_user
 from ...models.client_model import Client
 from ...models.project_model import Project
 from ...models.financial_model import Payment
 from ...models.user_model import User
 from ...schemas.client_schemas import (
-    ClientCreate, ClientUpdate, ClientResponse, ClientListResponse,
+    ClientCreate, ClientUpdate, ClientResponse, ClientDetailResponse, ClientListResponse, ClientDetailListResponse,
     ClientSummary, ClientSearchFilters, ClientStats, ClientCreateBulk, ClientUpdateBulk, ClientDeleteBulk
 )
+from ...schemas.import_job_schemas import ImportJobResponse
+from ...services.import_service import import_jobs, iter_upload, spool_upload
+from ...utils.bulk_ingest import IngestFormatError, detect_format, iter_records, format_validation_error
 
 router = APIRouter(tags=["clients"])
 
+# Relationships that can be embedded with ``include``, and the strategy that loads each
+CLIENT_INCLUDES = {
+    "assigned_user": joinedload,
+    "projects": selectinload,
+    "invoices": selectinload,
+    "payments": selectinload,
+}
+
+
+def _client_loader_options(include: List[str]) -> list:
+    # The computed project fields of every client response read the projects
+    names = ["projects"] + [name for name in include if name != "projects"]
+    return [CLIENT_INCLUDES[name](getattr(Client, name)) for name in names]
+
+
+def _client_response(client: Client, include: List[str]) -> dict:
+    """Build a client response with the requested related records."""
+    client_dict = ClientResponse.model_validate(client).model_dump()
+    for name in include:
+        client_dict[name] = getattr(client, name)
+    return client_dict
+
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
 async def create_client(
     client_data: ClientCreate,
@@ -148,9 +179,165 @@ async def delete_multiple_clients(
     
     db.commit()
 
-from ..dependencies import get_pagination_params, get_sorting_params
+def _insert_client_batch(db: Session, batch: list, job) -> None:
+    """
+    Validate references for a batch of clients and insert the valid ones.
+    
+    Email uniqueness is checked against the database with one query per batch
+    (earlier batches are already committed) and within the batch itself.
+    """
+    emails = {client_dict["email"] for _, client_dict in batch}
+    taken = {email for (email,) in db.query(Client.email).filter(Client.email.in_(emails))}
+    user_ids = {client_dict["assigned_user_id"] for _, client_dict in batch}
+    known_users = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+    
+    accepted = []
+    for line_number, client_dict in batch:
+        if client_dict["email"] in taken:
+            job.record_error(line_number, f"Client with email {client_dict['email']} already exists", client_dict)
+        elif client_dict["assigned_user_id"] not in known_users:
+            job.record_error(line_number, f"Assigned user {client_dict['assigned_user_id']} not found", client_dict)
+        else:
+            taken.add(client_dict["email"])
+            accepted.append((line_number, client_dict))
+    
+    if accepted:
+        try:
+            db.execute(insert(Client), [client_dict for _, client_dict in accepted])
+            db.commit()
+            job.inserted += len(accepted)
+        except SQLAlchemyError as e:
+            db.rollback()
+            for line_number, client_dict in accepted:
+                job.record_error(line_number, f"Database error: {e.__class__.__name__}", client_dict)
+
+
+async def _run_client_import(job, upload, upload_format: str, user_id: int) -> None:
+    """Parse a spooled client upload and insert it in batches."""
+    db = SessionLocal(bind=job.bind)
+    try:
+        batch = []
+        async for line_number, record, error in iter_records(iter_upload(upload), upload_format):
+            job.processed += 1
+            if error:
+                job.record_error(line_number, error, record)
+                continue
+            if record.get("assigned_user_id") is None:
+                record["assigned_user_id"] = user_id
+            try:
+                client_data = ClientCreate.model_validate(record)
+            except ValidationError as e:
+                job.record_error(line_number, format_validation_error(e), record)
+                continue
+            client_dict = client_data.model_dump()
+            # Map 'notes' to 'general_notes' if present
+            client_dict['general_notes'] = client_dict.pop('notes')
+            batch.append((line_number, client_dict))
+            if len(batch) >= settings.BULK_IMPORT_CHUNK_SIZE:
+                await run_blocking("db", _insert_client_batch, db, batch, job)
+                await run_blocking("db", import_jobs.save, job, db)
+                batch = []
+        if batch:
+            await run_blocking("db", _insert_client_batch, db, batch, job)
+    finally:
+        await run_blocking("db", db.close)
+        await run_blocking("io", upload.close)
+
+
+@router.post("/import", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_clients(
+    request: Request,
+    format: Optional[str] = Query(None, description="Upload format ('ndjson' or 'csv'); defaults to the Content-Type"),
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import clients from an NDJSON or CSV upload as a background job.
+    
+    The upload is copied to a temporary file and the job is returned with
+    status 202 as soon as the body has been received. The job then parses the
+    file incrementally and inserts it in batches of ``BULK_IMPORT_CHUNK_SIZE``
+    on its own database session. Progress can be polled through
+    ``GET /clients/import/jobs/{job_id}``, and rejected rows are available
+    from ``GET /clients/import/jobs/{job_id}/errors``. Rows without
+    ``assigned_user_id`` are assigned to the current user.
+    """
+    try:
+        upload_format = detect_format(request.headers.get("content-type"), format)
+    except IngestFormatError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    
+    upload = await spool_upload(request.stream())
+    try:
+        job = await run_blocking("db", import_jobs.create, db, "client", current_user.id)
+    except BaseException:
+        await run_blocking("io", upload.close)
+        raise
+    import_jobs.start(job, lambda job: _run_client_import(job, upload, upload_format, current_user.id))
+    return job.to_dict()
+
+
+@router.get("/import/jobs", response_model=List[ImportJobResponse])
+async def list_client_import_jobs(
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List recent client import jobs started by the current user.
+    """
+    jobs = await run_blocking("db", import_jobs.list_for_user, db, current_user.id)
+    return [job.to_dict() for job in jobs if job.entity == "client"]
+
 
-@router.get("/", response_model=ClientListResponse)
+async def _get_import_job(db: Session, job_id: str, current_user: User):
+    job = await run_blocking("db", import_jobs.get, db, job_id)
+    if not job or job.user_id != current_user.id or job.entity != "client":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
+
+
+@router.get("/import/jobs/{job_id}", response_model=ImportJobResponse)
+@router.get("/import/{job_id}", response_model=ImportJobResponse, include_in_schema=False)
+async def get_client_import_job(
+    job_id: str,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get progress counters for a client import job.
+    """
+    return (await _get_import_job(db, job_id, current_user)).to_dict()
+
+
+@router.get("/import/jobs/{job_id}/errors")
+@router.get("/import/{job_id}/errors", include_in_schema=False)
+async def download_client_import_errors(
+    job_id: str,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the rejected rows of a client import job as NDJSON.
+    """
+    job = await _get_import_job(db, job_id, current_user)
+    if job.error_file is None or not job.error_file.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job has no errors"
+        )
+    return FileResponse(
+        job.error_file,
+        media_type="application/x-ndjson",
+        filename=f"client_import_{job.id}_errors.ndjson"
+    )
+
+
+from ..dependencies import get_include_params, get_pagination_params, get_sorting_params
+
+@router.get("/", response_model=ClientDetailListResponse)
 async def get_clients(
     pagination: dict = Depends(get_pagination_params),
     sorting: dict = Depends(get_sorting_params),
@@ -159,10 +346,13 @@ async def get_clients(
     platform: Optional[str] = Query(None, description="Filter by platform preference"),
     assigned_user_id: Optional[int] = Query(None, description="Filter by assigned user"),
     fields: Optional[str] = Query(None, description="Comma-separated list of fields to include in the response (e.g., 'id,company_name,email')"),
+    include: List[str] = Depends(get_include_params(CLIENT_INCLUDES)),
     db: Session = Depends(get_database_session)
 ):
     """
     Retrieve a paginated list of clients with optional filtering and sorting.
+    Related records named in ``include`` are embedded, loaded for the whole
+    page at once.
     """
     # Build query with filters
     query = db.query(Client)
@@ -202,7 +392,7 @@ async def get_clients(
     skip = pagination["skip"]
     limit = pagination["limit"]
     total = query.count()
-    clients = query.offset(skip).limit(limit).all()
+    clients = query.options(*_client_loader_options(include)).offset(skip).limit(limit).all()
 
     # Apply field selection
     if fields:
@@ -214,7 +404,7 @@ async def get_clients(
             processed_clients.append(filtered_client)
         clients = processed_clients
     else:
-        clients = [ClientResponse.from_orm(client) for client in clients]
+        clients = [_client_response(client, include) for client in clients]
     
     # Calculate pagination values directly
     page = (skip // limit) + 1 if limit > 0 else 1
@@ -228,9 +418,10 @@ async def get_clients(
         "per_page": limit
     }
 
-@router.get("/{client_id}", response_model=ClientResponse)
+@router.get("/{client_id}", response_model=ClientDetailResponse)
 async def get_client(
     client_id: int,
+    include: List[str] = Depends(get_include_params(CLIENT_INCLUDES)),
     db: Session = Depends(get_database_session)
 ):
     """
@@ -238,15 +429,19 @@ async def get_client(
     
     Args:
         client_id (int): Client ID to retrieve
+        include (List[str]): Related records to embed
         db (Session): Database session
         
     Returns:
-        ClientResponse: Client information
+        ClientDetailResponse: Client information with requested related records
         
     Raises:
         HTTPException: If client not found
     """
-    client = db.query(Client).filter(Client.id == client_id).first()
+    client = db.query(Client)\
+        .options(*_client_loader_options(include))\
+        .filter(Client.id == client_id)\
+        .first()
     
     if not client:
         raise HTTPException(
@@ -254,7 +449,7 @@ async def get_client(
             detail="Client not found"
         )
     
-    return client
+    return _client_response(client, include)
 
 @router.put("/{client_id}", response_model=ClientResponse)
 async def update_client(
@@ -336,11 +531,13 @@ async def delete_client(
     db.commit()
 
 @router.get("/summary/stats", response_model=ClientStats)
+@single_flight("clients.summary_stats")
 async def get_client_stats(
     db: Session = Depends(get_database_session)
 ):
     """
     Get client statistics and analytics.
+    Concurrent requests share one computation.
     
     Args:
         db (Session): Database session
@@ -348,6 +545,10 @@ async def get_client_stats(
     Returns:
         ClientStats: Aggregated client statistics
     """
+    return await run_blocking("db", call_with_new_session, db.get_bind(), _compute_client_stats)
+
+
+def _compute_client_stats(db: Session) -> dict:
     # Get total clients
     total_clients = db.query(func.count(Client.id)).scalar()
     
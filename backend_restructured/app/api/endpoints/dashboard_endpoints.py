@@ -4,7 +4,9 @@ API endpoints for dashboard data.
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from ...core.database import get_database_session
+from ...core.database import call_with_new_session, get_database_session
+from ...core.executors import run_blocking
+from ...core.singleflight import single_flight
 from ...models import Client, Project, Payment, Expense
 from ...schemas.dashboard_schemas import DashboardStats
 from sqlalchemy import func
@@ -13,10 +15,16 @@ from ...models.project_model import ProjectStatus
 router = APIRouter(tags=["dashboard"])
 
 @router.get("/stats", response_model=DashboardStats)
+@single_flight("dashboard.stats")
 async def get_dashboard_stats(db: Session = Depends(get_database_session)):
     """
     Get statistics for the main dashboard.
+    Concurrent requests share one computation.
     """
+    return await run_blocking("db", call_with_new_session, db.get_bind(), _compute_dashboard_stats)
+
+
+def _compute_dashboard_stats(db: Session) -> dict:
     total_clients = db.query(func.count(Client.id)).scalar()
     total_projects = db.query(func.count(Project.id)).scalar()
     total_revenue = db.query(func.sum(Payment.amount)).scalar() or 0.0
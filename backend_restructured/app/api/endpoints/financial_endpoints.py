@@ -3,13 +3,17 @@ This module defines all financial-related API routes including payments,
 expenses, invoices, and financial analytics.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, extract, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 import json
+from ...core.config import settings
 from ...core.database import get_database_session
+from ...core.executors import run_blocking
 from ...core.rbac import require_permissions
 from ...core.security import get_current_user
 from ...models import Payment, Expense, Invoice, Project, Client, User
@@ -18,7 +22,12 @@ from ...schemas.financial_schemas import (
     PaymentCreate, PaymentUpdate, PaymentResponse, PaymentCreateBulk, PaymentUpdateBulk, PaymentDeleteBulk,
     ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseCreateBulk, ExpenseUpdateBulk, ExpenseDeleteBulk,
     InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceCreateBulk, InvoiceUpdateBulk, InvoiceDeleteBulk,
-    FinancialStats
+    FinancialStats, BulkImportResult
+)
+from ...schemas.related_schemas import RelatedClient, RelatedPayment, RelatedProject
+from ..dependencies import get_include_params
+from ...utils.bulk_ingest import (
+    IngestFormatError, detect_format, iter_records, format_validation_error, error_entry
 )
 
 # Create separate routers for each financial entity
@@ -27,65 +36,74 @@ expense_router = APIRouter(tags=["expenses"])
 invoice_router = APIRouter(tags=["invoices"])
 financial_router = APIRouter(tags=["financial-analytics"])
 
+# Invoice relationships that can be embedded with ``include``: loading strategy and response schema
+INVOICE_INCLUDES = {
+    "client": (joinedload, RelatedClient),
+    "project": (joinedload, RelatedProject),
+    "payments": (selectinload, RelatedPayment),
+}
+
+def _invoice_loader_options(include: List[str]) -> list:
+    return [INVOICE_INCLUDES[name][0](getattr(Invoice, name)) for name in include]
+
+def _invoice_dict(invoice: Invoice, include: List[str]) -> Dict:
+    """Convert an invoice to a dict, parsing its JSON items and embedding the requested related records."""
+    invoice_dict = {
+        "id": invoice.id,
+        "invoice_number": invoice.invoice_number,
+        "client_id": invoice.client_id,
+        "amount": invoice.amount,
+        "status": invoice.status,
+        "issue_date": invoice.issue_date,
+        "due_date": invoice.due_date,
+        "paid_date": invoice.paid_date,
+        "items": json.loads(invoice.items) if invoice.items else [],
+        "notes": invoice.notes,
+        "created_at": invoice.created_at,
+        "updated_at": invoice.updated_at
+    }
+    for name in include:
+        schema = INVOICE_INCLUDES[name][1]
+        related = getattr(invoice, name)
+        if isinstance(related, list):
+            invoice_dict[name] = [schema.model_validate(item) for item in related]
+        else:
+            invoice_dict[name] = schema.model_validate(related) if related is not None else None
+    return invoice_dict
+
 # Invoice endpoints
 @invoice_router.get("/", response_model=Dict)
 async def get_invoices(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    include: List[str] = Depends(get_include_params(INVOICE_INCLUDES)),
     db: Session = Depends(get_database_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all invoices with pagination."""
-    invoices = db.query(Invoice).offset(skip).limit(limit).all()
+    """Get all invoices with pagination, embedding the related records named in ``include``."""
+    invoices = db.query(Invoice)\
+        .options(*_invoice_loader_options(include))\
+        .offset(skip).limit(limit).all()
     total = db.query(Invoice).count()
     
-    # Convert invoices to dict and parse JSON items
-    invoice_list = []
-    for invoice in invoices:
-        invoice_dict = {
-            "id": invoice.id,
-            "invoice_number": invoice.invoice_number,
-            "client_id": invoice.client_id,
-            "amount": invoice.amount,
-            "status": invoice.status,
-            "issue_date": invoice.issue_date,
-            "due_date": invoice.due_date,
-            "paid_date": invoice.paid_date,
-            "items": json.loads(invoice.items) if invoice.items else [],
-            "notes": invoice.notes,
-            "created_at": invoice.created_at,
-            "updated_at": invoice.updated_at
-        }
-        invoice_list.append(invoice_dict)
-    
-    return {"invoices": invoice_list, "total": total}
+    return {"invoices": [_invoice_dict(invoice, include) for invoice in invoices], "total": total}
 
 @invoice_router.get("/{invoice_id}", response_model=Dict)
 async def get_invoice(
     invoice_id: int,
+    include: List[str] = Depends(get_include_params(INVOICE_INCLUDES)),
     db: Session = Depends(get_database_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific invoice by ID."""
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    """Get a specific invoice by ID, embedding the related records named in ``include``."""
+    invoice = db.query(Invoice)\
+        .options(*_invoice_loader_options(include))\
+        .filter(Invoice.id == invoice_id)\
+        .first()
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    # Convert to dict and parse JSON items
-    return {
-        "id": invoice.id,
-        "invoice_number": invoice.invoice_number,
-        "client_id": invoice.client_id,
-        "amount": invoice.amount,
-        "status": invoice.status,
-        "issue_date": invoice.issue_date,
-        "due_date": invoice.due_date,
-        "paid_date": invoice.paid_date,
-        "items": json.loads(invoice.items) if invoice.items else [],
-        "notes": invoice.notes,
-        "created_at": invoice.created_at,
-        "updated_at": invoice.updated_at
-    }
+    return _invoice_dict(invoice, include)
 
 @invoice_router.post("/", response_model=Dict, status_code=status.HTTP_201_CREATED)
 async def create_invoice(
@@ -358,6 +376,231 @@ async def get_payment_stats(
         "total_amount": total_amount
     }
 
+# Expense endpoints
+def _expense_row(expense_data: ExpenseCreate) -> Dict:
+    """Convert a validated expense into a column mapping for bulk inserts."""
+    row = expense_data.model_dump()
+    row["category"] = expense_data.category.value
+    return row
+
+@expense_router.get("/", response_model=Dict)
+async def get_expenses(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    category: Optional[ExpenseCategory] = Query(None, description="Filter by expense category"),
+    linked_project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Get all expenses with pagination."""
+    query = db.query(Expense)
+    if category:
+        query = query.filter(Expense.category == category.value)
+    if linked_project_id:
+        query = query.filter(Expense.linked_project_id == linked_project_id)
+    
+    total = query.count()
+    expenses = query.order_by(Expense.id).offset(skip).limit(limit).all()
+    return {
+        "expenses": [ExpenseResponse.model_validate(expense) for expense in expenses],
+        "total": total
+    }
+
+@expense_router.get("/stats", response_model=Dict)
+async def get_expense_stats(
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Get expense statistics."""
+    total_expenses = db.query(func.count(Expense.id)).scalar()
+    total_amount = db.query(func.sum(Expense.amount)).scalar() or 0
+    by_category = db.query(Expense.category, func.sum(Expense.amount)).group_by(Expense.category).all()
+    return {
+        "total_expenses": total_expenses,
+        "total_amount": total_amount,
+        "amount_by_category": {category: float(amount) for category, amount in by_category}
+    }
+
+@expense_router.post("/bulk", response_model=List[ExpenseResponse], status_code=status.HTTP_201_CREATED)
+async def create_multiple_expenses(
+    expenses_data: ExpenseCreateBulk,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Create multiple expenses with a single multi-row INSERT."""
+    if not expenses_data.expenses:
+        return []
+    rows = [_expense_row(expense) for expense in expenses_data.expenses]
+    created = db.scalars(insert(Expense).returning(Expense), rows).all()
+    db.commit()
+    return created
+
+@expense_router.put("/bulk", response_model=List[ExpenseResponse])
+async def update_multiple_expenses(
+    expenses_data: ExpenseUpdateBulk,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Update multiple expenses, matched by ID, in a single transaction."""
+    rows = []
+    for expense_data in expenses_data.expenses:
+        if expense_data.id is None:
+            raise HTTPException(status_code=422, detail="Each expense update requires an id")
+        row = expense_data.model_dump(exclude_unset=True)
+        if "category" in row and row["category"] is not None:
+            row["category"] = row["category"].value
+        rows.append(row)
+    
+    ids = [row["id"] for row in rows]
+    existing_ids = {expense_id for (expense_id,) in db.query(Expense.id).filter(Expense.id.in_(ids))}
+    missing = [expense_id for expense_id in ids if expense_id not in existing_ids]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Expenses not found: {missing}")
+    
+    if rows:
+        db.execute(update(Expense), rows)
+        db.commit()
+    return db.query(Expense).filter(Expense.id.in_(ids)).order_by(Expense.id).all()
+
+@expense_router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_multiple_expenses(
+    expense_ids_data: ExpenseDeleteBulk,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete multiple expenses with a single DELETE statement."""
+    ids = expense_ids_data.expense_ids
+    existing_ids = {expense_id for (expense_id,) in db.query(Expense.id).filter(Expense.id.in_(ids))}
+    missing = [expense_id for expense_id in ids if expense_id not in existing_ids]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Expenses not found: {missing}")
+    
+    db.execute(delete(Expense).where(Expense.id.in_(ids)))
+    db.commit()
+
+@expense_router.post("/import", response_model=BulkImportResult)
+async def import_expenses(
+    request: Request,
+    format: Optional[str] = Query(None, description="Upload format ('ndjson' or 'csv'); defaults to the Content-Type"),
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream an NDJSON or CSV upload of expenses into the database.
+    
+    The request body is parsed incrementally. Valid rows are inserted in
+    chunks of ``BULK_IMPORT_CHUNK_SIZE``, each chunk in its own transaction,
+    so a bad row never rolls back rows that were already accepted. Rows
+    without ``created_by_id`` are attributed to the current user.
+    """
+    try:
+        upload_format = detect_format(request.headers.get("content-type"), format)
+    except IngestFormatError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    
+    chunk_size = settings.BULK_IMPORT_CHUNK_SIZE
+    max_errors = settings.BULK_IMPORT_MAX_ERRORS
+    result = {"processed": 0, "inserted": 0, "failed": 0, "errors": []}
+    
+    def record_error(line_number, message, record=None):
+        result["failed"] += 1
+        if len(result["errors"]) < max_errors:
+            result["errors"].append(error_entry(line_number, message, record))
+    
+    def flush(rows, line_numbers):
+        try:
+            db.execute(insert(Expense), rows)
+            db.commit()
+            result["inserted"] += len(rows)
+        except SQLAlchemyError as e:
+            db.rollback()
+            for line_number in line_numbers:
+                record_error(line_number, f"Database error: {e.__class__.__name__}")
+    
+    rows, line_numbers = [], []
+    async for line_number, record, error in iter_records(request.stream(), upload_format):
+        result["processed"] += 1
+        if error:
+            record_error(line_number, error, record)
+            continue
+        if record.get("created_by_id") is None:
+            record["created_by_id"] = current_user.id
+        try:
+            expense_data = ExpenseCreate.model_validate(record)
+        except ValidationError as e:
+            record_error(line_number, format_validation_error(e), record)
+            continue
+        rows.append(_expense_row(expense_data))
+        line_numbers.append(line_number)
+        if len(rows) >= chunk_size:
+            await run_blocking("db", flush, rows, line_numbers)
+            rows, line_numbers = [], []
+    if rows:
+        await run_blocking("db", flush, rows, line_numbers)
+    
+    return result
+
+@expense_router.get("/{expense_id}", response_model=ExpenseResponse)
+async def get_expense(
+    expense_id: int,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a specific expense by ID."""
+    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return expense
+
+@expense_router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
+async def create_expense(
+    expense: ExpenseCreate,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Create a new expense."""
+    db_expense = Expense(**_expense_row(expense))
+    db.add(db_expense)
+    db.commit()
+    db.refresh(db_expense)
+    return db_expense
+
+@expense_router.put("/{expense_id}", response_model=ExpenseResponse)
+async def update_expense(
+    expense_id: int,
+    expense: ExpenseUpdate,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Update an existing expense."""
+    db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not db_expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    
+    update_data = expense.model_dump(exclude_unset=True, exclude={"id"})
+    if update_data.get("category") is not None:
+        update_data["category"] = update_data["category"].value
+    for field, value in update_data.items():
+        setattr(db_expense, field, value)
+    
+    db.commit()
+    db.refresh(db_expense)
+    return db_expense
+
+@expense_router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_expense(
+    expense_id: int,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete an expense."""
+    db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not db_expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    
+    db.delete(db_expense)
+    db.commit()
+
 # Combine all financial routers
 router = APIRouter()
 router.include_router(payment_router)
@@ -2,47 +2,65 @@
 API endpoints for notifications.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status, WebSocket, WebSocketDisconnect
+from jose import JWTError, jwt
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from ...core.config import settings
 from ...core.database import get_database_session
 from ...core.security import get_current_user
 from ...models.user_model import User
 from ...models.notification_model import Notification
-from ...schemas.notification_schemas import NotificationCreate, NotificationResponse, NotificationUpdate
-from ...services.email_service import send_email
+from ...schemas.notification_schemas import (
+    NotificationCreate, NotificationResponse, NotificationUpdate,
+    NotificationMarkRead, NotificationBulkDelete, NotificationBulkResult, UnreadCountResponse
+)
+from ...services.email_service import email_outbox
+from ...services.notification_hub import notification_hub
+from ...services.notification_service import count_unread
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def _push_unread_count(user_id: int, count: int):
+    """Send the new unread count to the user's sockets, replacing any queued count."""
+    await notification_hub.publish_to_user(
+        user_id, {"type": "unread_count", "count": count}, coalesce_key="unread_count"
+    )
+
+
 class EmailRequest(BaseModel):
     to_email: EmailStr
     subject: str
     html_content: str
     plain_text_content: str = None
 
-@router.post("/send-email", status_code=status.HTTP_200_OK)
+@router.post("/send-email", status_code=status.HTTP_202_ACCEPTED)
 async def send_notification_email(
     email_request: EmailRequest,
+    db: Session = Depends(get_database_session),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Send an email notification.
+    Queue an email notification.
+
+    The email is stored in the outbox and delivered by the background worker,
+    so the request does not wait for the email provider.
     """
-    try:
-        send_email(
-            to_email=email_request.to_email,
-            subject=email_request.subject,
-            html_content=email_request.html_content,
-            plain_text_content=email_request.plain_text_content
-        )
-        return {"message": "Email sent successfully"}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send email: {e}"
-        )
+    messages = email_outbox.enqueue(
+        db,
+        to_email=email_request.to_email,
+        subject=email_request.subject,
+        html_content=email_request.html_content,
+        plain_text_content=email_request.plain_text_content
+    )
+    db.commit()
+    return {"message": "Email queued", "outbox_id": messages[0].id}
 
 
 @router.post("/in-app", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
@@ -62,6 +80,11 @@ async def create_in_app_notification(
     db.add(db_notification)
     db.commit()
     db.refresh(db_notification)
+    await notification_hub.publish_to_user(
+        db_notification.user_id,
+        {"type": "notification", "data": NotificationResponse.model_validate(db_notification).model_dump(mode="json")}
+    )
+    await _push_unread_count(db_notification.user_id, count_unread(db, db_notification.user_id))
     return db_notification
 
 
@@ -69,15 +92,76 @@ async def create_in_app_notification(
 async def get_in_app_notifications(
     db: Session = Depends(get_database_session),
     current_user: User = Depends(get_current_user),
-    is_read: Optional[bool] = None
+    is_read: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.NOTIFICATION_PAGE_SIZE, ge=1, le=settings.NOTIFICATION_MAX_PAGE_SIZE)
 ):
     """
-    Get in-app notifications for the current user.
+    Get a page of in-app notifications for the current user, newest first.
     """
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
     if is_read is not None:
         query = query.filter(Notification.is_read == is_read)
-    return query.all()
+    return query.order_by(Notification.created_at.desc(), Notification.id.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/in-app/unread-count", response_model=UnreadCountResponse)
+async def get_unread_notification_count(
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the number of unread in-app notifications for the current user.
+    """
+    return {"unread_count": count_unread(db, current_user.id)}
+
+
+@router.post("/in-app/mark-read", response_model=NotificationBulkResult)
+async def mark_notifications_read(
+    request: NotificationMarkRead,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark several notifications, or all of them, as read in a single UPDATE.
+    """
+    if not request.all and not request.ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Provide notification ids or set all to true"
+        )
+    statement = update(Notification).where(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False  # noqa: E712
+    )
+    if not request.all:
+        statement = statement.where(Notification.id.in_(request.ids))
+    result = db.execute(statement.values(is_read=True).execution_options(synchronize_session=False))
+    db.commit()
+    unread_count = count_unread(db, current_user.id)
+    await _push_unread_count(current_user.id, unread_count)
+    return {"affected": result.rowcount, "unread_count": unread_count}
+
+
+@router.delete("/in-app/bulk", response_model=NotificationBulkResult)
+async def delete_notifications_bulk(
+    request: NotificationBulkDelete,
+    db: Session = Depends(get_database_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete several notifications in a single DELETE.
+    """
+    deleted = db.execute(
+        delete(Notification)
+        .where(Notification.user_id == current_user.id, Notification.id.in_(request.ids))
+        .returning(Notification.is_read)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    unread_count = count_unread(db, current_user.id)
+    await _push_unread_count(current_user.id, unread_count)
+    return {"affected": len(deleted), "unread_count": unread_count}
 
 
 @router.put("/in-app/{notification_id}", response_model=NotificationResponse)
@@ -97,11 +181,14 @@ async def update_in_app_notification(
             detail="Notification not found"
         )
     
+    was_read = bool(notification.is_read)
     for field, value in notification_data.dict(exclude_unset=True).items():
         setattr(notification, field, value)
     
     db.commit()
     db.refresh(notification)
+    if bool(notification.is_read) != was_read:
+        await _push_unread_count(current_user.id, count_unread(db, current_user.id))
     return notification
 
 
@@ -120,40 +207,44 @@ async def delete_in_app_notification(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
+    was_unread = not notification.is_read
     db.delete(notification)
     db.commit()
-
-
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    async def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
-
-manager = ConnectionManager()
+    if was_unread:
+        await _push_unread_count(current_user.id, count_unread(db, current_user.id))
 
 
 @router.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: int):
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    client_id: int,
+    token: Optional[str] = None,
+    db: Session = Depends(get_database_session)
+):
+    """
+    Receive real-time notifications for a user.
+
+    ``client_id`` is the ID of the user to subscribe to and ``token`` must be
+    an access token for that user.
+    """
+    try:
+        payload = jwt.decode(token or "", settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = db.query(User.id).filter(User.email == payload.get("sub")).scalar()
+    except JWTError:
+        user_id = None
+    finally:
+        # Do not hold a database connection for the lifetime of the socket
+        db.close()
+    if user_id is None or user_id != client_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection = await notification_hub.connect(client_id, websocket)
     try:
         while True:
-            data = await websocket.receive_text()
-            # You can process received data here if needed
-            # await manager.send_personal_message(f"You wrote: {data}", websocket)
+            # Incoming messages are ignored; receiving detects disconnects
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        print(f"Client #{client_id} disconnected")
\ No newline at end of file
+        logger.info(f"Client #{client_id} disconnected")
+    finally:
+        await notification_hub.disconnect(connection)
@@ -5,16 +5,18 @@ project tracking, and project analytics.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, and_, inspect as sa_inspect
 from typing import List, Optional
 from datetime import datetime, timedelta
-from ...core.database import get_database_session
+from ...core.database import call_with_new_session, get_database_session
+from ...core.executors import run_blocking
+from ...core.singleflight import single_flight
 from ...core.rbac import require_permissions
 from ...models import Project, Client, User, Payment, Expense
 from ...models.project_model import ProjectStatus, ProjectPriority
 from ...schemas import (
-    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse,
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse, ProjectListResponse,
     ProjectSummary, ProjectSearchFilters, ProjectStats, ProjectCreateBulk, ProjectUpdateBulk, ProjectDeleteBulk
 )
 from fastapi import APIRouter, HTTPException
@@ -23,6 +25,40 @@ from datetime import datetime
 
 router = APIRouter(tags=["projects"])
 
+# Relationships that can be embedded with ``include``, and the strategy that loads each
+PROJECT_INCLUDES = {
+    "client": joinedload,
+    "developer": joinedload,
+    "milestones": selectinload,
+    "invoices": selectinload,
+    "expenses": selectinload,
+    "payments": selectinload,
+}
+
+# Read by the computed fields and names of every project response
+_PROJECT_RESPONSE_LOADS = ("client", "developer", "expenses", "payments")
+
+
+def _project_loader_options(include: List[str]) -> list:
+    names = list(_PROJECT_RESPONSE_LOADS) + [name for name in include if name not in _PROJECT_RESPONSE_LOADS]
+    return [PROJECT_INCLUDES[name](getattr(Project, name)) for name in names]
+
+
+def _project_response(project: Project, include: List[str]) -> dict:
+    """Build a project response with computed fields and the requested related records."""
+    project_dict = {attr.key: getattr(project, attr.key) for attr in sa_inspect(Project).column_attrs}
+    project_dict['is_overdue'] = project.is_overdue
+    project_dict['total_expenses'] = project.total_expenses
+    project_dict['total_payments'] = project.total_payments
+    project_dict['profit_margin'] = project.profit_margin
+    if project.client:
+        project_dict['client_name'] = project.client.company_name
+    if project.developer:
+        project_dict['developer_name'] = project.developer.full_name
+    for name in include:
+        project_dict[name] = getattr(project, name)
+    return project_dict
+
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_permissions(["projects:create"]))])
 async def create_project(
     project_data: ProjectCreate,
@@ -164,7 +200,7 @@ async def delete_multiple_projects(
     
     db.commit()
 
-from ..dependencies import get_pagination_params, get_sorting_params
+from ..dependencies import get_include_params, get_pagination_params, get_sorting_params
 
 @router.get("/", response_model=ProjectListResponse)
 async def get_projects(
@@ -177,10 +213,13 @@ async def get_projects(
     developer_id: Optional[int] = Query(None, description="Filter by developer ID"),
     is_overdue: Optional[bool] = Query(None, description="Filter overdue projects"),
     fields: Optional[str] = Query(None, description="Comma-separated list of fields to include in the response (e.g., 'id,title,status')"),
+    include: List[str] = Depends(get_include_params(PROJECT_INCLUDES)),
     db: Session = Depends(get_database_session)
 ):
     """
     Retrieve a paginated list of projects with optional filtering and sorting.
+    Related records named in ``include`` are embedded, loaded for the whole
+    page at once.
     """
     # Build query with filters
     query = db.query(Project)
@@ -229,11 +268,19 @@ async def get_projects(
     skip = pagination["skip"]
     limit = pagination["limit"]
     total = query.count()
-    projects = query.offset(skip).limit(limit).all()
+    projects = query.options(*_project_loader_options(include)).offset(skip).limit(limit).all()
+
+    return {
+        "projects": [_project_response(project, include) for project in projects],
+        "total": total,
+        "page": (skip // limit) + 1 if limit > 0 else 1,
+        "per_page": limit
+    }
 
-@router.get("/{project_id}", response_model=ProjectResponse)
+@router.get("/{project_id}", response_model=ProjectDetailResponse)
 async def get_project(
     project_id: int,
+    include: List[str] = Depends(get_include_params(PROJECT_INCLUDES)),
     db: Session = Depends(get_database_session)
 ):
     """
@@ -241,15 +288,19 @@ async def get_project(
     
     Args:
         project_id (int): Project ID to retrieve
+        include (List[str]): Related records to embed
         db (Session): Database session
         
     Returns:
-        ProjectResponse: Project information with computed fields
+        ProjectDetailResponse: Project information with computed fields and requested related records
         
     Raises:
         HTTPException: If project not found
     """
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.query(Project)\
+        .options(*_project_loader_options(include))\
+        .filter(Project.id == project_id)\
+        .first()
     
     if not project:
         raise HTTPException(
@@ -257,20 +308,7 @@ async def get_project(
             detail="Project not found"
         )
     
-    # Create enhanced response with computed fields
-    project_dict = project.__dict__.copy()
-    project_dict['is_overdue'] = project.is_overdue
-    project_dict['total_expenses'] = project.total_expenses
-    project_dict['total_payments'] = project.total_payments
-    project_dict['profit_margin'] = project.profit_margin
-    
-    # Add related data
-    if project.client:
-        project_dict['client_name'] = project.client.company_name
-    if project.developer:
-        project_dict['developer_name'] = project.developer.full_name
-    
-    return project_dict
+    return _project_response(project, include)
 
 @router.put("/{project_id}", response_model=ProjectResponse, dependencies=[Depends(require_permissions(["projects:update"]))])
 async def update_project(
@@ -359,11 +397,13 @@ async def delete_project(
     db.commit()
 
 @router.get("/summary/stats", response_model=ProjectStats)
+@single_flight("projects.summary_stats")
 async def get_project_stats(
     db: Session = Depends(get_database_session)
 ):
     """
     Get project statistics and analytics.
+    Concurrent requests share one computation.
     
     Args:
         db (Session): Database session
@@ -371,6 +411,10 @@ async def get_project_stats(
     Returns:
         ProjectStats: Aggregated project statistics
     """
+    return await run_blocking("db", call_with_new_session, db.get_bind(), _compute_project_stats)
+
+
+def _compute_project_stats(db: Session) -> dict:
     # Get total projects
     total_projects = db.query(func.count(Project.id)).scalar()
     
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from io import BytesIO
 
 from ...core.database import get_database_session
+from ...core.executors import run_blocking
 from ...core.security import get_current_user
 from ...models.user_model import User
 from ...models.client_model import Client
@@ -19,6 +20,14 @@ from starlette.responses import StreamingResponse as StarletteStreamingResponse
 router = APIRouter()
 
 
+def _render_financial_report(financial_data):
+    table_flowable = create_table_flowable(financial_data)
+    return generate_pdf_report(
+        title="Financial Report",
+        content=["This is a sample financial report.", table_flowable]
+    )
+
+
 @router.get("/generate-financial-report", response_class=StreamingResponse)
 async def generate_financial_report(
     db: Session = Depends(get_database_session),
@@ -35,11 +44,7 @@ async def generate_financial_report(
         ["Profit", "$5,000"]
     ]
 
-    table_flowable = create_table_flowable(financial_data)
-    pdf_buffer = generate_pdf_report(
-        title="Financial Report",
-        content=["This is a sample financial report.", table_flowable]
-    )
+    pdf_buffer = await run_blocking("render", _render_financial_report, financial_data)
 
     return StreamingResponse(pdf_buffer, media_type="application/pdf", headers={
         "Content-Disposition": "attachment; filename=\"financial_report.pdf\""
@@ -28,7 +28,8 @@ async def create_scheduled_report(
     """
     db_report = ScheduledReport(
         **report_data.dict(),
-        user_id=current_user.id
+        user_id=current_user.id,
+        run_day=report_data.next_run_at.day
     )
     db.add(db_report)
     db.commit()
@@ -69,6 +70,10 @@ async def update_scheduled_report(
 
     for field, value in report_data.dict(exclude_unset=True).items():
         setattr(report, field, value)
+    if report_data.next_run_at is not None:
+        # A new first run sets the day of month later monthly runs keep
+        report.run_day = report_data.next_run_at.day
+        report.failed_runs = 0
     
     db.commit()
     db.refresh(report)
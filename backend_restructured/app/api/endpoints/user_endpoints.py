@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ...core.database import get_database_session
+from ...core.executors import run_blocking
 from ...core.security import get_current_user
 from ...auth.auth import hash_password, verify_password
 from ...models.user_model import User
@@ -39,7 +40,7 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await run_blocking("crypto", hash_password, user_data.password)
     db_user = User(
         full_name=user_data.full_name,
         email=user_data.email,
@@ -76,7 +77,7 @@ async def create_multiple_users(
                 detail=f"Email {user_data.email} already registered"
             )
         
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await run_blocking("crypto", hash_password, user_data.password)
         
         db_user = User(
             full_name=user_data.full_name,
@@ -274,13 +275,13 @@ async def change_current_user_password(
     """
     Change the current authenticated user's password.
     """
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await run_blocking("crypto", verify_password, password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
-    current_user.hashed_password = hash_password(password_data.new_password)
+    current_user.hashed_password = await run_blocking("crypto", hash_password, password_data.new_password)
     db.commit()
     
     return {"message": "Password changed successfully"}
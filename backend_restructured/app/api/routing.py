@@ -0,0 +1,188 @@
+"""
+Route dispatch for the Smart CRM SaaS application.
+This module removes route registrations that can never be reached and
+replaces Starlette's linear scan over every route with a lookup in a trie of
+the routes' static path prefixes. Matching order and results are unchanged.
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.routing import BaseRoute, Match, Route, Router, WebSocketRoute, get_route_path
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+def _static_segments(route: BaseRoute) -> Optional[List[str]]:
+    """
+    Return the path segments before the first parameter of ``route``.
+
+    None means the route cannot be indexed (mounts, hosts, custom routes)
+    and has to be tried for every request.
+    """
+    if not isinstance(route, (Route, WebSocketRoute)):
+        return None
+    segments = []
+    for segment in route.path.split("/"):
+        if "{" in segment:
+            break
+        segments.append(segment)
+    return segments
+
+
+def _shadows(earlier: BaseRoute, later: BaseRoute) -> bool:
+    """True if every request ``later`` matches is fully matched by ``earlier`` first."""
+    if type(earlier) is not type(later) or earlier.path != later.path:
+        return False
+    if isinstance(earlier, WebSocketRoute):
+        return True
+    if not isinstance(earlier, Route):
+        return False
+    return earlier.methods is None or (later.methods is not None and later.methods <= earlier.methods)
+
+
+def find_shadowed_routes(routes: Sequence[BaseRoute]) -> List[Tuple[int, int]]:
+    """Return ``(shadowed, shadowing)`` index pairs for routes registered again under the same path."""
+    by_path: Dict[Tuple[type, str], List[int]] = {}
+    shadowed = []
+    for index, route in enumerate(routes):
+        if not isinstance(route, (Route, WebSocketRoute)):
+            continue
+        earlier = by_path.setdefault((type(route), route.path), [])
+        for candidate in earlier:
+            if _shadows(routes[candidate], route):
+                shadowed.append((index, candidate))
+                break
+        else:
+            earlier.append(index)
+    return shadowed
+
+
+def collapse_duplicate_routes(router: Router) -> List[BaseRoute]:
+    """Remove routes that an earlier registration always wins over. Returns the removed routes."""
+    shadowed = {index for index, _ in find_shadowed_routes(router.routes)}
+    if not shadowed:
+        return []
+    removed = [route for index, route in enumerate(router.routes) if index in shadowed]
+    router.routes[:] = [route for index, route in enumerate(router.routes) if index not in shadowed]
+    counts = Counter(
+        f"{','.join(sorted(getattr(route, 'methods', None) or ['WS']))} {route.path}" for route in removed
+    )
+    logger.warning(
+        f"Collapsed {len(removed)} duplicate route registration(s): "
+        + "; ".join(f"{name} (x{count + 1})" for name, count in counts.most_common())
+    )
+    return removed
+
+
+class _Node:
+    __slots__ = ("children", "routes")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.routes: List[int] = []
+
+
+class RouteIndex:
+    """
+    Trie over the static path segments of each route.
+
+    A request is only matched against routes whose static prefix it starts
+    with, tried in registration order, so the first full match and the
+    405 fallback are the same as with a linear scan.
+    """
+
+    def __init__(self, routes: Sequence[BaseRoute]):
+        self.routes = list(routes)
+        self._root = _Node()
+        for index, route in enumerate(self.routes):
+            node = self._root
+            for segment in _static_segments(route) or ():
+                node = node.children.setdefault(segment, _Node())
+            node.routes.append(index)
+
+    def candidates(self, route_path: str) -> List[BaseRoute]:
+        node = self._root
+        found = list(node.routes)
+        for segment in route_path.split("/"):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            found.extend(node.routes)
+        found.sort()
+        return [self.routes[index] for index in found]
+
+    def match(self, scope: Scope) -> Tuple[Optional[BaseRoute], Optional[dict], Match]:
+        """Return the route that handles ``scope``, its child scope and the kind of match."""
+        partial = partial_scope = None
+        for route in self.candidates(get_route_path(scope)):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope, Match.FULL
+            if match == Match.PARTIAL and partial is None:
+                partial, partial_scope = route, child_scope
+        if partial is not None:
+            return partial, partial_scope, Match.PARTIAL
+        return None, None, Match.NONE
+
+
+class IndexedDispatch:
+    """Drop-in replacement for ``Router.app`` that dispatches through a ``RouteIndex``."""
+
+    def __init__(self, router: Router):
+        self.router = router
+        self.index = RouteIndex(router.routes)
+
+    def _current_index(self) -> RouteIndex:
+        # Rebuild if routes were added after the index was installed
+        if len(self.router.routes) != len(self.index.routes):
+            collapse_duplicate_routes(self.router)
+            self.index = RouteIndex(self.router.routes)
+        return self.index
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        router = self.router
+        if "router" not in scope:
+            scope["router"] = router
+        if scope["type"] == "lifespan":
+            await router.lifespan(scope, receive, send)
+            return
+
+        index = self._current_index()
+        route, child_scope, _ = index.match(scope)
+        if route is not None:
+            scope.update(child_scope)
+            await route.handle(scope, receive, send)
+            return
+
+        route_path = get_route_path(scope)
+        if scope["type"] == "http" and router.redirect_slashes and route_path != "/":
+            redirect_scope = dict(scope)
+            if route_path.endswith("/"):
+                redirect_scope["path"] = redirect_scope["path"].rstrip("/")
+            else:
+                redirect_scope["path"] = redirect_scope["path"] + "/"
+            if index.match(redirect_scope)[0] is not None:
+                response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+                await response(scope, receive, send)
+                return
+
+        await router.default(scope, receive, send)
+
+
+def install_route_index(router: Router) -> IndexedDispatch:
+    """
+    Collapse duplicate routes of ``router`` and dispatch it through a route index.
+
+    Call this after all routers have been included.
+    """
+    if router.middleware_stack != router.app:
+        raise ValueError("Router middleware is not supported by the route index")
+    collapse_duplicate_routes(router)
+    dispatch = IndexedDispatch(router)
+    router.middleware_stack = dispatch
+    return dispatch
@@ -0,0 +1,157 @@
+"""
+Admission control for the Smart CRM SaaS application.
+This module caps the number of requests each worker processes at once, per
+route class. Requests over the cap wait in a bounded queue for a limited time;
+when the queue is full or the wait runs out they are rejected at once with
+503 and ``Retry-After``, so an overloaded class degrades without dragging
+down the others.
+"""
+
+import asyncio
+import json
+import math
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+
+class AdmissionClass:
+    """In-flight limit and wait queue for one route class."""
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed. Returns False if the request is shed."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue or self.queue_timeout <= 0:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # release() hands its slot to the waiter, so in_flight is already counted
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ran out (wait_for may still time out on Python 3.12+)
+                self.admitted += 1
+                return True
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        self.admitted += 1
+        return True
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that applies per-route-class admission limits to HTTP requests.
+
+    ``classes`` maps a class name to ``[max in flight, max queued, max queue
+    wait in seconds]``; ``route_classes`` maps path prefixes to class names,
+    the longest matching prefix winning, and other paths use ``default``.
+    Paths in ``exempt_paths`` and websocket connections are not limited.
+    """
+
+    def __init__(
+        self,
+        app,
+        classes: Optional[Dict[str, Iterable[float]]] = None,
+        route_classes: Optional[Dict[str, str]] = None,
+        exempt_paths: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        classes = classes or settings.ADMISSION_CLASSES
+        self.classes: Dict[str, AdmissionClass] = {
+            name: AdmissionClass(name, int(limit), int(queue), float(timeout))
+            for name, (limit, queue, timeout) in classes.items()
+        }
+        route_classes = settings.ADMISSION_ROUTE_CLASSES if route_classes is None else route_classes
+        self.route_classes: List[Tuple[str, str]] = sorted(
+            route_classes.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.exempt_paths = frozenset(settings.ADMISSION_EXEMPT_PATHS if exempt_paths is None else exempt_paths)
+
+    def route_class(self, path: str) -> AdmissionClass:
+        for prefix, name in self.route_classes:
+            if path.startswith(prefix):
+                return self.classes.get(name) or self.classes["default"]
+        return self.classes["default"]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: admission_class.stats() for name, admission_class in self.classes.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        admission_class = self.route_class(scope["path"])
+        if not await admission_class.acquire():
+            await self._reject(admission_class, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_class.release()
+
+    @staticmethod
+    async def _reject(admission_class: AdmissionClass, send):
+        body = json.dumps({"detail": "Server is busy, please retry"}).encode()
+        retry_after = max(1, math.ceil(admission_class.queue_timeout))
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
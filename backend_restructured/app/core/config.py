@@ -4,7 +4,7 @@ This module contains all the configuration variables used throughout the applica
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     """
@@ -26,6 +26,158 @@ class Settings(BaseSettings):
     SENDGRID_API_KEY: str = "key here"
     MAIL_FROM_EMAIL: str = "your-verified-sender-email@example.com"
     
+    # AI completions
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    AI_TRANSPORT: str = "openai"  # 'openai' or 'stub'
+    AI_MAX_CONCURRENCY: int = 8
+    AI_REQUEST_TIMEOUT: float = 30.0
+    AI_CACHE_TTL: float = 3600.0
+    AI_CACHE_SIZE: int = 1024
+    AI_STUB_LATENCY: float = 0.2
+    AI_BATCH_CONCURRENCY: int = 4
+    AI_BATCH_MAX_CLIENTS: int = 500
+    
+    # Outbound email
+    EMAIL_TRANSPORT: str = "sendgrid"  # 'sendgrid', 'smtp' or 'memory'
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = False
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_BATCH_SIZE: int = 500
+    EMAIL_POLL_INTERVAL: float = 2.0
+    EMAIL_RATE_LIMIT_PER_SECOND: float = 100.0
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0
+    EMAIL_LEASE_SECONDS: int = 300
+    # Only the worker holding this lease sends, so the rate limit applies across all workers
+    EMAIL_LEADER_LEASE_SECONDS: int = 60
+    EMAIL_RETENTION_DAYS: int = 30  # Sent and failed messages older than this are deleted
+    EMAIL_PRUNE_INTERVAL: float = 3600.0
+    EMAIL_PRUNE_BATCH_SIZE: int = 5000
+    
+    # Real-time notifications
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 100
+    WEBSOCKET_SEND_TIMEOUT: float = 5.0
+    PUBSUB_URL: str = "memory://"  # 'memory://', 'redis://host:6379/0' or a postgresql:// DSN
+    PUBSUB_CHANNEL: str = "smartcrm_notifications"
+    NOTIFICATION_PAGE_SIZE: int = 50
+    NOTIFICATION_MAX_PAGE_SIZE: int = 200
+    NOTIFICATION_PRUNE_ENABLED: bool = True
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_PRUNE_INTERVAL: float = 3600.0
+    NOTIFICATION_PRUNE_BATCH_SIZE: int = 5000
+    
+    # Bulk ingestion
+    BULK_IMPORT_CHUNK_SIZE: int = 1000
+    BULK_IMPORT_MAX_ERRORS: int = 100
+    IMPORT_ERROR_DIR: str = "./import_errors"
+    IMPORT_UPLOAD_DIR: Optional[str] = None  # Spooled uploads; defaults to the system temp directory
+    IMPORT_JOB_HISTORY: int = 50
+    
+    # Automated task runner; opt-in, since every serve.py worker runs the
+    # lifespan and would otherwise start its own poller
+    TASK_RUNNER_ENABLED: bool = False
+    TASK_RUNNER_CONCURRENCY: int = 4
+    TASK_RUNNER_POLL_INTERVAL: float = 5.0
+    TASK_RUNNER_BATCH_SIZE: int = 20
+    TASK_RUNNER_LEASE_SECONDS: int = 300
+    TASK_RUNNER_MAX_ATTEMPTS: int = 3
+    
+    # Scheduled report engine; opt-in like the task runner, since every
+    # serve.py worker runs the lifespan and would otherwise start its own poller
+    REPORT_SCHEDULER_ENABLED: bool = False
+    REPORT_SCHEDULER_POLL_INTERVAL: float = 60.0
+    REPORT_SCHEDULER_BATCH_SIZE: int = 200
+    REPORT_SCHEDULER_MAX_ATTEMPTS: int = 3  # Attempts at one period before it is skipped
+    REPORT_RENDER_WORKERS: int = 2
+    
+    # Batch requests
+    BATCH_MAX_REQUESTS: int = 20
+    
+    # Executors for blocking work, threads per pool (the render pool defaults to REPORT_RENDER_WORKERS)
+    EXECUTOR_WORKERS: Dict[str, int] = {"db": 16, "crypto": 4, "io": 16}
+    
+    # API key authentication
+    API_KEY_CACHE_TTL: float = 60.0
+    API_KEY_NEGATIVE_CACHE_TTL: float = 5.0
+    API_KEY_CACHE_SIZE: int = 10000
+    API_KEY_USAGE_FLUSH_ENABLED: bool = True
+    API_KEY_USAGE_FLUSH_INTERVAL: float = 30.0
+    
+    # Database backups
+    BACKUP_DIR: Optional[str] = None  # Defaults to a 'backups' directory next to the database
+    BACKUP_COMPRESSION: str = "gzip"  # 'gzip', 'zstd' (requires the zstandard package) or 'none'
+    BACKUP_PAGES_PER_STEP: int = 1024
+    BACKUP_STEP_PAUSE: float = 0.005  # Seconds between steps, leaving room for foreground writes
+    BACKUP_RETENTION_COUNT: int = 14
+    BACKUP_RETENTION_DAYS: int = 30
+    BACKUP_JOB_HISTORY: int = 20
+    SNAPSHOT_CHUNK_ROWS: int = 5000
+    SNAPSHOT_IMPORT_BATCH_SIZE: int = 1000
+
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND_URL: str = "memory://"
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0
+    # Must be set behind the load balancer: otherwise every unauthenticated
+    # request shares the balancer's address and one bucket
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # Route classes limited per submitted username as well as per client address,
+    # so logins through an untrusted proxy do not all share one bucket
+    RATE_LIMIT_USERNAME_CLASSES: List[str] = ["auth"]
+    RATE_LIMIT_MAX_FORM_SIZE: int = 8192  # Larger login bodies are limited by address alone
+    # Route class -> [tokens per second, burst]
+    RATE_LIMIT_CLASSES: Dict[str, List[float]] = {
+        "default": [20, 100],
+        "auth": [5 / 60, 5],
+        "ai": [1, 10],
+        "heavy": [0.2, 5],
+    }
+    # Path prefix -> route class; the longest matching prefix wins
+    RATE_LIMIT_ROUTE_CLASSES: Dict[str, str] = {
+        "/api/v1/auth/login": "auth",
+        "/api/v1/ai": "ai",
+        "/api/v1/backup": "heavy",
+        "/api/v1/reports": "heavy",
+    }
+
+    # Admission control
+    ADMISSION_CONTROL_ENABLED: bool = True
+    # Route class -> [max in flight, max queued, max queue wait in seconds], per worker
+    ADMISSION_CLASSES: Dict[str, List[float]] = {
+        "default": [64, 128, 2.0],
+        "auth": [8, 32, 2.0],
+        "reports": [2, 8, 10.0],
+        "ai": [16, 32, 10.0],
+    }
+    # Path prefix -> route class; the longest matching prefix wins
+    ADMISSION_ROUTE_CLASSES: Dict[str, str] = {
+        "/api/v1/auth": "auth",
+        "/api/v1/ai": "ai",
+        "/api/v1/reports": "reports",
+        "/api/v1/backup": "reports",
+    }
+    # The batch endpoint is exempt as its sub-requests are admitted for their own classes;
+    # holding a slot for the parent as well would let it starve its own sub-requests
+    ADMISSION_EXEMPT_PATHS: List[str] = ["/health", "/api/v1/batch", "/api/v1/batch/"]
+
+    # Production server (serve.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # 0 starts one worker per CPU available to the container
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    # Replacing a dead worker waits this long, doubling per consecutive early death
+    SERVER_RESTART_BACKOFF: float = 0.5
+    SERVER_RESTART_BACKOFF_MAX: float = 30.0
+    # The master exits once a worker fails its startup this many times in a row
+    SERVER_MAX_BOOT_FAILURES: int = 5
+    
     # CORS
     CORS_ORIGINS: list = [
         "http://localhost:3000",
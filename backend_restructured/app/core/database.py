@@ -4,12 +4,27 @@ This module handles SQLAlchemy database setup, session management, and provides
 database dependency injection for FastAPI endpoints.
 """
 
-from sqlalchemy import create_engine
+import ast
+import contextvars
+import logging
+import re
+import threading
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, InvalidRequestError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Callable, Generator, Optional, Set, TypeVar
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Migration scripts, which define the schema revision the code expects
+ALEMBIC_VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\b[^=]*=\s*(.+)$", re.MULTILINE)
+
 # Create SQLAlchemy engine
 # connect_args={"check_same_thread": False} is needed only for SQLite
 engine = create_engine(
@@ -23,6 +38,51 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class for declarative models
 Base = declarative_base()
 
+
+class ReadOnlySession(Session):
+    """
+    Session shared by concurrent sub-requests of a batch.
+
+    Statements run one at a time under a lock and their results are buffered
+    before it is released, so handlers running on the event loop and in
+    worker threads can share it. Pending changes are refused, and commit
+    keeps the transaction open so every sub-request reads the same snapshot.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("autoflush", False)
+        super().__init__(*args, **kwargs)
+        self._statement_lock = threading.RLock()
+
+    def execute(self, *args, **kwargs):
+        with self._statement_lock:
+            return super().execute(*args, **kwargs).freeze()()
+
+    def scalar(self, *args, **kwargs):
+        return self.execute(*args, **kwargs).scalar()
+
+    def scalars(self, *args, **kwargs):
+        return self.execute(*args, **kwargs).scalars()
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("This session is read-only")
+
+    def commit(self):
+        self.flush()
+
+
+# Session that get_database_session hands out instead of a new one, set for batch sub-requests
+shared_session: contextvars.ContextVar[Optional[Session]] = contextvars.ContextVar("shared_session", default=None)
+
+
+def create_snapshot_session(bind=None) -> ReadOnlySession:
+    """Create a read-only session whose reads come from one transaction."""
+    bind = bind or engine
+    if bind.dialect.name == "postgresql":
+        bind = bind.execution_options(isolation_level="REPEATABLE READ")
+    return ReadOnlySession(bind=bind)
+
 def get_database_session() -> Generator[Session, None, None]:
     """
     Dependency function that provides database session to FastAPI endpoints.
@@ -38,20 +98,81 @@ def get_database_session() -> Generator[Session, None, None]:
         def get_users(db: Session = Depends(get_database_session)):
             return db.query(User).all()
     """
+    database_session = shared_session.get()
+    if database_session is not None:
+        # Owned and closed by whoever set it
+        yield database_session
+        return
     database_session = SessionLocal()
     try:
         yield database_session
     finally:
         database_session.close()
 
-def create_database_tables():
+def call_with_new_session(bind, func: Callable[[Session], T]) -> T:
+    """
+    Call ``func`` with a new session on ``bind`` and close the session afterwards.
+
+    For work that can outlive the request that started it, such as a
+    single-flight call shared with other requests: the starting request's
+    session is closed when that request ends, even if the work is still
+    using it.
+    """
+    database_session = SessionLocal(bind=bind)
+    try:
+        return func(database_session)
+    finally:
+        database_session.close()
+
+def get_migration_heads(versions_dir: Path = ALEMBIC_VERSIONS_DIR) -> Set[str]:
+    """
+    Return the head revisions of the Alembic migration scripts.
+    
+    The revision identifiers are read from the scripts as text, which avoids
+    importing Alembic and every migration module at startup.
+    """
+    revisions = set()
+    parents = set()
+    for path in versions_dir.glob("*.py"):
+        for name, value in _REVISION_LINE.findall(path.read_text()):
+            value = ast.literal_eval(value.strip())
+            if name == "revision":
+                revisions.add(value)
+            elif isinstance(value, str):
+                parents.add(value)
+            elif value:
+                parents.update(value)
+    return revisions - parents
+
+def get_database_revisions(bind=None) -> Set[str]:
+    """Return the revisions recorded in the database's alembic_version table."""
+    try:
+        with (bind or engine).connect() as connection:
+            return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+    except DBAPIError:
+        # Never migrated with Alembic
+        return set()
+
+def database_at_head(bind=None) -> bool:
+    """True if Alembic has migrated the database to the latest revision."""
+    current = get_database_revisions(bind)
+    return bool(current) and current == get_migration_heads()
+
+def create_database_tables() -> bool:
     """
     Create all database tables based on the defined models.
     
     This function should be called during application startup to ensure
-    all required tables exist in the database.
+    all required tables exist in the database. It does nothing when Alembic
+    reports the database at the latest revision, since every table exists.
+    
+    Returns:
+        bool: True if the tables were checked and created, False if skipped
     """
+    if database_at_head():
+        return False
     Base.metadata.create_all(bind=engine)
+    return True
 
 def check_database_connection():
     """
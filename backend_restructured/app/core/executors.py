@@ -0,0 +1,158 @@
+"""
+Blocking-work executors for the Smart CRM SaaS application.
+This module keeps a separately sized thread pool per kind of blocking work
+(database queries, password hashing, PDF rendering, network and file I/O), so
+a burst of one kind queues in its own pool instead of starving the others in
+AnyIO's shared threadpool. Each pool records its queue depth and the time
+work spends waiting for a thread.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class NamedExecutor(Executor):
+    """
+    Thread pool with queue and timing metrics.
+
+    Threads are created on first use, so a pool touched only by request
+    handlers has no threads in the master process before ``serve.py`` forks.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.run_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Work submitted but not yet picked up by a thread."""
+        return self.submitted - self.started
+
+    @property
+    def running(self) -> int:
+        return self.started - self.completed - self.failed
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._pool
+
+    def submit(self, fn: Callable[..., T], /, *args, **kwargs) -> "Future[T]":
+        pool = self._get_pool()
+        with self._lock:
+            self.submitted += 1
+        try:
+            future = pool.submit(self._run, time.perf_counter(), fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.submitted -= 1
+            raise
+        future.add_done_callback(self._discard_if_cancelled)
+        return future
+
+    def _discard_if_cancelled(self, future: Future):
+        # Only queued work can be cancelled; it never reaches _run, so it no longer counts as queued
+        if future.cancelled():
+            with self._lock:
+                self.submitted -= 1
+
+    def _run(self, submitted_at: float, fn: Callable[..., T], args, kwargs) -> T:
+        started_at = time.perf_counter()
+        waited = started_at - submitted_at
+        with self._lock:
+            self.started += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self.run_time += time.perf_counter() - started_at
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.queued,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.wait_time / self.started * 1000, 3) if self.started else 0.0,
+                "max_wait_ms": round(self.max_wait_time * 1000, 3),
+                "avg_run_ms": round(self.run_time / finished * 1000, 3) if finished else 0.0,
+            }
+
+
+class ExecutorRegistry:
+    """Named executors sized from ``EXECUTOR_WORKERS``; the render pool defaults to ``REPORT_RENDER_WORKERS``."""
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None):
+        if sizes is None:
+            sizes = {"render": settings.REPORT_RENDER_WORKERS, **settings.EXECUTOR_WORKERS}
+        self._executors: Dict[str, NamedExecutor] = {
+            name: NamedExecutor(name, int(max_workers)) for name, max_workers in sizes.items()
+        }
+
+    def get(self, name: str) -> NamedExecutor:
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise KeyError(f"Unknown executor '{name}'") from None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: executor.stats() for name, executor in self._executors.items()}
+
+    def shutdown(self, wait: bool = True):
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+executors = ExecutorRegistry()
+
+
+async def run_blocking(pool: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking call on the named executor and await its result.
+
+    Context variables are copied into the worker thread, as with
+    ``run_in_threadpool``. If the caller is cancelled before a thread picks
+    the call up, it is dropped from the queue.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(func, *args, **kwargs)
+    future = executors.get(pool).submit(context.run, call)
+    return await asyncio.wrap_future(future)
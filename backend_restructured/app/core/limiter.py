@@ -1,5 +1,374 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+"""
+Request rate limiting for the Smart CRM SaaS application.
+This module limits requests per authenticated user or API key with token
+buckets. Decisions are made in-process; workers share consumption through a
+backend that is synchronized in the background.
+"""
 
-limiter = Limiter(key_func=get_remote_address)
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from jose import JWTError, jwt
+
+from .config import settings
+from ..utils.resp import RespClient
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend:
+    """Base class for the store that shares consumption between workers."""
+
+    async def sync(self, consumed: Dict[str, int]) -> Dict[str, int]:
+        """
+        Add this worker's consumption since the last sync to the shared totals.
+
+        Returns:
+            Dict[str, int]: The total consumption of every key, across workers
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Close connections to the store."""
+
+
+class InProcessRateLimitBackend(RateLimitBackend):
+    """Totals for a single worker; nothing is shared."""
+
+    def __init__(self):
+        self._totals: Dict[str, int] = {}
+
+    async def sync(self, consumed: Dict[str, int]) -> Dict[str, int]:
+        for key, count in consumed.items():
+            self._totals[key] = self._totals.get(key, 0) + count
+        return {key: self._totals[key] for key in consumed}
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Totals kept in Redis counters.
+
+    Each sync is one pipelined round trip of INCRBY and EXPIRE per active key.
+    Counters expire once a key has been idle for ``ttl`` seconds.
+    """
+
+    def __init__(self, url: str, ttl: int = 300, prefix: str = "ratelimit:"):
+        self.client = RespClient(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def sync(self, consumed: Dict[str, int]) -> Dict[str, int]:
+        keys = list(consumed)
+        commands = []
+        for key in keys:
+            commands.append(("INCRBY", self.prefix + key, consumed[key]))
+            commands.append(("EXPIRE", self.prefix + key, self.ttl))
+        replies = await self.client.pipeline(commands)
+        return {key: replies[index * 2] for index, key in enumerate(keys)}
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_rate_limit_backend(url: Optional[str] = None) -> RateLimitBackend:
+    """Create the backend for ``url`` or the RATE_LIMIT_BACKEND_URL setting."""
+    url = url or settings.RATE_LIMIT_BACKEND_URL
+    scheme = urlparse(url).scheme
+    if scheme in ("memory", ""):
+        return InProcessRateLimitBackend()
+    if scheme in ("redis", "rediss"):
+        return RedisRateLimitBackend(url)
+    raise ValueError(f"Unsupported rate limit backend: {url}")
+
+
+class TokenBucket:
+    """Tokens refill at ``rate`` per second up to ``capacity``."""
+
+    __slots__ = ("tokens", "updated", "consumed", "synced_total")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+        # Consumed here since the last sync, and the shared total seen at that sync
+        self.consumed = 0
+        self.synced_total = 0
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter with per-route-class budgets.
+
+    ``check`` only touches an in-process bucket, so it costs a dictionary
+    lookup and some arithmetic. Every ``sync_interval`` seconds the tokens
+    taken on this worker are pushed to the backend and the tokens taken by
+    other workers are deducted locally, which keeps the combined rate close
+    to the budget; it can overshoot by at most what other workers consume
+    within one sync interval.
+    """
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, Iterable[float]]] = None,
+        route_classes: Optional[Dict[str, str]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        sync_interval: Optional[float] = None,
+        token_cache_size: int = 10000,
+    ):
+        classes = classes or settings.RATE_LIMIT_CLASSES
+        # name -> (tokens per second, burst capacity)
+        self.classes: Dict[str, Tuple[float, float]] = {
+            name: (float(rate), float(capacity)) for name, (rate, capacity) in classes.items()
+        }
+        route_classes = settings.RATE_LIMIT_ROUTE_CLASSES if route_classes is None else route_classes
+        # Longest prefix first, so the most specific route class wins
+        self.route_classes: List[Tuple[str, str]] = sorted(
+            route_classes.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.backend = backend
+        self.sync_interval = sync_interval or settings.RATE_LIMIT_SYNC_INTERVAL
+        self.token_cache_size = token_cache_size
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def route_class(self, path: str) -> str:
+        for prefix, name in self.route_classes:
+            if path.startswith(prefix):
+                return name
+        return "default"
+
+    def identity_from_token(self, token: str) -> Optional[str]:
+        """Return the verified subject of a bearer token, caching it until the token expires."""
+        cached = self._tokens.get(token)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        subject = payload.get("sub")
+        if subject is None:
+            return None
+        if len(self._tokens) >= self.token_cache_size:
+            # Bounded without LRU bookkeeping on the hot path
+            self._tokens.clear()
+        self._tokens[token] = (f"user:{subject}", payload.get("exp", float("inf")))
+        return self._tokens[token][0]
+
+    def check(self, route_class: str, identity: str, cost: int = 1) -> float:
+        """
+        Take ``cost`` tokens from the identity's bucket for ``route_class``.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise seconds until it would be
+        """
+        rate, capacity = self.classes.get(route_class) or self.classes["default"]
+        key = f"{route_class}:{identity}"
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(capacity, now)
+        else:
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            bucket.consumed += cost
+            return 0.0
+        if rate <= 0:
+            return float("inf")
+        return (cost - bucket.tokens) / rate
+
+    async def sync(self):
+        """Exchange consumption with the backend and drop idle buckets."""
+        now = time.monotonic()
+        # Buckets with nothing to push still sync to learn what other workers took
+        consumed = {
+            key: bucket.consumed for key, bucket in self._buckets.items() if bucket.consumed or bucket.synced_total
+        }
+        if consumed and self.backend is not None:
+            # Reset before awaiting; requests keep counting while the sync is in flight
+            for key in consumed:
+                self._buckets[key].consumed = 0
+            try:
+                totals = await self.backend.sync(consumed)
+            except Exception as e:
+                # Put the counts back so they are pushed on the next sync
+                for key, count in consumed.items():
+                    if key in self._buckets:
+                        self._buckets[key].consumed += count
+                raise e
+            for key, total in totals.items():
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                others = total - bucket.synced_total - consumed[key]
+                if bucket.synced_total and others > 0:
+                    bucket.tokens -= others
+                bucket.synced_total = total
+
+        for key, bucket in list(self._buckets.items()):
+            rate, capacity = self.classes.get(key.split(":", 1)[0]) or self.classes["default"]
+            # A bucket idle long enough to have refilled is the same as a new one
+            if not bucket.consumed and rate > 0 and now - bucket.updated > capacity / rate:
+                del self._buckets[key]
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Rate limit sync failed: {e}")
+
+    def start(self):
+        """Start background synchronization on the running event loop."""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        if self.backend is not None:
+            await self.backend.close()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that applies ``RateLimiter`` to every HTTP request.
+
+    Requests are identified by a valid API key (``X-API-Key``), then by the
+    subject of a valid bearer token, then by client address. API keys are
+    checked through ``authenticator`` (an ``APIKeyAuthenticator``), so an
+    unknown key cannot buy a fresh bucket; without one, API keys are ignored.
+    Rejected requests get a 429 with ``Retry-After``.
+
+    With ``trust_forwarded`` the client address is the last ``X-Forwarded-For``
+    entry, the one appended by the load balancer; earlier entries come from
+    the client and could be forged.
+
+    Route classes in ``username_classes`` are also keyed by the ``username``
+    field of a form body, so failed logins for one account cannot lock out
+    every other account behind the same address.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: "RateLimiter",
+        authenticator=None,
+        trust_forwarded: Optional[bool] = None,
+        username_classes: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.authenticator = authenticator
+        self.trust_forwarded = settings.RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+        self.username_classes = frozenset(
+            settings.RATE_LIMIT_USERNAME_CLASSES if username_classes is None else username_classes
+        )
+        self._warned_forwarded = False
+
+    async def _identity(self, scope) -> str:
+        authorization = api_key = forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+            elif name == b"x-api-key":
+                api_key = value
+            elif name == b"x-forwarded-for":
+                forwarded = value
+        if api_key and self.authenticator is not None:
+            api_key_id = await self.authenticator.resolve(api_key.decode("latin-1"))
+            if api_key_id is not None:
+                return f"key:{api_key_id}"
+        if authorization and authorization[:7].lower() == b"bearer ":
+            identity = self.limiter.identity_from_token(authorization[7:].decode("latin-1"))
+            if identity is not None:
+                return identity
+        if forwarded and self.trust_forwarded:
+            return "ip:" + forwarded.rsplit(b",", 1)[-1].strip().decode("latin-1")
+        if forwarded and not self._warned_forwarded:
+            self._warned_forwarded = True
+            logger.warning(
+                "X-Forwarded-For received but RATE_LIMIT_TRUST_FORWARDED is off; "
+                "unauthenticated clients behind the proxy share its rate limit buckets"
+            )
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    async def _read_username(scope, receive):
+        """
+        Read the ``username`` field of a form body.
+
+        Returns the username (None if there is none) and a receive callable
+        that replays the consumed body to the application.
+        """
+        headers = dict(scope["headers"])
+        content_type = headers.get(b"content-type", b"").split(b";", 1)[0].strip().lower()
+        content_length = headers.get(b"content-length", b"0")
+        if (content_type != b"application/x-www-form-urlencoded"
+                or not content_length.isdigit() or int(content_length) > settings.RATE_LIMIT_MAX_FORM_SIZE):
+            return None, receive
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False) or size > settings.RATE_LIMIT_MAX_FORM_SIZE:
+                break
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        last = messages[-1]
+        if last["type"] != "http.request" or last.get("more_body", False):
+            return None, replay
+        body = b"".join(message.get("body", b"") for message in messages)
+        usernames = parse_qs(body.decode("latin-1")).get("username")
+        username = usernames[0].strip().lower()[:254] if usernames else None
+        return username or None, replay
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self.limiter.route_class(scope["path"])
+        identity = await self._identity(scope)
+        if route_class in self.username_classes:
+            username, receive = await self._read_username(scope, receive)
+            if username is not None:
+                identity = f"{identity}|username:{username}"
+        retry_after = self.limiter.check(route_class, identity)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, int(min(retry_after, 86400)) + 1)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = RateLimiter(backend=create_rate_limit_backend())
@@ -4,8 +4,8 @@ This module provides a flexible RBAC system with role hierarchy, permission deco
 and middleware for protecting API endpoints.
 """
 
-from functools import wraps
-from typing import Callable, Dict, List, Set 
+from functools import lru_cache, wraps
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from fastapi import Depends, HTTPException, Request, status
 
@@ -22,38 +22,96 @@ ROLE_HIERARCHY: Dict[str, List[str]] = {
 }
 
 # Define permissions for each role.
-# Permissions are additive and inherited from parent roles.
+# Permissions are additive and inherited from parent roles. The bare verbs
+# ('read', 'create', ...) are the legacy coarse permissions checked by
+# security.check_user_permissions.
 PERMISSIONS: Dict[str, List[str]] = {
     "admin": [
-        "users:create", "users:delete", "roles:manage", "system:config"
+        "users:create", "users:delete", "roles:manage", "system:config",
+        "manage_users"
     ],
     "manager": [
         "clients:create", "clients:update", "clients:delete",
         "projects:create", "projects:update", "projects:delete",
-        "reports:generate"
+        "reports:generate",
+        "delete"
     ],
     "user": [
-        "clients:read", "projects:read", "tasks:create", "tasks:update"
+        "clients:read", "projects:read", "tasks:create", "tasks:update",
+        "create", "update"
     ],
     "viewer": [
-        "dashboard:read"
+        "dashboard:read",
+        "read"
     ],
 }
 
-def get_role_permissions(role: str) -> Set[str]:
+
+def _resolve_role(role: str, seen: FrozenSet[str] = frozenset()) -> FrozenSet[str]:
+    if role in seen:
+        raise ValueError(f"Cycle in ROLE_HIERARCHY at role '{role}'")
+    permissions = set(PERMISSIONS.get(role, []))
+    for parent_role in ROLE_HIERARCHY.get(role, []):
+        permissions.update(_resolve_role(parent_role, seen | {role}))
+    return frozenset(permissions)
+
+
+# Resolved once at import; roles never change while the application runs
+ROLE_PERMISSIONS: Dict[str, FrozenSet[str]] = {
+    role: _resolve_role(role) for role in set(ROLE_HIERARCHY) | set(PERMISSIONS)
+}
+
+# One bit per known permission, so a set of permissions is a single int
+PERMISSION_BITS: Dict[str, int] = {
+    permission: 1 << index
+    for index, permission in enumerate(sorted(set().union(*ROLE_PERMISSIONS.values())))
+}
+
+ROLE_MASKS: Dict[str, int] = {
+    role: sum(PERMISSION_BITS[permission] for permission in permissions)
+    for role, permissions in ROLE_PERMISSIONS.items()
+}
+
+EMPTY_PERMISSIONS: FrozenSet[str] = frozenset()
+
+
+def get_role_permissions(role: str) -> FrozenSet[str]:
     """
     Get all permissions for a given role, including inherited permissions.
     """
-    permissions = set(PERMISSIONS.get(role, []))
-    for parent_role in ROLE_HIERARCHY.get(role, []):
-        permissions.update(get_role_permissions(parent_role))
-    return permissions
+    return ROLE_PERMISSIONS.get(role, EMPTY_PERMISSIONS)
+
+
+def permission_mask(permissions: Union[str, Iterable[str]]) -> int:
+    """
+    Combine permissions into a bitmask for ``has_permissions``.
+
+    Raises:
+        ValueError: If a permission is not granted to any role, which is
+            almost always a typo
+    """
+    if isinstance(permissions, str):
+        permissions = [permissions]
+    mask = 0
+    for permission in permissions:
+        bit = PERMISSION_BITS.get(permission)
+        if bit is None:
+            raise ValueError(f"Unknown permission: {permission}")
+        mask |= bit
+    return mask
+
+
+def has_permissions(role: Optional[str], mask: int) -> bool:
+    """Check that ``role`` holds every permission in ``mask``."""
+    return ROLE_MASKS.get(role, 0) & mask == mask
 
 
 def require_permission(required_permission: str) -> Callable:
     """
     Decorator to protect an endpoint, requiring a specific permission.
     """
+    mask = permission_mask(required_permission)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -64,8 +122,7 @@ def require_permission(required_permission: str) -> Callable:
                     detail="Authentication required",
                 )
 
-            user_permissions = get_role_permissions(current_user.role)
-            if required_permission not in user_permissions:
+            if not has_permissions(current_user.role, mask):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You do not have permission to perform this action.",
@@ -104,22 +161,37 @@ def check_permissions(user: User, required_permission: str) -> bool:
     """
     if not user:
         return False
-    user_permissions = get_role_permissions(user.role)
-    return required_permission in user_permissions
+    return required_permission in get_role_permissions(user.role)
 
 
-def require_permissions(required_permission: str):
+def require_permissions(required_permissions: Union[str, Iterable[str]]) -> Callable:
     """
-    Dependency function to check if current user has required permission.
+    Dependency function to check if current user has required permissions.
+    
+    The permissions are compiled to a bitmask once, when the route is
+    declared, and the same dependency is returned for the same permissions.
+    The user comes from ``get_current_user``, which FastAPI resolves once per
+    request and shares with the endpoint, so the check itself is a single
+    mask comparison.
     
     Args:
-        required_permission: The permission string to check (e.g. 'clients:read')
+        required_permissions: A permission string (e.g. 'clients:read') or a
+            list of permissions that are all required
         
     Returns:
         Dependency function for FastAPI
     """
+    if isinstance(required_permissions, str):
+        required_permissions = [required_permissions]
+    return _permission_dependency(tuple(sorted(set(required_permissions))))
+
+
+@lru_cache(maxsize=None)
+def _permission_dependency(required_permissions: Tuple[str, ...]) -> Callable:
+    mask = permission_mask(required_permissions)
+
     def permission_dependency(current_user: User = Depends(get_current_user)):
-        if not check_permissions(current_user, required_permission):
+        if not has_permissions(current_user.role, mask):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to perform this action."
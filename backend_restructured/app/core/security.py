@@ -2,11 +2,12 @@
 This module contains authentication, authorization, and security-related functions.
 """
 
+import contextvars
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
@@ -14,6 +15,8 @@ from sqlalchemy.orm import Session
 from ..models.user_model import User
 from ..core.database import get_database_session
 from ..core.config import settings
+from ..core.executors import run_blocking
+from ..services.api_key_service import api_key_authenticator
 
 # Security configuration - use settings from config
 SECRET_KEY = settings.SECRET_KEY
@@ -52,25 +55,38 @@ def check_user_permissions(user_role: str, required_permission: str) -> bool:
     Returns:
         bool: True if user has permission, False otherwise
     """
-    role_permissions = {
-        "admin": ["create", "read", "update", "delete", "manage_users"],
-        "manager": ["create", "read", "update", "delete"],
-        "user": ["create", "read", "update"],
-        "viewer": ["read"]
-    }
-    
-    user_permissions = role_permissions.get(user_role, [])
-    return required_permission in user_permissions
+    # The role tables live in rbac, which imports this module
+    from .rbac import get_role_permissions
+    return required_permission in get_role_permissions(user_role)
+
+# User already authenticated for this call, set for batch sub-requests
+shared_principal: contextvars.ContextVar[Optional[User]] = contextvars.ContextVar("shared_principal", default=None)
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_database_session)) -> User:
-    """Get the current authenticated user."""
+async def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_header),
+    db: Session = Depends(get_database_session),
+) -> User:
+    """Get the current authenticated user from a bearer token or an ``X-API-Key`` header."""
+    principal = shared_principal.get()
+    if principal is not None:
+        return principal
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if token is None and api_key:
+        return await run_blocking("db", get_api_key_user, api_key, db)
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -83,3 +99,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if user is None:
         raise credentials_exception
     return user
+
+def get_api_key_user(api_key: str, db: Session) -> User:
+    """Get the user owning an API key."""
+    user_id = api_key_authenticator.authenticate(db, api_key)
+    user = db.get(User, user_id) if user_id is not None else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+            headers={"WWW-Authenticate": "APIKey"},
+        )
+    return user
@@ -0,0 +1,282 @@
+"""
+Production server for the Smart CRM SaaS application.
+This module runs the ASGI app in preforked uvicorn workers that share one
+listening socket. The app is imported once in the master before forking, so
+workers share its memory copy-on-write, and SIGTERM drains in-flight requests
+before the workers exit.
+"""
+
+import gc
+import importlib.util
+import logging
+import math
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Exit status of a worker whose lifespan startup failed
+WORKER_BOOT_ERROR = 3
+
+
+def cpu_quota(cgroup_root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Return the CPU limit of the container in cores, or None if there is none.
+
+    Reads ``cpu.max`` (cgroup v2) or ``cpu.cfs_quota_us`` and
+    ``cpu.cfs_period_us`` (cgroup v1).
+    """
+    try:
+        quota, period = (cgroup_root / "cpu.max").read_text().split()
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((cgroup_root / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def available_cpus(cgroup_root: Path = CGROUP_ROOT) -> int:
+    """Return the number of CPUs this process may use, honouring affinity and cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cpu_quota(cgroup_root)
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    """One async worker per available CPU unless SERVER_WORKERS sets the count."""
+    configured = settings.SERVER_WORKERS if configured is None else configured
+    return configured if configured > 0 else available_cpus()
+
+
+def best_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def best_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Master process that forks uvicorn workers and supervises them.
+
+    Workers that die while the server is running are replaced. A slot whose
+    workers keep dying early is restarted with exponential backoff, from
+    ``restart_backoff`` up to ``restart_backoff_max`` seconds, and the master
+    exits with status 1 once a slot's worker fails its lifespan startup
+    ``max_boot_failures`` times in a row, since restarting will not fix an
+    unreachable database or a bad configuration. On SIGTERM or SIGINT the
+    master forwards the signal, uvicorn in each worker stops accepting
+    connections and finishes the requests in flight, and workers still
+    running after ``graceful_timeout`` seconds are killed.
+    """
+
+    def __init__(
+        self,
+        app,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        workers: Optional[int] = None,
+        backlog: Optional[int] = None,
+        graceful_timeout: Optional[int] = None,
+        keepalive_timeout: Optional[int] = None,
+        loop: Optional[str] = None,
+        http: Optional[str] = None,
+        access_log: bool = False,
+        restart_backoff: Optional[float] = None,
+        restart_backoff_max: Optional[float] = None,
+        max_boot_failures: Optional[int] = None,
+    ):
+        self.app = app
+        self.host = host or settings.SERVER_HOST
+        self.port = settings.SERVER_PORT if port is None else port
+        self.workers = worker_count(workers)
+        self.backlog = backlog or settings.SERVER_BACKLOG
+        self.graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT if graceful_timeout is None else graceful_timeout
+        self.keepalive_timeout = keepalive_timeout or settings.SERVER_KEEPALIVE_TIMEOUT
+        self.loop = loop or best_loop()
+        self.http = http or best_http()
+        self.access_log = access_log
+        self.restart_backoff = settings.SERVER_RESTART_BACKOFF if restart_backoff is None else restart_backoff
+        self.restart_backoff_max = restart_backoff_max or settings.SERVER_RESTART_BACKOFF_MAX
+        self.max_boot_failures = max_boot_failures or settings.SERVER_MAX_BOOT_FAILURES
+        self.socket: Optional[socket.socket] = None
+        self._children: Dict[int, int] = {}
+        self._spawned_at: Dict[int, float] = {}
+        # Per slot: consecutive early deaths, consecutive boot failures, and pending restart times
+        self._early_deaths: Dict[int, int] = {}
+        self._boot_failures: Dict[int, int] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._stopping = False
+        self._exit_status = 0
+
+    def _run_worker(self) -> bool:
+        """Serve until shutdown. Returns False if the lifespan startup failed."""
+        import uvicorn
+
+        # The master's handlers would otherwise stay installed until uvicorn replaces them
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Pooled connections opened in the master must not be shared between processes
+        from .database import engine
+        engine.dispose(close=False)
+
+        config = uvicorn.Config(
+            self.app,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            access_log=self.access_log,
+            timeout_keep_alive=self.keepalive_timeout,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            backlog=self.backlog,
+        )
+        server = uvicorn.Server(config)
+        server.run(sockets=[self.socket])
+        return server.started
+
+    def _spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                if not self._run_worker():
+                    status = WORKER_BOOT_ERROR
+            except BaseException as e:
+                logger.error(f"Worker {slot} failed: {e}")
+                status = 1
+            finally:
+                os._exit(status)
+        self._children[pid] = slot
+        self._spawned_at[pid] = time.monotonic()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self, block: bool) -> Optional[int]:
+        try:
+            pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            return None
+        if pid == 0:
+            return None
+        slot = self._children.pop(pid, None)
+        spawned_at = self._spawned_at.pop(pid, None)
+        if not self._stopping and slot is not None:
+            self._schedule_restart(slot, pid, os.waitstatus_to_exitcode(status), spawned_at)
+        return pid
+
+    def _schedule_restart(self, slot: int, pid: int, exit_code: int, spawned_at: Optional[float]):
+        """Plan the replacement of a dead worker, backing off if the slot keeps failing."""
+        if exit_code == WORKER_BOOT_ERROR:
+            self._boot_failures[slot] = self._boot_failures.get(slot, 0) + 1
+            if self._boot_failures[slot] >= self.max_boot_failures:
+                logger.error(
+                    f"Worker {slot} failed to start {self._boot_failures[slot]} times in a row; shutting down"
+                )
+                self._exit_status = 1
+                self._handle_stop(None, None)
+                return
+        else:
+            self._boot_failures[slot] = 0
+
+        # A worker that stayed up longer than the longest backoff resets the slot's backoff
+        lived = time.monotonic() - spawned_at if spawned_at is not None else 0.0
+        if lived >= self.restart_backoff_max:
+            self._early_deaths[slot] = 0
+        deaths = self._early_deaths.get(slot, 0)
+        delay = min(self.restart_backoff * 2 ** (deaths - 1), self.restart_backoff_max) if deaths else 0.0
+        self._early_deaths[slot] = deaths + 1
+        logger.warning(
+            f"Worker {slot} (pid {pid}) exited with status {exit_code}; restarting in {delay:.1f}s"
+        )
+        self._restart_at[slot] = time.monotonic() + delay
+
+    def _restart_due(self) -> Optional[float]:
+        """Spawn workers whose restart time has come. Returns seconds until the next one, if any."""
+        now = time.monotonic()
+        for slot, restart_at in list(self._restart_at.items()):
+            if restart_at <= now:
+                del self._restart_at[slot]
+                self._spawn(slot)
+        if not self._restart_at:
+            return None
+        return max(min(self._restart_at.values()) - now, 0.0)
+
+    def run(self) -> int:
+        self.socket = bind_socket(self.host, self.port, self.backlog)
+        self.port = self.socket.getsockname()[1]
+        logger.info(
+            f"Serving on {self.host}:{self.port} with {self.workers} worker(s), "
+            f"loop={self.loop}, http={self.http}"
+        )
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        # Objects allocated so far are never collected, so the collector does
+        # not write to (and unshare) the pages they live on in every worker
+        gc.collect()
+        gc.freeze()
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        while not self._stopping:
+            wait = self._restart_due()
+            try:
+                if wait is None:
+                    self._reap(block=True)
+                elif self._reap(block=False) is None:
+                    time.sleep(min(wait, 0.1))
+            except InterruptedError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            if self._reap(block=False) is None:
+                time.sleep(0.1)
+        for pid in list(self._children):
+            logger.warning(f"Worker pid {pid} did not drain in time; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self._children and self._reap(block=True) is not None:
+            pass
+        self.socket.close()
+        logger.info("All workers stopped")
+        return self._exit_status
@@ -0,0 +1,116 @@
+"""
+Request coalescing for the Smart CRM SaaS application.
+This module lets an endpoint opt in to single-flight execution: while a call
+with the same route and parameters is in flight, identical calls wait for
+its result instead of computing it again.
+"""
+
+import asyncio
+import datetime
+import enum
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_SIMPLE_TYPES = (str, int, float, bool, type(None), datetime.date, datetime.time, datetime.timedelta)
+
+
+class SingleFlight:
+    """In-flight calls of one route, keyed by their normalized parameters."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await ``func()``, or the in-flight call with the same key if there is one."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        # A caller going away must not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieve the exception so a call whose callers all left is not reported as unhandled
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def _is_plain(value: Any) -> bool:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_is_plain(item) for item in value)
+    return isinstance(value, (enum.Enum,) + _SIMPLE_TYPES)
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_normalize(item) for item in value), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, _SIMPLE_TYPES):
+        return value
+    return repr(value)
+
+
+def single_flight(name: str, vary_on: Optional[Sequence[str]] = None):
+    """
+    Coalesce concurrent identical calls of an async endpoint.
+
+    The key is the route ``name`` plus the endpoint's parameters: those listed
+    in ``vary_on``, or by default every parameter with a plain value (path,
+    query and body scalars). Dependencies such as the database session and
+    the current user are not part of the default key, so only opt in routes
+    whose response is the same for every caller, or list the parameters that
+    make it differ; objects are keyed by their ``id``, so ``current_user``
+    can be listed. Apply it below the route decorator.
+
+    The shared call runs with the first caller's arguments and keeps running
+    if that caller disconnects, after its dependencies have been torn down.
+    It must not use request-scoped resources such as the caller's database
+    session; open a new one with ``call_with_new_session``.
+    """
+    group = _groups.setdefault(name, SingleFlight(name))
+
+    def decorator(endpoint: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs) -> T:
+            if vary_on is None:
+                parameters = {
+                    param: _normalize(value) for param, value in kwargs.items() if _is_plain(value)
+                }
+            else:
+                parameters = {param: _normalize(getattr(kwargs.get(param), "id", kwargs.get(param)))
+                              for param in vary_on}
+            key = tuple(sorted(parameters.items()))
+            return await group.do(key, lambda: endpoint(*args, **kwargs))
+
+        wrapper.single_flight = group
+        return wrapper
+
+    return decorator
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    return {name: group.stats() for name, group in _groups.items()}
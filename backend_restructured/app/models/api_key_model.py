@@ -12,7 +12,9 @@ class APIKey(Base):
     __tablename__ = "api_keys"
 
     id = Column(Integer, primary_key=True, index=True)
-    key = Column(String, unique=True, index=True, nullable=False)
+    # Only a SHA-256 of the key is stored; the key itself is shown once, on creation
+    key_hash = Column(String(64), unique=True, index=True, nullable=False)
+    prefix = Column(String(8), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_used_at = Column(DateTime, nullable=True)
@@ -2,7 +2,7 @@
 Automated Task model for the Smart CRM SaaS application.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,6 +10,10 @@ from ..core.database import Base
 
 class AutomatedTask(Base):
     __tablename__ = "automated_tasks"
+    __table_args__ = (
+        # Serves the task runner's due-task poll: is_completed = 0 AND scheduled_time <= now
+        Index("ix_automated_tasks_due", "is_completed", "scheduled_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_type = Column(String, nullable=False)  # e.g., 'reminder', 'follow_up', 'report_generation'
@@ -21,4 +25,10 @@ class AutomatedTask(Base):
     details = Column(Text, nullable=True)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
+    # Task runner bookkeeping
+    claimed_by = Column(String, nullable=True)  # Claim token of the worker running the task
+    claimed_at = Column(DateTime, nullable=True)  # Claims older than the lease can be re-taken
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
     created_by_user = relationship("User")
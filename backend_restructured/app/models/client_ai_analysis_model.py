@@ -0,0 +1,27 @@
+"""
+Client AI Analysis model for the Smart CRM SaaS application.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from ..core.database import Base
+
+class ClientAIAnalysis(Base):
+    __tablename__ = "client_ai_analysis"
+    __table_args__ = (
+        UniqueConstraint("client_id", "analysis_type", name="uq_client_ai_analysis_client_type"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
+    analysis_type = Column(String, nullable=False)  # e.g. 'summary'
+    result = Column(Text, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_hash = Column(String(64), nullable=False)  # sha256 of (model, prompt)
+    data_version = Column(String(64), nullable=False)  # sha256 of the client fields, notes and history used
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    client = relationship("Client")
@@ -0,0 +1,44 @@
+"""
+Email Outbox model for the Smart CRM SaaS application.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from ..core.database import Base
+
+class EmailOutboxContent(Base):
+    __tablename__ = "email_outbox_content"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject = Column(String, nullable=False)
+    html_content = Column(Text, nullable=False)
+    plain_text_content = Column(Text, nullable=True)
+    attachments = Column(JSON, nullable=True)  # [{"filename", "content" (base64), "type"}]
+    content_key = Column(String(64), nullable=False)  # Hash of the content; equal keys are sent in one batch
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    messages = relationship("EmailOutbox", back_populates="content")
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Serves the outbox worker's poll: status = 'pending' AND next_attempt_at <= now
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+        Index("ix_email_outbox_message_content", "content_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    content_id = Column(Integer, ForeignKey("email_outbox_content.id"), nullable=False)
+    status = Column(String, default="pending", nullable=False)  # 'pending', 'sending', 'sent', 'failed'
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = Column(String, nullable=True)  # Claim token of the worker sending the message
+    claimed_at = Column(DateTime, nullable=True)  # 'sending' claims older than the lease can be re-taken
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    content = relationship("EmailOutboxContent", back_populates="messages")
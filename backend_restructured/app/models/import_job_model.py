@@ -0,0 +1,27 @@
+"""
+Import Job model for the Smart CRM SaaS application.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from datetime import datetime
+
+from ..core.database import Base
+
+class ImportJobRecord(Base):
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        # Serves the per-user job listing, newest first
+        Index("ix_import_jobs_user_started", "user_id", "started_at"),
+    )
+
+    id = Column(String(32), primary_key=True)  # Job ID handed to the client
+    entity = Column(String, nullable=False)  # e.g. 'client'
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default="queued")  # 'queued', 'running', 'completed', 'failed'
+    processed = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    detail = Column(Text, nullable=True)
+    error_file = Column(String, nullable=True)  # Path of the NDJSON file of rejected rows
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -2,7 +2,7 @@
 Notification model for the Smart CRM SaaS application.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,6 +10,12 @@ from ..core.database import Base
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Serves paginated listing and unread counts
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        # Serves retention pruning, which filters on is_read and created_at across all users
+        Index("ix_notifications_read_created", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -2,7 +2,7 @@
 Scheduled Report model for the Smart CRM SaaS application.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,6 +10,10 @@ from ..core.database import Base
 
 class ScheduledReport(Base):
     __tablename__ = "scheduled_reports"
+    __table_args__ = (
+        # Serves the report scheduler's due poll: is_active = 1 AND next_run_at <= now
+        Index("ix_scheduled_reports_due", "is_active", "next_run_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,6 +22,8 @@ class ScheduledReport(Base):
     schedule_interval = Column(String, nullable=False)  # e.g., 'daily', 'weekly', 'monthly'
     last_run_at = Column(DateTime, nullable=True)
     next_run_at = Column(DateTime, nullable=False)
+    run_day = Column(Integer, nullable=True)  # Day of month monthly runs keep; next_run_at may be clamped
+    failed_runs = Column(Integer, default=0, nullable=False)  # Consecutive failed attempts at the due run
     recipients = Column(Text, nullable=False)  # Comma-separated emails or user IDs
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,14 @@
+"""
+Worker Lease model for the Smart CRM SaaS application.
+"""
+
+from sqlalchemy import Column, String, DateTime
+
+from ..core.database import Base
+
+class WorkerLease(Base):
+    __tablename__ = "worker_leases"
+
+    name = Column(String, primary_key=True)  # Background job the lease guards, e.g. 'email_outbox'
+    holder = Column(String, nullable=False)  # Worker ID of the process holding the lease
+    expires_at = Column(DateTime, nullable=False)  # Another worker may take the lease after this
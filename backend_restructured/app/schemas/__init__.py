@@ -8,11 +8,11 @@ from .user_schemas import (
     UserToken, UserListResponse, PasswordChange
 )
 from .client_schemas import (
-    ClientBase, ClientCreate, ClientUpdate, ClientResponse,
-    ClientListResponse, ClientSummary, ClientSearchFilters, ClientStats
+    ClientBase, ClientCreate, ClientUpdate, ClientResponse, ClientDetailResponse,
+    ClientListResponse, ClientDetailListResponse, ClientSummary, ClientSearchFilters, ClientStats
 )
 from .project_schemas import (
-    ProjectBase, ProjectCreate, ProjectUpdate, ProjectResponse,
+    ProjectBase, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse,
     ProjectListResponse, ProjectSummary, ProjectSearchFilters,
     ProjectStats, ProjectMilestone, ProjectCreateBulk, ProjectUpdateBulk, ProjectDeleteBulk
 )
@@ -34,12 +34,12 @@ __all__ = [
     "UserLogin", "UserToken", "UserListResponse", "PasswordChange",
     
     # Client schemas
-    "ClientBase", "ClientCreate", "ClientUpdate", "ClientResponse",
-    "ClientListResponse", "ClientSummary", "ClientSearchFilters",
+    "ClientBase", "ClientCreate", "ClientUpdate", "ClientResponse", "ClientDetailResponse",
+    "ClientListResponse", "ClientDetailListResponse", "ClientSummary", "ClientSearchFilters",
     "ClientStats",
     
     # Project schemas
-    "ProjectBase", "ProjectCreate", "ProjectUpdate", "ProjectResponse",
+    "ProjectBase", "ProjectCreate", "ProjectUpdate", "ProjectResponse", "ProjectDetailResponse",
     "ProjectListResponse", "ProjectSummary", "ProjectSearchFilters",
     "ProjectStats", "ProjectMilestone", "ProjectCreateBulk", "ProjectUpdateBulk", "ProjectDeleteBulk",
     
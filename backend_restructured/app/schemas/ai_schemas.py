@@ -4,6 +4,7 @@ AI schemas for Smart CRM SaaS application.
 
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
+from datetime import datetime
 
 class ClientAnalysisRequest(BaseModel):
     client_id: int = Field(..., description="ID of the client to analyze")
@@ -14,6 +15,20 @@ class ClientAnalysisResponse(BaseModel):
     analysis_type: str = Field(..., description="Type of analysis performed", example="summary")
     result: str = Field(..., description="Result of the analysis", example="Acme Corp is a technology client with 2 active projects.")
     insights: Optional[List[str]] = Field(None, description="List of key insights generated", example=["High project volume", "Strong technology focus"])
+    generated_at: Optional[datetime] = Field(None, description="When the result was generated")
+    stale: bool = Field(False, description="True if the client data changed since the result was generated; a refresh is under way")
+
+class ClientBatchAnalysisRequest(BaseModel):
+    client_ids: List[int] = Field(..., min_length=1, description="IDs of the clients to analyze")
+    analysis_type: str = Field("summary", description="Type of analysis to perform (e.g., 'summary')")
+
+class ClientBatchAnalysisItem(BaseModel):
+    """One NDJSON line of a batch client analysis response."""
+    client_id: int = Field(..., description="ID of the analyzed client", example=1)
+    analysis_type: str = Field(..., description="Type of analysis performed", example="summary")
+    result: Optional[str] = Field(None, description="Result of the analysis")
+    cached: bool = Field(False, description="True if the client data was unchanged and the stored result was reused")
+    error: Optional[str] = Field(None, description="Why the analysis failed for this client")
 
 class FinancialAnalysisRequest(BaseModel):
     start_date: str = Field(..., description="Start date for financial data (YYYY-MM-DD)")
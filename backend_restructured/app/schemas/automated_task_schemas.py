@@ -26,6 +26,18 @@ class AutomatedTaskResponse(AutomatedTaskBase):
     is_completed: bool = Field(..., example=False)
     completed_at: Optional[datetime] = Field(None, example="2023-07-15T09:30:00Z")
     created_by_id: int = Field(..., example=1)
+    attempts: Optional[int] = Field(0, example=0)
+    last_error: Optional[str] = Field(None, example=None)
 
     class Config:
         from_attributes = True
+
+class TaskRunnerMetrics(BaseModel):
+    claimed: int = Field(..., example=120)
+    completed: int = Field(..., example=117)
+    failed: int = Field(..., example=2)
+    running: int = Field(..., example=1)
+    average_lag_seconds: Optional[float] = Field(None, description="Average delay between scheduled_time and completion", example=2.4)
+    max_lag_seconds: float = Field(..., example=6.1)
+    average_run_seconds: Optional[float] = Field(None, description="Average handler execution time", example=0.03)
+    max_run_seconds: float = Field(..., example=0.4)
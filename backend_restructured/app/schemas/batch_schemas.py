@@ -0,0 +1,29 @@
+"""
+Batch request schemas for the Smart CRM SaaS application.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BatchSubRequest(BaseModel):
+    """Schema for one API call inside a batch."""
+    id: Optional[str] = Field(None, description="Caller-chosen identifier echoed in the response", example="stats")
+    method: str = Field("GET", description="HTTP method; batches are read-only, so only GET is accepted", example="GET")
+    path: str = Field(..., description="API path, optionally with a query string", example="/api/v1/dashboard/stats")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Extra request headers")
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of API calls dispatched together."""
+    requests: List[BatchSubRequest] = Field(..., min_length=1, description="Calls to dispatch concurrently")
+
+class BatchSubResponse(BaseModel):
+    """Schema for the outcome of one call inside a batch."""
+    id: Optional[str] = Field(None, description="Identifier of the sub-request", example="stats")
+    index: int = Field(..., description="Position of the sub-request in the batch", example=0)
+    status: int = Field(..., description="HTTP status code", example=200)
+    headers: Dict[str, str] = Field(default_factory=dict, description="Response headers")
+    body: Any = Field(None, description="Decoded JSON body, or the body as text")
+
+class BatchResponse(BaseModel):
+    """Schema for the outcome of a batch, in request order."""
+    responses: List[BatchSubResponse]
@@ -6,6 +6,7 @@ This module defines Pydantic models for client data validation and serialization
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from datetime import datetime
+from .related_schemas import RelatedInvoice, RelatedPayment, RelatedProject, RelatedUser
 
 class ClientBase(BaseModel):
     """
@@ -189,6 +190,23 @@ class ClientListResponse(BaseModel):
     page: int = Field(..., description="Current page number")
     per_page: int = Field(..., description="Number of clients per page")
 
+class ClientDetailResponse(ClientResponse):
+    """
+    Schema for client data with the related records requested through ``include``.
+    
+    Related records that were not requested are null.
+    """
+    assigned_user: Optional[RelatedUser] = Field(None, description="User managing this client")
+    projects: Optional[List[RelatedProject]] = Field(None, description="Projects for this client")
+    invoices: Optional[List[RelatedInvoice]] = Field(None, description="Invoices sent to this client")
+    payments: Optional[List[RelatedPayment]] = Field(None, description="Payments received from this client")
+
+class ClientDetailListResponse(ClientListResponse):
+    """
+    Schema for paginated client list responses with related records.
+    """
+    clients: List[ClientDetailResponse] = Field(..., description="List of clients")
+
 class ClientSummary(BaseModel):
     """
     Schema for client summary information.
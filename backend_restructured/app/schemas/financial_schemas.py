@@ -168,6 +168,17 @@ class ExpenseUpdateBulk(BaseModel):
 class ExpenseDeleteBulk(BaseModel):
     expense_ids: List[int]
 
+class BulkImportResult(BaseModel):
+    """Schema for the outcome of a streaming bulk import."""
+    processed: int = Field(..., description="Number of records read from the upload", example=10000)
+    inserted: int = Field(..., description="Number of records inserted", example=9998)
+    failed: int = Field(..., description="Number of records rejected", example=2)
+    errors: List[Dict] = Field(
+        default_factory=list,
+        description="Row-level errors (truncated to the configured maximum)",
+        example=[{"line": 17, "error": "amount: Input should be greater than 0", "record": {"title": "Bad row"}}]
+    )
+
 class ExpenseResponse(ExpenseBase):
     """Schema for expense data in API responses."""
     id: int = Field(..., description="Unique expense identifier")
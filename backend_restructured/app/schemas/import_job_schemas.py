@@ -0,0 +1,20 @@
+"""
+Import job schemas for the Smart CRM SaaS application.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ImportJobResponse(BaseModel):
+    """Schema for the progress and outcome of a streaming import job."""
+    job_id: str = Field(..., description="Import job identifier", example="3f2c9a7e0b1d4c8e9f6a5b4c3d2e1f00")
+    entity: str = Field(..., description="Type of record being imported", example="client")
+    status: str = Field(..., description="Job status (queued, running, completed, failed)", example="completed")
+    processed: int = Field(..., description="Records read from the upload so far", example=500000)
+    inserted: int = Field(..., description="Records inserted so far", example=499120)
+    failed: int = Field(..., description="Records rejected so far", example=880)
+    detail: Optional[str] = Field(None, description="Reason the job failed, if it did")
+    started_at: datetime = Field(..., example="2024-01-01T02:00:00Z")
+    finished_at: Optional[datetime] = Field(None, example="2024-01-01T02:03:10Z")
+    has_error_file: bool = Field(..., description="Whether rejected rows can be downloaded", example=True)
@@ -3,7 +3,7 @@ Notification schemas for the Smart CRM SaaS application.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class NotificationBase(BaseModel):
@@ -24,3 +24,17 @@ class NotificationResponse(NotificationBase):
 
     class Config:
         from_attributes = True
+
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, description="Notifications to mark as read", example=[1, 2, 3])
+    all: bool = Field(False, description="Mark every unread notification as read")
+
+class NotificationBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000, example=[1, 2, 3])
+
+class NotificationBulkResult(BaseModel):
+    affected: int = Field(..., description="Number of notifications changed", example=3)
+    unread_count: int = Field(..., example=12)
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int = Field(..., example=12)
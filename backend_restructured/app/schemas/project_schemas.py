@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
 from ..models.project_model import ProjectStatus, ProjectPriority
+from .project_milestone_schemas import ProjectMilestoneResponse
+from .related_schemas import RelatedClient, RelatedExpense, RelatedInvoice, RelatedPayment, RelatedUser
 
 class ProjectBase(BaseModel):
     """
@@ -194,13 +196,26 @@ class ProjectResponse(ProjectBase):
             datetime: lambda v: v.isoformat()
         }
 
+class ProjectDetailResponse(ProjectResponse):
+    """
+    Schema for project data with the related records requested through ``include``.
+    
+    Related records that were not requested are null.
+    """
+    client: Optional[RelatedClient] = Field(None, description="Associated client")
+    developer: Optional[RelatedUser] = Field(None, description="Assigned developer")
+    milestones: Optional[List[ProjectMilestoneResponse]] = Field(None, description="Project milestones")
+    invoices: Optional[List[RelatedInvoice]] = Field(None, description="Invoices for this project")
+    expenses: Optional[List[RelatedExpense]] = Field(None, description="Expenses for this project")
+    payments: Optional[List[RelatedPayment]] = Field(None, description="Payments for this project")
+
 class ProjectListResponse(BaseModel):
     """
     Schema for paginated project list responses.
     
     Contains list of projects with pagination metadata.
     """
-    projects: List[ProjectResponse] = Field(..., description="List of projects")
+    projects: List[ProjectDetailResponse] = Field(..., description="List of projects")
     total: int = Field(..., description="Total number of projects")
     page: int = Field(..., description="Current page number")
     per_page: int = Field(..., description="Number of projects per page")
@@ -0,0 +1,75 @@
+"""
+Related record schemas for the Smart CRM SaaS application.
+These compact schemas are embedded in responses for records requested with
+the ``include`` query parameter. They only read columns, so serializing them
+never loads further relationships.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class RelatedUser(BaseModel):
+    """Schema for an embedded user."""
+    id: int = Field(..., example=1)
+    full_name: str = Field(..., example="Jane Doe")
+    email: str = Field(..., example="jane@example.com")
+    role: str = Field(..., example="developer")
+
+    class Config:
+        from_attributes = True
+
+class RelatedClient(BaseModel):
+    """Schema for an embedded client."""
+    id: int = Field(..., example=1)
+    company_name: str = Field(..., example="Acme Corp")
+    contact_person_name: str = Field(..., example="John Smith")
+    email: str = Field(..., example="john@acme.example")
+
+    class Config:
+        from_attributes = True
+
+class RelatedProject(BaseModel):
+    """Schema for an embedded project."""
+    id: int = Field(..., example=1)
+    title: str = Field(..., example="Website redesign")
+    status: str = Field(..., example="in_progress")
+    budget: Optional[float] = Field(None, example=15000.0)
+    client_id: int = Field(..., example=1)
+
+    class Config:
+        from_attributes = True
+
+class RelatedInvoice(BaseModel):
+    """Schema for an embedded invoice."""
+    id: int = Field(..., example=1)
+    invoice_number: str = Field(..., example="INV-2024-001")
+    amount: float = Field(..., example=5000.0)
+    status: str = Field(..., example="sent")
+    issue_date: datetime = Field(..., example="2024-05-01T00:00:00Z")
+    due_date: datetime = Field(..., example="2024-05-31T23:59:59Z")
+    paid_date: Optional[datetime] = Field(None, example="2024-05-28T14:00:00Z")
+
+    class Config:
+        from_attributes = True
+
+class RelatedPayment(BaseModel):
+    """Schema for an embedded payment."""
+    id: int = Field(..., example=1)
+    amount: float = Field(..., example=2500.0)
+    status: str = Field(..., example="completed")
+    payment_date: Optional[datetime] = Field(None, example="2024-05-28T14:00:00Z")
+
+    class Config:
+        from_attributes = True
+
+class RelatedExpense(BaseModel):
+    """Schema for an embedded expense."""
+    id: int = Field(..., example=1)
+    title: str = Field(..., example="Hosting")
+    amount: float = Field(..., example=120.0)
+    category: str = Field(..., example="software")
+    expense_date: Optional[datetime] = Field(None, example="2024-05-02T00:00:00Z")
+
+    class Config:
+        from_attributes = True
@@ -1,24 +1,48 @@
 """
 API Key service for the Smart CRM SaaS application.
-This module contains functions for managing API keys.
+This module contains functions for managing API keys and the authenticator
+that resolves ``X-API-Key`` headers to users.
 """
 
+import asyncio
+import hashlib
+import logging
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, update
 from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
 from ..models.api_key_model import APIKey
 
-def create_api_key(db: Session, user_id: int) -> APIKey:
-    """Create a new API key for a user."""
+logger = logging.getLogger(__name__)
+
+
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def create_api_key(db: Session, user_id: int) -> Tuple[APIKey, str]:
+    """Create a new API key for a user. Returns the row and the key, which is not stored."""
     key = secrets.token_urlsafe(32)
-    api_key = APIKey(key=key, user_id=user_id)
+    api_key = APIKey(key_hash=hash_api_key(key), prefix=key[:8], user_id=user_id)
     db.add(api_key)
     db.commit()
     db.refresh(api_key)
-    return api_key
+    # A failed lookup of this key may be cached
+    api_key_authenticator.invalidate(api_key.key_hash)
+    return api_key, key
 
 def get_api_key(db: Session, key: str) -> APIKey:
     """Get an API key by its value."""
-    return db.query(APIKey).filter(APIKey.key == key).first()
+    return db.query(APIKey).filter(APIKey.key_hash == hash_api_key(key)).first()
 
 def revoke_api_key(db: Session, key: str) -> bool:
     """Revoke an API key."""
@@ -26,5 +50,153 @@ def revoke_api_key(db: Session, key: str) -> bool:
     if api_key:
         db.delete(api_key)
         db.commit()
+        api_key_authenticator.invalidate(api_key.key_hash)
         return True
     return False
+
+
+class APIKeyAuthenticator:
+    """
+    Resolves API keys to users without a query per request.
+
+    Lookups by key hash are cached for ``cache_ttl`` seconds, and unknown
+    keys for ``negative_ttl`` seconds; past ``cache_size`` entries the least
+    recently used one is evicted. Revoking a key drops it from this
+    worker's cache at once; other workers stop accepting it when their entry
+    expires. Key use is recorded in memory and ``last_used_at`` is written
+    for all used keys in one statement every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        cache_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.cache_ttl = settings.API_KEY_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.negative_ttl = settings.API_KEY_NEGATIVE_CACHE_TTL if negative_ttl is None else negative_ttl
+        self.cache_size = cache_size or settings.API_KEY_CACHE_SIZE
+        self.flush_interval = flush_interval or settings.API_KEY_USAGE_FLUSH_INTERVAL
+        # key hash -> (api key id, user id, expiry); ids are None for unknown keys
+        self._cache: "OrderedDict[str, Tuple[Optional[int], Optional[int], float]]" = OrderedDict()
+        # Lookups run on the db executor's threads
+        self._cache_lock = threading.Lock()
+        self._last_used: Dict[int, datetime] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def _cached(self, key_hash: str, now: float) -> Optional[Tuple[Optional[int], Optional[int], float]]:
+        with self._cache_lock:
+            entry = self._cache.get(key_hash)
+            if entry is None or entry[2] <= now:
+                return None
+            self._cache.move_to_end(key_hash)
+            return entry
+
+    def _lookup(self, db: Session, key_hash: str) -> Tuple[Optional[int], Optional[int], float]:
+        now = time.monotonic()
+        entry = self._cached(key_hash, now)
+        if entry is not None:
+            return entry
+        row = db.query(APIKey.id, APIKey.user_id).filter(APIKey.key_hash == key_hash).first()
+        if row is None:
+            entry = (None, None, now + self.negative_ttl)
+        else:
+            entry = (row.id, row.user_id, now + self.cache_ttl)
+        with self._cache_lock:
+            self._cache[key_hash] = entry
+            self._cache.move_to_end(key_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def _lookup_in_new_session(self, key_hash: str) -> Tuple[Optional[int], Optional[int], float]:
+        db = self.session_factory()
+        try:
+            return self._lookup(db, key_hash)
+        finally:
+            db.close()
+
+    def authenticate(self, db: Session, key: str) -> Optional[int]:
+        """Return the id of the user owning ``key``, or None if the key is unknown."""
+        api_key_id, user_id, _ = self._lookup(db, hash_api_key(key))
+        if api_key_id is not None:
+            self._last_used[api_key_id] = datetime.utcnow()
+        return user_id
+
+    async def resolve(self, key: str) -> Optional[int]:
+        """
+        Return the id of ``key`` if it is a valid API key, or None.
+
+        Answers from the cache when it can; otherwise the lookup runs on the
+        ``db`` executor and its result is cached for ``authenticate``. Use is
+        not recorded, since the request may still be rejected.
+        """
+        key_hash = hash_api_key(key)
+        entry = self._cached(key_hash, time.monotonic())
+        if entry is None:
+            entry = await run_blocking("db", self._lookup_in_new_session, key_hash)
+        return entry[0]
+
+    def invalidate(self, key_hash: str):
+        with self._cache_lock:
+            self._cache.pop(key_hash, None)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def flush(self) -> int:
+        """Write the recorded ``last_used_at`` times. Returns the number of keys updated."""
+        if not self._last_used:
+            return 0
+        pending, self._last_used = self._last_used, {}
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(APIKey.__table__)
+                .where(APIKey.__table__.c.id == bindparam("key_id"))
+                .values(last_used_at=bindparam("used_at")),
+                [{"key_id": key_id, "used_at": used_at} for key_id, used_at in pending.items()],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the times for the next flush unless a newer use was recorded meanwhile
+            for key_id, used_at in pending.items():
+                self._last_used.setdefault(key_id, used_at)
+            raise
+        finally:
+            db.close()
+        return len(pending)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await run_blocking("db", self.flush)
+            except Exception as e:
+                logger.error(f"API key usage flush failed: {e}")
+
+    def start(self):
+        """Start flushing key usage in the background on the running event loop."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        try:
+            await run_blocking("db", self.flush)
+        except Exception as e:
+            logger.error(f"API key usage flush failed: {e}")
+
+
+api_key_authenticator = APIKeyAuthenticator()
@@ -0,0 +1,191 @@
+"""
+Persisted AI client analysis for the Smart CRM SaaS application.
+This module stores generated analyses with a hash of the client data they were
+built from, so unchanged clients are served without a model call and changed
+ones are regenerated in the background.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
+from ..models.client_ai_analysis_model import ClientAIAnalysis
+from ..models.client_history_model import ClientHistory
+from ..models.client_model import Client
+from ..models.client_note_model import ClientNote
+from .openai_client import AIServiceError, get_ai_client
+
+logger = logging.getLogger(__name__)
+
+# How many of the most recent notes and history entries go into the prompt
+PROMPT_NOTES_LIMIT = 5
+PROMPT_HISTORY_LIMIT = 5
+
+
+@dataclass
+class ClientSnapshot:
+    """The data an analysis of one client is built from."""
+    client_id: int
+    prompt: str
+    data_version: str
+
+
+def _summary_prompt(client: Client, notes: List[tuple], history: List[tuple]) -> str:
+    prompt = f"Summarize the following client information: Company Name: {client.company_name}, Contact Person: {client.contact_person_name}, Email: {client.email}, Industry: {client.industry}, Notes: {client.general_notes}"
+    if notes:
+        prompt += "\nRecent notes:\n" + "\n".join(
+            f"- {created_at:%Y-%m-%d}: {content}" for _, content, created_at in notes[:PROMPT_NOTES_LIMIT]
+        )
+    if history:
+        prompt += "\nRecent activity:\n" + "\n".join(
+            f"- {timestamp:%Y-%m-%d}: {action}" + (f" ({details})" if details else "")
+            for _, action, details, timestamp in history[:PROMPT_HISTORY_LIMIT]
+        )
+    return prompt
+
+
+def _data_version(client: Client, notes: List[tuple], history: List[tuple]) -> str:
+    # Every note and history entry counts, not just the ones in the prompt
+    data = [
+        [client.company_name, client.contact_person_name, client.email, client.phone_number,
+         client.address, client.industry, client.platform_preference, client.category, client.general_notes],
+        notes,
+        history,
+    ]
+    return hashlib.sha256(json.dumps(data, default=str).encode()).hexdigest()
+
+
+def load_client_snapshots(db: Session, client_ids: Iterable[int]) -> Dict[int, ClientSnapshot]:
+    """
+    Build the analysis input for each client in ``client_ids``.
+
+    Clients, notes and history are each loaded with one query, however many
+    clients are requested. Unknown ids are left out of the result.
+    """
+    client_ids = list(client_ids)
+    clients = db.query(Client).filter(Client.id.in_(client_ids)).all()
+    notes: Dict[int, List[tuple]] = {}
+    for client_id, note_id, content, created_at in (
+        db.query(ClientNote.client_id, ClientNote.id, ClientNote.content, ClientNote.created_at)
+        .filter(ClientNote.client_id.in_(client_ids))
+        .order_by(ClientNote.created_at.desc(), ClientNote.id.desc())
+    ):
+        notes.setdefault(client_id, []).append((note_id, content, created_at))
+    history: Dict[int, List[tuple]] = {}
+    for client_id, entry_id, action, details, timestamp in (
+        db.query(ClientHistory.client_id, ClientHistory.id, ClientHistory.action, ClientHistory.details, ClientHistory.timestamp)
+        .filter(ClientHistory.client_id.in_(client_ids))
+        .order_by(ClientHistory.timestamp.desc(), ClientHistory.id.desc())
+    ):
+        history.setdefault(client_id, []).append((entry_id, action, details, timestamp))
+
+    snapshots = {}
+    for client in clients:
+        client_notes = notes.get(client.id, [])
+        client_history = history.get(client.id, [])
+        snapshots[client.id] = ClientSnapshot(
+            client_id=client.id,
+            prompt=_summary_prompt(client, client_notes, client_history),
+            data_version=_data_version(client, client_notes, client_history),
+        )
+    return snapshots
+
+
+def get_stored_analyses(db: Session, client_ids: Iterable[int], analysis_type: str) -> Dict[int, ClientAIAnalysis]:
+    """Return the stored analysis of each client that has one."""
+    rows = db.query(ClientAIAnalysis).filter(
+        ClientAIAnalysis.client_id.in_(list(client_ids)),
+        ClientAIAnalysis.analysis_type == analysis_type
+    ).all()
+    return {row.client_id: row for row in rows}
+
+
+def is_stale(stored: Optional[ClientAIAnalysis], snapshot: ClientSnapshot) -> bool:
+    """True if ``stored`` was built from other data or by another model than the current one."""
+    return (
+        stored is None
+        or stored.data_version != snapshot.data_version
+        or stored.model != get_ai_client().model
+    )
+
+
+class ClientAnalysisService:
+    """
+    Generates client analyses and keeps the stored copies up to date.
+
+    Generation writes through its own session so it can run after the
+    request that triggered it has finished.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._refreshing: Set[Tuple[int, str]] = set()
+
+    def save(self, snapshot: ClientSnapshot, analysis_type: str, model: str, result: str) -> datetime:
+        """Insert or replace the stored analysis. Returns its generation time."""
+        ai_client = get_ai_client()
+        values = dict(
+            result=result,
+            model=model,
+            prompt_hash=ai_client.cache_key(model, snapshot.prompt),
+            data_version=snapshot.data_version,
+            updated_at=datetime.utcnow(),
+        )
+        db = self.session_factory()
+        try:
+            for attempt in range(2):
+                row = db.query(ClientAIAnalysis).filter(
+                    ClientAIAnalysis.client_id == snapshot.client_id,
+                    ClientAIAnalysis.analysis_type == analysis_type
+                ).first()
+                if row is None:
+                    db.add(ClientAIAnalysis(client_id=snapshot.client_id, analysis_type=analysis_type, **values))
+                else:
+                    for key, value in values.items():
+                        setattr(row, key, value)
+                try:
+                    db.commit()
+                    return values["updated_at"]
+                except IntegrityError:
+                    # Another worker inserted the row first; update it instead
+                    db.rollback()
+                    if attempt:
+                        raise
+        finally:
+            db.close()
+
+    async def generate(self, snapshot: ClientSnapshot, analysis_type: str) -> Tuple[str, datetime]:
+        """
+        Run the model for ``snapshot`` and store the result.
+
+        Raises:
+            AIServiceError: If the completion fails
+        """
+        ai_client = get_ai_client()
+        result = await ai_client.complete(snapshot.prompt)
+        generated_at = await run_blocking("db", self.save, snapshot, analysis_type, ai_client.model, result)
+        return result, generated_at
+
+    async def refresh(self, snapshot: ClientSnapshot, analysis_type: str):
+        """Regenerate a stale analysis; concurrent refreshes of one client are skipped."""
+        key = (snapshot.client_id, analysis_type)
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        try:
+            await self.generate(snapshot, analysis_type)
+        except AIServiceError as e:
+            logger.warning(f"Background refresh of {analysis_type} for client {snapshot.client_id} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+
+client_analysis = ClientAnalysisService()
@@ -1,36 +1,417 @@
 """
 Email service for the Smart CRM SaaS application.
+This module persists outgoing email in the email_outbox table and delivers it
+from a background worker in rate-limited batches, retrying failures with
+exponential backoff and deleting delivered messages after a retention period.
 """
 
+import asyncio
+import base64
+import hashlib
+import json
+import logging
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, delete, exists, or_, select, update
+from sqlalchemy.orm import Session, selectinload
 
 from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
+from ..models.email_outbox_model import EmailOutbox, EmailOutboxContent
+from .email_transport import EmailAttachment, EmailTransport, create_transport
+from .worker_lease import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+_default_transport: Optional[EmailTransport] = None
+
+
+def get_transport() -> EmailTransport:
+    """Return the process-wide transport configured by EMAIL_TRANSPORT."""
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = create_transport()
+    return _default_transport
+
 
 def send_email(
-    to_email: str,
+    to_email: Union[str, List[str]],
     subject: str,
     html_content: str,
-    plain_text_content: str = None
+    plain_text_content: str = None,
+    attachments: Optional[Iterable[EmailAttachment]] = None
 ):
     """
-    Sends an email using SendGrid.
+    Sends an email immediately through the configured transport.
+
+    Prefer ``email_outbox.enqueue`` from request handlers; this call blocks
+    until the provider has accepted the message.
     """
-    message = Mail(
-        from_email=settings.MAIL_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
+    recipients = [to_email] if isinstance(to_email, str) else list(to_email)
+    return get_transport().send(recipients, subject, html_content, plain_text_content, tuple(attachments or ()))
+
+
+def _encode_attachments(attachments: Iterable[EmailAttachment]) -> List[dict]:
+    return [
+        {"filename": filename, "content": base64.b64encode(content).decode(), "type": mime_type}
+        for filename, content, mime_type in attachments
+    ]
+
+
+def _decode_attachments(encoded: Optional[List[dict]]) -> Tuple[EmailAttachment, ...]:
+    return tuple(
+        (item["filename"], base64.b64decode(item["content"]), item["type"])
+        for item in encoded or ()
     )
-    if plain_text_content:
-        message.plain_text_content = plain_text_content
-
-    try:
-        sendgrid_client = SendGridAPIClient(settings.SENDGRID_API_KEY)
-        response = sendgrid_client.send(message)
-        print(f"Email sent to {to_email}. Status Code: {response.status_code}")
-        return response
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        raise
+
+
+def _content_key(subject: str, html_content: str, plain_text_content: Optional[str], attachments: List[dict]) -> str:
+    payload = json.dumps([subject, html_content, plain_text_content, attachments], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TokenBucket:
+    """
+    Async token bucket that limits sends to ``rate`` messages per second.
+
+    A batch larger than the bucket is allowed through and the bucket goes
+    into debt, so the next batch waits until the average rate is restored.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self, amount: float = 1.0):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class EmailOutboxWorker:
+    """
+    Durable outbound email queue.
+
+    ``enqueue`` only inserts rows into email_outbox, so a request handler
+    returns as soon as its transaction commits. The subject, body and
+    attachments are stored once in email_outbox_content and shared by the
+    per-recipient rows. The worker claims due rows
+    with a single conditional UPDATE (the same lease scheme as the automated
+    task runner), groups messages with identical content and hands each group
+    to the transport in batches of up to ``batch_size`` recipients. Sends are
+    rate-limited to ``rate_limit`` messages per second; a failed batch is
+    retried with exponential backoff until ``max_attempts`` is reached.
+
+    Every serve.py worker starts a poller, but only the one holding the
+    ``email_outbox`` leader lease sends, so ``rate_limit`` is the rate for
+    the whole deployment rather than per process. The leader also deletes
+    sent and failed messages older than ``retention_days``, together with
+    content no message refers to any more.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        transport: Optional[EmailTransport] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        leader_lease_seconds: Optional[int] = None,
+        retention_days: Optional[int] = None,
+        prune_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self._transport = transport
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.EMAIL_POLL_INTERVAL
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.EMAIL_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.EMAIL_RETRY_MAX_SECONDS
+        self.lease_seconds = lease_seconds or settings.EMAIL_LEASE_SECONDS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.rate_limiter = TokenBucket(rate_limit if rate_limit is not None else settings.EMAIL_RATE_LIMIT_PER_SECOND)
+        self.leader_lease = LeaderLease(
+            "email_outbox", self.worker_id, leader_lease_seconds or settings.EMAIL_LEADER_LEASE_SECONDS
+        )
+        self.retention_days = retention_days or settings.EMAIL_RETENTION_DAYS
+        self.prune_interval = prune_interval or settings.EMAIL_PRUNE_INTERVAL
+        self.is_leader = False
+        self._next_prune = 0.0
+        self._loop_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def transport(self) -> EmailTransport:
+        if self._transport is None:
+            self._transport = get_transport()
+        return self._transport
+
+    def enqueue(
+        self,
+        db: Session,
+        to_email: Union[str, List[str]],
+        subject: str,
+        html_content: str,
+        plain_text_content: str = None,
+        attachments: Optional[Iterable[EmailAttachment]] = None
+    ) -> List[EmailOutbox]:
+        """
+        Add an email to the outbox, one row per recipient sharing one content row.
+
+        The rows are added to ``db`` but not committed, so the email is only
+        sent if the caller's transaction commits.
+        """
+        recipients = [to_email] if isinstance(to_email, str) else list(to_email)
+        encoded = _encode_attachments(attachments or ())
+        content = EmailOutboxContent(
+            subject=subject,
+            html_content=html_content,
+            plain_text_content=plain_text_content,
+            attachments=encoded or None,
+            content_key=_content_key(subject, html_content, plain_text_content, encoded),
+        )
+        now = datetime.utcnow()
+        rows = [
+            EmailOutbox(
+                to_email=recipient,
+                content=content,
+                status="pending",
+                attempts=0,
+                next_attempt_at=now,
+            )
+            for recipient in recipients
+        ]
+        db.add_all(rows)
+        return rows
+
+    def _claim(self, limit: int) -> Dict[str, List[EmailOutbox]]:
+        """Atomically claim up to ``limit`` due messages, grouped by content."""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+            # A worker died mid-send; take the message over once its lease expires
+            and_(EmailOutbox.status == "sending", EmailOutbox.claimed_at < now - timedelta(seconds=self.lease_seconds)),
+        )
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+        db = self.session_factory()
+        try:
+            candidates = select(EmailOutbox.id).where(claimable)\
+                .order_by(EmailOutbox.next_attempt_at)\
+                .limit(limit)\
+                .scalar_subquery()
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(candidates), claimable)
+                .values(status="sending", claimed_by=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            claimed = select(EmailOutbox)\
+                .where(EmailOutbox.claimed_by == token)\
+                .options(selectinload(EmailOutbox.content))\
+                .order_by(EmailOutbox.id)
+            groups: Dict[str, List[EmailOutbox]] = defaultdict(list)
+            for message in db.scalars(claimed):
+                groups[message.content.content_key].append(message)
+            db.expunge_all()
+            return groups
+        finally:
+            db.close()
+
+    def _record_results(self, sent_ids: List[int], failures: List[Tuple[EmailOutbox, str]]):
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            if sent_ids:
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, claimed_by=None, attempts=EmailOutbox.attempts + 1, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for message, error in failures:
+                attempts = message.attempts + 1
+                values = {"claimed_by": None, "attempts": attempts, "last_error": error[:2000]}
+                if attempts >= self.max_attempts:
+                    values["status"] = "failed"
+                    self.failed += 1
+                else:
+                    delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+                    values.update(status="pending", next_attempt_at=now + timedelta(seconds=delay))
+                    self.retried += 1
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == message.id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_once(self) -> int:
+        """
+        Send one batch of due messages.
+
+        Returns:
+            int: Number of messages claimed in this poll
+        """
+        groups = await run_blocking("db", self._claim, self.batch_size)
+        chunk_size = min(self.batch_size, self.transport.max_batch_size)
+        sent_ids: List[int] = []
+        failures: List[Tuple[EmailOutbox, str]] = []
+        for messages in groups.values():
+            content = messages[0].content
+            attachments = _decode_attachments(content.attachments)
+            for start in range(0, len(messages), chunk_size):
+                chunk = messages[start:start + chunk_size]
+                await self.rate_limiter.acquire(len(chunk))
+                try:
+                    await run_blocking(
+                        "io",
+                        self.transport.send,
+                        [message.to_email for message in chunk],
+                        content.subject,
+                        content.html_content,
+                        content.plain_text_content,
+                        attachments
+                    )
+                    sent_ids.extend(message.id for message in chunk)
+                except Exception as e:
+                    logger.warning(f"Failed to send '{content.subject}' to {len(chunk)} recipient(s): {e}")
+                    failures.extend((message, str(e)) for message in chunk)
+        if sent_ids or failures:
+            await run_blocking("db", self._record_results, sent_ids, failures)
+            self.sent += len(sent_ids)
+        return sum(len(messages) for messages in groups.values())
+
+    def prune(self, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+        """
+        Delete sent and failed messages older than ``retention_days``, then
+        the content rows no message refers to.
+
+        Deletes in batches, committing after each, like notification pruning.
+
+        Returns:
+            int: Number of messages deleted
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        batch_size = batch_size or settings.EMAIL_PRUNE_BATCH_SIZE
+        db = self.session_factory()
+        try:
+            deleted = 0
+            while True:
+                batch = select(EmailOutbox.id).where(
+                    EmailOutbox.status.in_(("sent", "failed")),
+                    EmailOutbox.created_at < cutoff
+                ).limit(batch_size)
+                result = db.execute(
+                    delete(EmailOutbox)
+                    .where(EmailOutbox.id.in_(batch.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+            while True:
+                # Content is inserted with its messages, so old content without any is an orphan
+                orphans = select(EmailOutboxContent.id).where(
+                    EmailOutboxContent.created_at < cutoff,
+                    ~exists().where(EmailOutbox.content_id == EmailOutboxContent.id)
+                ).limit(batch_size)
+                result = db.execute(
+                    delete(EmailOutboxContent)
+                    .where(EmailOutboxContent.id.in_(orphans.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if result.rowcount < batch_size:
+                    break
+            if deleted:
+                logger.info(f"Pruned {deleted} outbox message(s) older than {self.retention_days} days")
+            return deleted
+        finally:
+            db.close()
+
+    def _hold_leader_lease(self) -> bool:
+        db = self.session_factory()
+        try:
+            is_leader = self.leader_lease.acquire(db)
+        finally:
+            db.close()
+        if is_leader != self.is_leader:
+            logger.info(f"Email outbox worker {self.worker_id} {'is now' if is_leader else 'is no longer'} the sender")
+        self.is_leader = is_leader
+        return is_leader
+
+    def _release_leader_lease(self):
+        db = self.session_factory()
+        try:
+            self.leader_lease.release(db)
+        finally:
+            db.close()
+        self.is_leader = False
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                claimed = 0
+                if await run_blocking("db", self._hold_leader_lease):
+                    claimed = await self.run_once()
+                    if time.monotonic() >= self._next_prune:
+                        self._next_prune = time.monotonic() + self.prune_interval
+                        await run_blocking("db", self.prune)
+            except Exception as e:
+                logger.error(f"Email outbox poll failed: {e}")
+                claimed = 0
+            # Poll again immediately while there is a backlog
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """Start sending in the background on the running event loop."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._poll_loop())
+            logger.info(f"Email outbox worker started ({self.worker_id})")
+
+    async def stop(self):
+        """Stop the worker and close the transport connection."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+            if self.is_leader:
+                try:
+                    await run_blocking("db", self._release_leader_lease)
+                except Exception as e:
+                    logger.warning(f"Failed to release the email outbox lease: {e}")
+        if self._transport is not None:
+            await run_blocking("io", self._transport.close)
+
+
+email_outbox = EmailOutboxWorker()
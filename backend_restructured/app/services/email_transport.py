@@ -0,0 +1,191 @@
+"""
+Email transports for the Smart CRM SaaS application.
+This module provides the interchangeable backends the email outbox sends
+through: SendGrid for production, SMTP for local relays and an in-memory sink
+for tests.
+"""
+
+import base64
+import logging
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (filename, content, mime type)
+EmailAttachment = Tuple[str, bytes, str]
+
+
+class EmailTransport:
+    """
+    Base class for email backends.
+
+    ``send`` delivers one message to a batch of recipients, each of whom must
+    only see their own address. Raising marks every recipient in the batch as
+    failed so the outbox can retry them.
+    """
+
+    # Largest number of recipients accepted in one ``send`` call
+    max_batch_size: int = 1000
+
+    def send(
+        self,
+        recipients: Sequence[str],
+        subject: str,
+        html_content: str,
+        plain_text_content: Optional[str] = None,
+        attachments: Sequence[EmailAttachment] = ()
+    ):
+        raise NotImplementedError
+
+    def close(self):
+        """Release any connection held by the transport."""
+
+
+class SendGridTransport(EmailTransport):
+    """
+    Sends through the SendGrid v3 API with one personalization per recipient.
+
+    The API client, and with it the underlying HTTP connection pool, is
+    created once and reused for every batch.
+    """
+
+    max_batch_size = 1000  # SendGrid's personalization limit per request
+
+    def __init__(self, api_key: Optional[str] = None, from_email: Optional[str] = None):
+        self.api_key = api_key or settings.SENDGRID_API_KEY
+        self.from_email = from_email or settings.MAIL_FROM_EMAIL
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from sendgrid import SendGridAPIClient
+            self._client = SendGridAPIClient(self.api_key)
+        return self._client
+
+    def send(self, recipients, subject, html_content, plain_text_content=None, attachments=()):
+        from sendgrid.helpers.mail import (
+            Attachment, Disposition, FileContent, FileName, FileType, Mail, Personalization, To
+        )
+
+        message = Mail(from_email=self.from_email, subject=subject, html_content=html_content)
+        for recipient in recipients:
+            personalization = Personalization()
+            personalization.add_to(To(recipient))
+            message.add_personalization(personalization)
+        if plain_text_content:
+            message.plain_text_content = plain_text_content
+        for filename, content, mime_type in attachments:
+            message.add_attachment(Attachment(
+                FileContent(base64.b64encode(content).decode()),
+                FileName(filename),
+                FileType(mime_type),
+                Disposition("attachment")
+            ))
+        response = self.client.send(message)
+        if response.status_code >= 300:
+            raise RuntimeError(f"SendGrid returned status {response.status_code}")
+        logger.info(f"Email sent to {len(recipients)} recipient(s). Status Code: {response.status_code}")
+        return response
+
+
+class SMTPTransport(EmailTransport):
+    """
+    Sends through an SMTP server, one message per recipient over a single
+    connection that is kept open between batches.
+    """
+
+    max_batch_size = 100
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: Optional[bool] = None,
+        from_email: Optional[str] = None
+    ):
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = username if username is not None else settings.SMTP_USERNAME
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.use_tls = settings.SMTP_USE_TLS if use_tls is None else use_tls
+        self.from_email = from_email or settings.MAIL_FROM_EMAIL
+        self._connection: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def send(self, recipients, subject, html_content, plain_text_content=None, attachments=()):
+        with self._lock:
+            for recipient in recipients:
+                message = EmailMessage()
+                message["From"] = self.from_email
+                message["To"] = recipient
+                message["Subject"] = subject
+                message.set_content(plain_text_content or "")
+                message.add_alternative(html_content, subtype="html")
+                for filename, content, mime_type in attachments:
+                    maintype, _, subtype = mime_type.partition("/")
+                    message.add_attachment(content, maintype=maintype, subtype=subtype or "octet-stream", filename=filename)
+                self._send_message(message)
+
+    def _send_message(self, message: EmailMessage):
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed an idle connection; reconnect once
+            self._connection = self._connect()
+            self._connection.send_message(message)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.quit()
+                except smtplib.SMTPException:
+                    pass
+                self._connection = None
+
+
+class InMemoryTransport(EmailTransport):
+    """Collects sent messages in memory instead of delivering them."""
+
+    def __init__(self, max_batch_size: int = 1000):
+        self.max_batch_size = max_batch_size
+        self.sent: List[dict] = []
+
+    def send(self, recipients, subject, html_content, plain_text_content=None, attachments=()):
+        self.sent.append({
+            "recipients": list(recipients),
+            "subject": subject,
+            "html_content": html_content,
+            "plain_text_content": plain_text_content,
+            "attachments": list(attachments),
+        })
+
+
+def create_transport(name: Optional[str] = None) -> EmailTransport:
+    """Create the transport named by ``name`` or the EMAIL_TRANSPORT setting."""
+    name = (name or settings.EMAIL_TRANSPORT).lower()
+    if name == "sendgrid":
+        return SendGridTransport()
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "memory":
+        return InMemoryTransport()
+    raise ValueError(f"Unsupported email transport: {name}")
@@ -0,0 +1,249 @@
+"""
+Bulk import job tracking for the Smart CRM SaaS application.
+This module spools uploads to disk, runs imports as background jobs, keeps
+their progress counters in the import_jobs table and writes rejected rows to a
+downloadable NDJSON error file.
+"""
+
+import asyncio
+import json
+import logging
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
+from ..models.import_job_model import ImportJobRecord
+
+logger = logging.getLogger(__name__)
+
+class ImportJob:
+    """
+    Progress and outcome of a single streaming import.
+
+    Counters are updated in memory while the upload is being processed and
+    saved to the import_jobs table as the import goes, so a request on any
+    worker can poll the job for progress before the import has finished.
+    A job is ``queued`` until its background task starts, then ``running``.
+    """
+
+    def __init__(self, entity: str, user_id: int, bind: Optional[Engine] = None):
+        self.id = uuid.uuid4().hex
+        self.bind = bind
+        self.entity = entity
+        self.user_id = user_id
+        self.status = "queued"
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.detail: Optional[str] = None
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.error_file: Optional[Path] = None
+        self._error_handle = None
+
+    def record_error(self, line_number: int, message: str, record: Any = None):
+        """Count a rejected row and append it to the job's error file."""
+        self.failed += 1
+        if self._error_handle is None:
+            error_dir = Path(settings.IMPORT_ERROR_DIR)
+            error_dir.mkdir(parents=True, exist_ok=True)
+            self.error_file = error_dir / f"{self.entity}_import_{self.id}.ndjson"
+            self._error_handle = self.error_file.open("w", encoding="utf-8")
+        self._error_handle.write(
+            json.dumps({"line": line_number, "error": message, "record": record}, default=str) + "\n"
+        )
+
+    def finish(self, status: str = "completed", detail: Optional[str] = None):
+        """Mark the job as finished and close the error file."""
+        self.status = status
+        self.detail = detail
+        self.finished_at = datetime.utcnow()
+        if self._error_handle is not None:
+            self._error_handle.close()
+            self._error_handle = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for API responses."""
+        return {
+            "job_id": self.id,
+            "entity": self.entity,
+            "status": self.status,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "detail": self.detail,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "has_error_file": self.error_file is not None,
+        }
+
+    @classmethod
+    def from_record(cls, record: ImportJobRecord) -> "ImportJob":
+        """Rebuild a job from its saved row."""
+        job = cls(record.entity, record.user_id)
+        job.id = record.id
+        job.status = record.status
+        job.processed = record.processed
+        job.inserted = record.inserted
+        job.failed = record.failed
+        job.detail = record.detail
+        job.started_at = record.started_at
+        job.finished_at = record.finished_at
+        job.error_file = Path(record.error_file) if record.error_file else None
+        return job
+
+
+class ImportJobRegistry:
+    """
+    Registry of recent import jobs, stored in the import_jobs table.
+
+    Every serve.py worker reads the same table, so a job ID returned by one
+    worker can be polled on any other. Only the most recent
+    ``IMPORT_JOB_HISTORY`` jobs are kept; older jobs and their error files
+    are discarded when new jobs are created.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    def create(self, db: Session, entity: str, user_id: int) -> ImportJob:
+        """Save a new queued job. Later saves use the same database as ``db``."""
+        job = ImportJob(entity, user_id, db.get_bind())
+        db.add(ImportJobRecord(
+            id=job.id, entity=entity, user_id=user_id, status=job.status, started_at=job.started_at
+        ))
+        db.commit()
+        self._prune(db)
+        return job
+
+    def get(self, db: Session, job_id: str) -> Optional[ImportJob]:
+        record = db.get(ImportJobRecord, job_id)
+        return ImportJob.from_record(record) if record is not None else None
+
+    def list_for_user(self, db: Session, user_id: int) -> List[ImportJob]:
+        records = db.scalars(
+            select(ImportJobRecord)
+            .where(ImportJobRecord.user_id == user_id)
+            .order_by(ImportJobRecord.started_at.desc())
+        )
+        return [ImportJob.from_record(record) for record in records]
+
+    def save(self, job: ImportJob, db: Optional[Session] = None):
+        """Write the job's status and counters; uses a session of its own unless ``db`` is given."""
+        session = db or SessionLocal(bind=job.bind)
+        try:
+            session.execute(
+                update(ImportJobRecord)
+                .where(ImportJobRecord.id == job.id)
+                .values(
+                    status=job.status,
+                    processed=job.processed,
+                    inserted=job.inserted,
+                    failed=job.failed,
+                    detail=job.detail,
+                    error_file=str(job.error_file) if job.error_file else None,
+                    finished_at=job.finished_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        finally:
+            if db is None:
+                session.close()
+
+    def start(self, job: ImportJob, run: Callable[[ImportJob], Awaitable[None]]) -> asyncio.Task:
+        """
+        Run ``run(job)`` as a background task and finish the job when it returns.
+
+        The job is marked failed if ``run`` raises or the task is cancelled.
+        """
+        async def run_job():
+            try:
+                job.status = "running"
+                await run_blocking("db", self.save, job)
+                await run(job)
+            except asyncio.CancelledError:
+                job.finish("failed", detail="Import was interrupted")
+                await run_blocking("db", self.save, job)
+                raise
+            except Exception as e:
+                logger.error(f"{job.entity.capitalize()} import {job.id} failed: {e}")
+                job.finish("failed", detail=str(e))
+            else:
+                job.finish()
+            await run_blocking("db", self.save, job)
+
+        task = asyncio.create_task(run_job())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self):
+        """Wait for all running imports to finish."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def stop(self):
+        """Cancel running imports; their jobs are marked failed."""
+        for task in list(self._tasks):
+            task.cancel()
+        await self.drain()
+
+    def _prune(self, db: Session):
+        excess = db.scalars(
+            select(ImportJobRecord)
+            .where(ImportJobRecord.finished_at.is_not(None))
+            .order_by(ImportJobRecord.started_at.desc())
+            .offset(settings.IMPORT_JOB_HISTORY)
+        ).all()
+        if not excess:
+            return
+        db.execute(
+            delete(ImportJobRecord)
+            .where(ImportJobRecord.id.in_([record.id for record in excess]))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        for record in excess:
+            if record.error_file:
+                Path(record.error_file).unlink(missing_ok=True)
+
+
+async def spool_upload(stream: AsyncIterator[bytes]) -> BinaryIO:
+    """
+    Copy a request body to an anonymous temporary file.
+
+    The file is rewound and returned open; the caller closes it, which also
+    deletes it. Writes run on the ``io`` executor.
+    """
+    upload = tempfile.TemporaryFile(dir=settings.IMPORT_UPLOAD_DIR)
+    try:
+        async for chunk in stream:
+            if chunk:
+                await run_blocking("io", upload.write, chunk)
+        await run_blocking("io", upload.seek, 0)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+async def iter_upload(upload: BinaryIO, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Read a spooled upload back as an async byte stream."""
+    while True:
+        chunk = await run_blocking("io", upload.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+import_jobs = ImportJobRegistry()
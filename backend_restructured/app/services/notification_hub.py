@@ -0,0 +1,237 @@
+"""
+Real-time notification delivery for the Smart CRM SaaS application.
+This module keeps a per-user registry of WebSocket connections and pushes
+messages to them through bounded per-connection send queues. With a pub/sub
+backend, messages published on any worker reach sockets on every worker.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Union
+
+from ..core.config import settings
+from .pubsub import PubSubBackend
+
+logger = logging.getLogger(__name__)
+
+
+async def _send_with_timeout(websocket, text: str, timeout: float):
+    if hasattr(asyncio, "timeout"):
+        # Cheaper than wait_for, which wraps every send in a new task
+        async with asyncio.timeout(timeout):
+            await websocket.send_text(text)
+    else:
+        await asyncio.wait_for(websocket.send_text(text), timeout=timeout)
+
+
+class NotificationConnection:
+    """
+    A single WebSocket with its own send queue and writer task.
+
+    Messages are queued without awaiting the socket, so a slow client only
+    delays itself. When the queue is full the oldest message is dropped;
+    messages sent with a ``coalesce_key`` replace a queued message with the
+    same key instead of taking another slot (e.g. successive unread counts).
+    A send that takes longer than ``send_timeout`` closes the connection.
+    """
+
+    def __init__(self, user_id: int, websocket, max_queue: int, send_timeout: float, on_close=None):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self._queue: "OrderedDict[Any, str]" = OrderedDict()
+        self._sequence = 0
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._on_close = on_close
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, text: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a message for sending. Returns False if the connection is closed."""
+        if self._closed:
+            return False
+        if coalesce_key is not None and coalesce_key in self._queue:
+            self._queue[coalesce_key] = text
+            return True
+        if len(self._queue) >= self.max_queue:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+        if coalesce_key is None:
+            self._sequence += 1
+            coalesce_key = self._sequence
+        self._queue[coalesce_key] = text
+        self._ready.set()
+        return True
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, text = self._queue.popitem(last=False)
+                await _send_with_timeout(self.websocket, text, self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping notification socket for user {self.user_id}: {e!r}")
+            await self.close()
+
+    async def close(self, code: int = 1000):
+        """Stop the writer and close the socket."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.clear()
+        if self._on_close is not None:
+            self._on_close(self)
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+
+class NotificationHub:
+    """
+    Per-user registry of notification sockets.
+
+    ``send_to_user`` and ``broadcast`` only enqueue onto each connection's
+    queue, so fan-out to thousands of sockets never waits on any of them.
+
+    ``publish_to_user`` goes through the pub/sub backend instead: every
+    worker subscribes once at startup and routes incoming messages to the
+    sockets it holds, so a user is reached whichever worker they are on.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        channel: Optional[str] = None
+    ):
+        self.max_queue = max_queue or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WEBSOCKET_SEND_TIMEOUT
+        self.channel = channel or settings.PUBSUB_CHANNEL
+        self._connections: Dict[int, Set[NotificationConnection]] = {}
+        self._backend: Optional[PubSubBackend] = None
+
+    def register(self, user_id: int, websocket) -> NotificationConnection:
+        """Register an accepted socket for a user and start its writer."""
+        connection = NotificationConnection(
+            user_id, websocket, self.max_queue, self.send_timeout, on_close=self.unregister
+        )
+        self._connections.setdefault(user_id, set()).add(connection)
+        connection.start()
+        return connection
+
+    async def connect(self, user_id: int, websocket) -> NotificationConnection:
+        """Accept a socket and register it for a user."""
+        await websocket.accept()
+        return self.register(user_id, websocket)
+
+    def unregister(self, connection: NotificationConnection):
+        connections = self._connections.get(connection.user_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self._connections[connection.user_id]
+
+    async def disconnect(self, connection: NotificationConnection):
+        """Unregister a connection and stop its writer."""
+        await connection.close()
+
+    @staticmethod
+    def _encode(message: Union[str, dict]) -> str:
+        return message if isinstance(message, str) else json.dumps(message, default=str)
+
+    def send_to_user(self, user_id: int, message: Union[str, dict], coalesce_key: Optional[str] = None) -> int:
+        """
+        Queue a message for every socket of one user.
+
+        Returns:
+            int: Number of connections the message was queued on
+        """
+        connections = self._connections.get(user_id)
+        if not connections:
+            return 0
+        text = self._encode(message)
+        return sum(connection.enqueue(text, coalesce_key) for connection in list(connections))
+
+    def broadcast(self, message: Union[str, dict], coalesce_key: Optional[str] = None) -> int:
+        """Queue a message for every connected socket."""
+        text = self._encode(message)
+        return sum(
+            connection.enqueue(text, coalesce_key)
+            for connections in list(self._connections.values())
+            for connection in list(connections)
+        )
+
+    async def start_pubsub(self, backend: PubSubBackend):
+        """Subscribe this worker to messages published by all workers."""
+        await backend.subscribe(self.channel, self._on_message)
+        self._backend = backend
+
+    async def stop_pubsub(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+    def _on_message(self, channel: str, payload: str):
+        envelope = json.loads(payload)
+        if envelope.get("user_id") is None:
+            self.broadcast(envelope["message"], envelope.get("coalesce_key"))
+        else:
+            self.send_to_user(envelope["user_id"], envelope["message"], envelope.get("coalesce_key"))
+
+    async def publish_to_user(self, user_id: Optional[int], message: Union[str, dict], coalesce_key: Optional[str] = None):
+        """
+        Deliver a message to a user's sockets on every worker.
+
+        ``user_id=None`` broadcasts to everyone. Without a pub/sub backend, or
+        if publishing fails, the message is delivered to local sockets only.
+        """
+        if self._backend is not None:
+            envelope = json.dumps(
+                {"user_id": user_id, "message": self._encode(message), "coalesce_key": coalesce_key},
+                default=str
+            )
+            try:
+                await self._backend.publish(self.channel, envelope)
+                return
+            except Exception as e:
+                logger.error(f"Publishing notification failed, delivering locally only: {e}")
+        if user_id is None:
+            self.broadcast(message, coalesce_key)
+        else:
+            self.send_to_user(user_id, message, coalesce_key)
+
+    def is_connected(self, user_id: int) -> bool:
+        return bool(self._connections.get(user_id))
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
+    async def close_all(self):
+        """Close every registered socket."""
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                await connection.close(code=1001)
+
+
+notification_hub = NotificationHub()
@@ -0,0 +1,116 @@
+"""
+In-app notification bookkeeping for the Smart CRM SaaS application.
+This module counts unread notifications and prunes old read notifications.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
+from ..models.notification_model import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def count_unread(db: Session, user_id: int) -> int:
+    """
+    Count a user's unread notifications.
+
+    Served from the (user_id, is_read, created_at) index, so it is cheap
+    enough to run on every request. Counts are not cached across requests:
+    notifications are created and read by every serve.py worker and by
+    background jobs, and a per-process cache would serve stale badges.
+    """
+    return db.scalar(
+        select(func.count(Notification.id)).where(
+            Notification.user_id == user_id,
+            Notification.is_read == False  # noqa: E712
+        )
+    )
+
+
+def prune_read_notifications(db: Session, older_than: datetime, batch_size: int) -> int:
+    """
+    Delete read notifications created before ``older_than``.
+
+    Deletes in batches of ``batch_size`` rows, committing after each, so a
+    large backlog never holds a long write lock.
+
+    Returns:
+        int: Number of notifications deleted
+    """
+    deleted = 0
+    while True:
+        batch = select(Notification.id).where(
+            Notification.is_read == True,  # noqa: E712
+            Notification.created_at < older_than
+        ).limit(batch_size)
+        result = db.execute(
+            delete(Notification)
+            .where(Notification.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+class NotificationPruner:
+    """Periodically applies the read-notification retention policy."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        retention_days: Optional[int] = None,
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.retention_days = retention_days or settings.NOTIFICATION_RETENTION_DAYS
+        self.interval = interval or settings.NOTIFICATION_PRUNE_INTERVAL
+        self.batch_size = batch_size or settings.NOTIFICATION_PRUNE_BATCH_SIZE
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def prune(self) -> int:
+        db = self.session_factory()
+        try:
+            older_than = datetime.utcnow() - timedelta(days=self.retention_days)
+            deleted = prune_read_notifications(db, older_than, self.batch_size)
+            if deleted:
+                logger.info(f"Pruned {deleted} read notification(s) older than {self.retention_days} days")
+            return deleted
+        finally:
+            db.close()
+
+    async def _prune_loop(self):
+        while True:
+            try:
+                await run_blocking("db", self.prune)
+            except Exception as e:
+                logger.error(f"Notification pruning failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start pruning in the background on the running event loop."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._prune_loop())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+
+notification_pruner = NotificationPruner()
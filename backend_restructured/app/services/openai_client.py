@@ -1,11 +1,216 @@
 """
 OpenAI API client for the Smart CRM SaaS application.
+This module wraps chat completions with a concurrency limit, request timeouts
+and a TTL response cache. The transport is pluggable so the whole path can run
+offline against a stub.
 """
 
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
 from ..core.config import settings
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+
+
+class AIServiceError(Exception):
+    """Raised when the model provider fails to return a completion."""
+
+
+class AITimeoutError(AIServiceError):
+    """Raised when a completion does not finish within the request timeout."""
+
+
+class CompletionTransport:
+    """Base class for completion backends."""
+
+    async def complete(self, model: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections held by the transport."""
+
+
+class OpenAITransport(CompletionTransport):
+    """Chat completions through ``AsyncOpenAI`` with one shared HTTP client."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # Timeouts are enforced by AICompletionClient; retries are left to the caller
+            self._client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    async def complete(self, model: str, prompt: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content.strip()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class StubTransport(CompletionTransport):
+    """Offline transport that answers after a fixed latency, for tests and load tests."""
+
+    def __init__(self, latency: Optional[float] = None):
+        self.latency = settings.AI_STUB_LATENCY if latency is None else latency
+        self.calls = 0
+
+    async def complete(self, model: str, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        return f"[{model} stub {digest}] {prompt[:200]}"
+
+
+def create_transport(name: Optional[str] = None) -> CompletionTransport:
+    """Create the transport named by ``name`` or the AI_TRANSPORT setting."""
+    name = (name or settings.AI_TRANSPORT).lower()
+    if name == "openai":
+        return OpenAITransport()
+    if name == "stub":
+        return StubTransport()
+    raise ValueError(f"Unsupported AI transport: {name}")
+
+
+class AICompletionClient:
+    """
+    Async completion client shared by the AI endpoints.
+
+    At most ``max_concurrency`` completions run at once; further calls wait
+    for a slot instead of piling onto the provider. Results are cached for
+    ``cache_ttl`` seconds under sha256(model, prompt), and concurrent calls
+    for the same key share a single provider request. That request runs as a
+    task of its own, like a ``SingleFlight`` call, so it keeps going for the
+    other callers if the caller that started it goes away.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[CompletionTransport] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+    ):
+        self._transport = transport
+        self.model = model or settings.OPENAI_MODEL
+        self.max_concurrency = max_concurrency or settings.AI_MAX_CONCURRENCY
+        self.timeout = timeout or settings.AI_REQUEST_TIMEOUT
+        self.cache_ttl = settings.AI_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_size = cache_size or settings.AI_CACHE_SIZE
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def transport(self) -> CompletionTransport:
+        if self._transport is None:
+            self._transport = create_transport()
+        return self._transport
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # The app may be served from more than one event loop (e.g. under test)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @staticmethod
+    def cache_key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+    def _cached(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[0]
+
+    def _store(self, key: str, result: str):
+        if self.cache_ttl <= 0:
+            return
+        self._cache[key] = (result, time.monotonic() + self.cache_ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def complete(self, prompt: str, model: Optional[str] = None) -> str:
+        """
+        Return the completion for ``prompt``.
+
+        Raises:
+            AITimeoutError: If the provider does not answer within the timeout
+            AIServiceError: If the provider call fails
+        """
+        model = model or self.model
+        key = self.cache_key(model, prompt)
+        cached = self._cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            task = asyncio.ensure_future(self._fetch(key, model, prompt))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # A caller going away must not cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, model: str, prompt: str) -> str:
+        try:
+            async with self._get_semaphore():
+                result = await asyncio.wait_for(self.transport.complete(model, prompt), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise AITimeoutError(f"Model did not respond within {self.timeout:g}s")
+        except Exception as e:
+            raise AIServiceError(str(e)) from e
+        self._store(key, result)
+        return result
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieve the exception so a request whose callers all left is not reported as unhandled
+            task.exception()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    async def close(self):
+        if self._transport is not None:
+            await self._transport.close()
+
+
+ai_client = AICompletionClient()
+
 
-def get_openai_client():
-    return client
+def get_ai_client() -> AICompletionClient:
+    return ai_client
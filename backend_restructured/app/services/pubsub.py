@@ -0,0 +1,325 @@
+"""
+Cross-process publish/subscribe for the Smart CRM SaaS application.
+This module provides the backends used to fan real-time events out to every
+application worker: in-process (single worker), Redis and Postgres
+LISTEN/NOTIFY.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+from urllib.parse import unquote, urlparse
+
+from ..core.config import settings
+from ..utils.resp import RespError, encode_command, read_reply
+
+logger = logging.getLogger(__name__)
+
+# Receives (channel, payload) for every message on a subscribed channel
+MessageHandler = Callable[[str, str], None]
+
+
+class PubSubBackend:
+    """
+    Base class for pub/sub backends.
+
+    A worker calls ``subscribe`` once at startup; ``publish`` may then be
+    called from any request handler on that worker.
+    """
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        raise NotImplementedError
+
+    async def publish(self, channel: str, payload: str):
+        raise NotImplementedError
+
+    async def close(self):
+        """Close connections and stop receiving."""
+
+
+class InProcessBackend(PubSubBackend):
+    """Delivers messages to subscribers in the same process only."""
+
+    def __init__(self):
+        self._handlers = {}
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, payload: str):
+        for handler in self._handlers.get(channel, ()):
+            handler(channel, payload)
+
+    async def close(self):
+        self._handlers.clear()
+
+
+class RedisBackend(PubSubBackend):
+    """
+    Pub/sub over the Redis protocol without a client library.
+
+    One connection publishes and one dedicated connection subscribes, as a
+    subscribed Redis connection cannot issue other commands. The subscriber
+    reconnects with backoff and resubscribes if the connection drops.
+    ``publish`` gives up after ``publish_timeout`` seconds, so a connection
+    that stops answering cannot hold the publish lock indefinitely.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        subscribe_timeout: float = 5.0,
+        publish_timeout: float = 5.0
+    ):
+        parsed = urlparse(url)
+        self.ssl = parsed.scheme == "rediss"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscribe_timeout = subscribe_timeout
+        self.publish_timeout = publish_timeout
+        self._publisher: Optional[tuple] = None
+        self._publish_lock = asyncio.Lock()
+        self._subscriptions = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._subscriber_writer: Optional[asyncio.StreamWriter] = None
+        self._subscribed = asyncio.Event()
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        if self.password:
+            args = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            writer.write(encode_command(*args))
+            await writer.drain()
+            await read_reply(reader)
+        return reader, writer
+
+    async def publish(self, channel: str, payload: str):
+        await asyncio.wait_for(self._publish(channel, payload), timeout=self.publish_timeout)
+
+    async def _publish(self, channel: str, payload: str):
+        async with self._publish_lock:
+            try:
+                for attempt in range(2):
+                    try:
+                        if self._publisher is None:
+                            self._publisher = await self._connect()
+                        reader, writer = self._publisher
+                        writer.write(encode_command("PUBLISH", channel, payload))
+                        await writer.drain()
+                        await read_reply(reader)
+                        return
+                    except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                        # Stale connection; reconnect once before giving up
+                        self._close_publisher()
+                        if attempt:
+                            raise
+            except asyncio.CancelledError:
+                # Timed out mid-command; a late reply would be read as the next one's
+                self._close_publisher()
+                raise
+
+    def _close_publisher(self):
+        if self._publisher is not None:
+            self._publisher[1].close()
+            self._publisher = None
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._subscriptions[channel] = handler
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_loop())
+        elif self._subscriber_writer is not None:
+            self._subscriber_writer.write(encode_command("SUBSCRIBE", channel))
+            await self._subscriber_writer.drain()
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=self.subscribe_timeout)
+        except asyncio.TimeoutError:
+            # Keep starting up; the reader retries in the background
+            logger.warning(f"Redis pub/sub not reachable at {self.host}:{self.port}; still retrying")
+
+    async def _read_loop(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                reader, writer = await self._connect()
+                self._subscriber_writer = writer
+                writer.write(encode_command("SUBSCRIBE", *self._subscriptions))
+                await writer.drain()
+                delay = self.reconnect_delay
+                while True:
+                    reply = await read_reply(reader)
+                    if not isinstance(reply, list) or len(reply) < 3:
+                        continue
+                    if reply[0] == b"subscribe":
+                        self._subscribed.set()
+                    elif reply[0] == b"message":
+                        channel = reply[1].decode()
+                        handler = self._subscriptions.get(channel)
+                        if handler is not None:
+                            try:
+                                handler(channel, reply[2].decode())
+                            except Exception as e:
+                                logger.error(f"Pub/sub handler for '{channel}' failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError, OSError, RespError) as e:
+                logger.warning(f"Redis pub/sub connection lost ({e!r}); reconnecting in {delay:.1f}s")
+            finally:
+                self._subscribed.clear()
+                if self._subscriber_writer is not None:
+                    self._subscriber_writer.close()
+                    self._subscriber_writer = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        self._close_publisher()
+
+
+class PostgresBackend(PubSubBackend):
+    """
+    Pub/sub over Postgres LISTEN/NOTIFY using asyncpg.
+
+    Payloads are limited to just under 8000 bytes by Postgres, so events
+    should carry identifiers and small summaries rather than full documents.
+    The listening connection is supervised like the Redis subscriber: when it
+    closes or stops answering health checks, it is reopened with backoff and
+    every channel is LISTENed to again.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        subscribe_timeout: float = 5.0,
+        publish_timeout: float = 5.0,
+        health_check_interval: float = 30.0
+    ):
+        # asyncpg expects a plain postgresql:// DSN
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://").replace("postgresql+psycopg2://", "postgresql://")
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscribe_timeout = subscribe_timeout
+        self.publish_timeout = publish_timeout
+        self.health_check_interval = health_check_interval
+        self._listener = None
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._subscriptions = {}
+        self._listen_task: Optional[asyncio.Task] = None
+        self._listening = asyncio.Event()
+
+    @staticmethod
+    def _asyncpg():
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError("The Postgres pub/sub backend requires the 'asyncpg' package") from e
+        return asyncpg
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._asyncpg()
+        self._subscriptions[channel] = handler
+        if self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._listen_loop())
+        elif self._listening.is_set():
+            await self._listener.add_listener(channel, self._dispatch)
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout=self.subscribe_timeout)
+        except asyncio.TimeoutError:
+            # Keep starting up; the listener retries in the background
+            logger.warning("Postgres pub/sub not reachable; still retrying")
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str):
+        handler = self._subscriptions.get(channel)
+        if handler is not None:
+            try:
+                handler(channel, payload)
+            except Exception as e:
+                logger.error(f"Pub/sub handler for '{channel}' failed: {e}")
+
+    async def _listen_loop(self):
+        asyncpg = self._asyncpg()
+        delay = self.reconnect_delay
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._listener = await asyncpg.connect(self.dsn)
+                self._listener.add_termination_listener(lambda connection: lost.set())
+                for channel in list(self._subscriptions):
+                    await self._listener.add_listener(channel, self._dispatch)
+                self._listening.set()
+                delay = self.reconnect_delay
+                while True:
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.health_check_interval)
+                    except asyncio.TimeoutError:
+                        # A peer that vanished without closing the socket is only noticed by talking to it
+                        await asyncio.wait_for(self._listener.execute("SELECT 1"), timeout=self.subscribe_timeout)
+                    else:
+                        raise ConnectionError("listening connection closed")
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning(f"Postgres pub/sub connection lost ({e!r}); reconnecting in {delay:.1f}s")
+            finally:
+                self._listening.clear()
+                if self._listener is not None and not self._listener.is_closed():
+                    self._listener.terminate()
+                self._listener = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def publish(self, channel: str, payload: str):
+        await asyncio.wait_for(self._publish(channel, payload), timeout=self.publish_timeout)
+
+    async def _publish(self, channel: str, payload: str):
+        async with self._publish_lock:
+            try:
+                if self._publisher is None or self._publisher.is_closed():
+                    self._publisher = await self._asyncpg().connect(self.dsn)
+                await self._publisher.execute("SELECT pg_notify($1, $2)", channel, payload)
+            except asyncio.CancelledError:
+                # Timed out mid-query; the connection is still busy with it
+                if self._publisher is not None:
+                    self._publisher.terminate()
+                    self._publisher = None
+                raise
+
+    async def close(self):
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+        if self._publisher is not None and not self._publisher.is_closed():
+            await self._publisher.close()
+        self._publisher = None
+
+
+def create_pubsub_backend(url: Optional[str] = None) -> PubSubBackend:
+    """Create the backend for ``url`` or the PUBSUB_URL setting."""
+    url = url or settings.PUBSUB_URL
+    scheme = urlparse(url).scheme.split("+")[0]
+    if scheme in ("memory", ""):
+        return InProcessBackend()
+    if scheme in ("redis", "rediss"):
+        return RedisBackend(url)
+    if scheme in ("postgres", "postgresql"):
+        return PostgresBackend(url)
+    raise ValueError(f"Unsupported pub/sub backend: {url}")
@@ -0,0 +1,424 @@
+"""
+Scheduled report engine for the Smart CRM SaaS application.
+This module runs due ScheduledReport rows: it claims them, builds each distinct
+report once per tick, renders the PDFs in a worker pool and queues the results
+for every recipient in the email outbox.
+"""
+
+import asyncio
+import calendar
+import logging
+from collections import defaultdict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import executors, run_blocking
+from ..models.client_model import Client
+from ..models.financial_model import Expense, Payment, PaymentStatus
+from ..models.project_model import Project
+from ..models.scheduled_report_model import ScheduledReport
+from ..models.user_model import User
+from .email_service import EmailOutboxWorker, email_outbox
+from .report_service import create_table_flowable, generate_pdf_report
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_INTERVALS = ("daily", "weekly", "monthly")
+
+# Builders keyed by ScheduledReport.report_type. A builder receives an open
+# session and the report period and returns (summary lines, table rows), where
+# the first table row is the header.
+REPORT_BUILDERS: Dict[str, Callable[[Session, datetime, datetime], Tuple[List[str], List[list]]]] = {}
+
+
+def report_builder(report_type: str):
+    """Register a function as the data builder for a report type."""
+    def decorator(func: Callable[[Session, datetime, datetime], Tuple[List[str], List[list]]]):
+        REPORT_BUILDERS[report_type] = func
+        return func
+    return decorator
+
+
+@report_builder("financial")
+def build_financial_report(db: Session, period_start: datetime, period_end: datetime):
+    """Revenue, expenses and profit for the period."""
+    revenue = db.scalar(
+        select(func.coalesce(func.sum(Payment.amount), 0.0)).where(
+            Payment.status == PaymentStatus.COMPLETED,
+            Payment.payment_date >= period_start,
+            Payment.payment_date < period_end,
+        )
+    )
+    expenses = db.scalar(
+        select(func.coalesce(func.sum(Expense.amount), 0.0)).where(
+            Expense.expense_date >= period_start,
+            Expense.expense_date < period_end,
+        )
+    )
+    rows = [
+        ["Category", "Amount"],
+        ["Revenue", f"${revenue:,.2f}"],
+        ["Expenses", f"${expenses:,.2f}"],
+        ["Profit", f"${revenue - expenses:,.2f}"],
+    ]
+    return ["Completed payments and recorded expenses for the period."], rows
+
+
+@report_builder("client")
+def build_client_report(db: Session, period_start: datetime, period_end: datetime):
+    """New clients for the period, by industry."""
+    counts = db.execute(
+        select(Client.industry, func.count(Client.id))
+        .where(Client.created_at >= period_start, Client.created_at < period_end)
+        .group_by(Client.industry)
+        .order_by(func.count(Client.id).desc())
+    ).all()
+    total = db.scalar(select(func.count(Client.id)))
+    rows = [["Industry", "New clients"]] + [[industry or "Unspecified", count] for industry, count in counts]
+    new_clients = sum(count for _, count in counts)
+    return [f"{new_clients} new client(s) this period, {total} in total."], rows
+
+
+@report_builder("project")
+def build_project_report(db: Session, period_start: datetime, period_end: datetime):
+    """Projects created in the period, by status."""
+    counts = db.execute(
+        select(Project.status, func.count(Project.id))
+        .where(Project.created_at >= period_start, Project.created_at < period_end)
+        .group_by(Project.status)
+    ).all()
+    rows = [["Status", "Projects"]] + [
+        [getattr(project_status, "value", project_status), count] for project_status, count in counts
+    ]
+    return [f"{sum(count for _, count in counts)} project(s) created this period."], rows
+
+
+def add_interval(moment: datetime, interval: str, steps: int = 1, day: Optional[int] = None) -> datetime:
+    """
+    Move a schedule slot forward (or backward, with negative steps) by whole intervals.
+
+    Monthly slots land on ``day`` (default: the slot's own day of month),
+    clamped to the length of shorter months. Pass the schedule's anchor day so
+    a slot clamped to Feb 28 returns to the 31st in March.
+    """
+    if interval == "daily":
+        return moment + timedelta(days=steps)
+    if interval == "weekly":
+        return moment + timedelta(weeks=steps)
+    if interval == "monthly":
+        month_index = moment.month - 1 + steps
+        year = moment.year + month_index // 12
+        month = month_index % 12 + 1
+        day = min(day or moment.day, calendar.monthrange(year, month)[1])
+        return moment.replace(year=year, month=month, day=day)
+    raise ValueError(f"Unsupported schedule interval: {interval}")
+
+
+def catch_up(
+    next_run_at: datetime, interval: str, now: datetime, day: Optional[int] = None
+) -> Tuple[datetime, datetime, int]:
+    """
+    Resolve a due slot after possible downtime.
+
+    Returns:
+        Tuple of (slot to run, following slot, number of skipped slots). The
+        slot to run is the latest one that is due, so a report that missed
+        several runs is sent once for the most recent period instead of once
+        per missed period; the following slot is always in the future.
+    """
+    slot, skipped = next_run_at, 0
+    following = add_interval(slot, interval, day=day)
+    while following <= now:
+        slot, following, skipped = following, add_interval(following, interval, day=day), skipped + 1
+    return slot, following, skipped
+
+
+@dataclass
+class ReportRun:
+    """A claimed scheduled report and the period it covers."""
+    report_id: int
+    report_name: str
+    report_type: str
+    period_start: datetime
+    period_end: datetime
+    recipients: List[str] = field(default_factory=list)
+    # Claim state, restored if the run fails so the period is retried
+    claimed_next_run_at: Optional[datetime] = None
+    previous_last_run_at: Optional[datetime] = None
+    failed_runs: int = 0
+
+    @property
+    def group_key(self) -> Tuple[str, datetime, datetime]:
+        return self.report_type, self.period_start, self.period_end
+
+
+def parse_recipients(raw: Optional[str]) -> Tuple[List[str], List[int]]:
+    """Split a comma-separated recipient list into email addresses and user IDs."""
+    emails, user_ids = [], []
+    for item in (raw or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item.isdigit():
+            user_ids.append(int(item))
+        else:
+            emails.append(item)
+    return emails, user_ids
+
+
+def render_report_pdf(title: str, summary: List[str], rows: List[list]) -> bytes:
+    """Render report data to PDF bytes. Runs in the render pool."""
+    content = list(summary)
+    if len(rows) > 1:
+        content.append(create_table_flowable(rows))
+    return generate_pdf_report(title=title, content=content).getvalue()
+
+
+class ReportScheduler:
+    """
+    In-process scheduler for ScheduledReport rows.
+
+    Each tick selects due reports through the (is_active, next_run_at) index
+    and claims each one by advancing ``next_run_at`` with a conditional UPDATE
+    on its old value, so concurrent workers never send the same run twice.
+    Claimed reports with the same type and period are coalesced: the data is
+    gathered and the PDF rendered once, then mailed to the union of their
+    recipients. Rendering runs in the ``render`` executor so it neither blocks
+    the event loop nor competes with database work for threads.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        outbox: EmailOutboxWorker = email_outbox,
+        render_executor: Optional[Executor] = None,
+        poll_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.outbox = outbox
+        self.poll_interval = poll_interval or settings.REPORT_SCHEDULER_POLL_INTERVAL
+        self.batch_size = batch_size or settings.REPORT_SCHEDULER_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.REPORT_SCHEDULER_MAX_ATTEMPTS
+        self._render_executor = render_executor
+        self._loop_task: Optional[asyncio.Task] = None
+        self.reports_run = 0
+        self.reports_rendered = 0
+        self.reports_failed = 0
+
+    @property
+    def render_executor(self) -> Executor:
+        return self._render_executor or executors.get("render")
+
+    def _claim_due_reports(self, now: Optional[datetime] = None) -> List[ReportRun]:
+        """Claim up to ``batch_size`` due reports and advance their schedules."""
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            due = db.execute(
+                select(
+                    ScheduledReport.id,
+                    ScheduledReport.report_name,
+                    ScheduledReport.report_type,
+                    ScheduledReport.schedule_interval,
+                    ScheduledReport.next_run_at,
+                    ScheduledReport.run_day,
+                    ScheduledReport.last_run_at,
+                    ScheduledReport.failed_runs,
+                    ScheduledReport.recipients,
+                )
+                .where(ScheduledReport.is_active == True, ScheduledReport.next_run_at <= now)  # noqa: E712
+                .order_by(ScheduledReport.next_run_at)
+                .limit(self.batch_size)
+            ).all()
+
+            runs: List[ReportRun] = []
+            recipient_ids: Dict[int, List[int]] = {}
+            for row in due:
+                day = row.run_day or row.next_run_at.day
+                try:
+                    slot, following, skipped = catch_up(row.next_run_at, row.schedule_interval, now, day)
+                    period_start = add_interval(slot, row.schedule_interval, -1, day)
+                except ValueError as e:
+                    logger.warning(f"Deactivating scheduled report {row.id}: {e}")
+                    db.execute(
+                        update(ScheduledReport)
+                        .where(ScheduledReport.id == row.id)
+                        .values(is_active=False)
+                    )
+                    continue
+                claimed = db.execute(
+                    update(ScheduledReport)
+                    .where(ScheduledReport.id == row.id, ScheduledReport.next_run_at == row.next_run_at)
+                    .values(next_run_at=following, last_run_at=now, run_day=day)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not claimed:
+                    continue
+                if skipped:
+                    logger.info(f"Scheduled report {row.id} missed {skipped} run(s); sending the latest period only")
+                emails, user_ids = parse_recipients(row.recipients)
+                runs.append(ReportRun(
+                    row.id, row.report_name, row.report_type, period_start, slot, emails,
+                    claimed_next_run_at=following,
+                    previous_last_run_at=row.last_run_at,
+                    failed_runs=row.failed_runs or 0,
+                ))
+                if user_ids:
+                    recipient_ids[row.id] = user_ids
+            db.commit()
+
+            # Resolve user ID recipients for the whole batch in one query
+            wanted = {user_id for ids in recipient_ids.values() for user_id in ids}
+            if wanted:
+                emails_by_id = dict(db.execute(select(User.id, User.email).where(User.id.in_(wanted))).all())
+                for run in runs:
+                    run.recipients.extend(
+                        emails_by_id[user_id] for user_id in recipient_ids.get(run.report_id, ()) if user_id in emails_by_id
+                    )
+            return runs
+        finally:
+            db.close()
+
+    def _finish_runs(self, runs: List[ReportRun], succeeded: bool):
+        """
+        Record the outcome of claimed runs.
+
+        A failed run has its claim undone, with a conditional UPDATE on the
+        claimed ``next_run_at`` so a schedule edited in the meantime is left
+        alone, and becomes due again for the same period. After
+        ``max_attempts`` consecutive failures the period is skipped instead.
+        """
+        db = self.session_factory()
+        try:
+            for run in runs:
+                if succeeded:
+                    if not run.failed_runs:
+                        continue
+                    values = {"failed_runs": 0}
+                elif run.failed_runs + 1 >= self.max_attempts:
+                    logger.error(
+                        f"Scheduled report {run.report_id} failed {run.failed_runs + 1} time(s); "
+                        f"skipping the period ending {run.period_end:%Y-%m-%d}"
+                    )
+                    values = {"failed_runs": 0}
+                else:
+                    values = {
+                        "next_run_at": run.period_end,
+                        "last_run_at": run.previous_last_run_at,
+                        "failed_runs": run.failed_runs + 1,
+                    }
+                db.execute(
+                    update(ScheduledReport)
+                    .where(
+                        ScheduledReport.id == run.report_id,
+                        ScheduledReport.next_run_at == run.claimed_next_run_at,
+                    )
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def _build_report(self, report_type: str, period_start: datetime, period_end: datetime):
+        builder = REPORT_BUILDERS.get(report_type)
+        if builder is None:
+            raise LookupError(f"No builder registered for report type '{report_type}'")
+        db = self.session_factory()
+        try:
+            return builder(db, period_start, period_end)
+        finally:
+            db.close()
+
+    async def _run_group(self, key: Tuple[str, datetime, datetime], runs: List[ReportRun]):
+        report_type, period_start, period_end = key
+        title = f"{report_type.replace('_', ' ').capitalize()} Report"
+        period = f"{period_start:%Y-%m-%d} to {period_end:%Y-%m-%d}"
+        try:
+            summary, rows = await run_blocking("db", self._build_report, report_type, period_start, period_end)
+            pdf = await asyncio.get_running_loop().run_in_executor(
+                self.render_executor, render_report_pdf, f"{title} ({period})", summary, rows
+            )
+            self.reports_rendered += 1
+
+            # Identical content for every recipient lets the outbox send one
+            # provider call per batch of recipients
+            recipients = sorted({email for run in runs for email in run.recipients})
+            if recipients:
+                await run_blocking(
+                    "db",
+                    self._enqueue_report,
+                    recipients,
+                    f"{title}: {period}",
+                    f"<p>Your scheduled {report_type} report for {period} is attached.</p>",
+                    (f"{report_type}_report_{period_end:%Y%m%d}.pdf", pdf, "application/pdf")
+                )
+        except Exception as e:
+            logger.error(f"Failed to produce {report_type} report for {period}: {e}")
+            self.reports_failed += len(runs)
+            await run_blocking("db", self._finish_runs, runs, False)
+            return
+        self.reports_run += len(runs)
+        await run_blocking("db", self._finish_runs, runs, True)
+
+    def _enqueue_report(self, recipients: List[str], subject: str, html_content: str, attachment):
+        db = self.session_factory()
+        try:
+            self.outbox.enqueue(db, recipients, subject, html_content, attachments=[attachment])
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Run every due report once.
+
+        Returns:
+            int: Number of scheduled reports claimed in this tick
+        """
+        runs = await run_blocking("db", self._claim_due_reports, now)
+        groups: Dict[Tuple[str, datetime, datetime], List[ReportRun]] = defaultdict(list)
+        for run in runs:
+            groups[run.group_key].append(run)
+        if groups:
+            await asyncio.gather(*(self._run_group(key, group) for key, group in groups.items()))
+        return len(runs)
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Scheduled report poll failed: {e}")
+                claimed = 0
+            # Poll again immediately while there is a backlog
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """Start polling in the background on the running event loop."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._poll_loop())
+            logger.info("Report scheduler started")
+
+    async def stop(self):
+        """Stop polling."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+
+report_scheduler = ReportScheduler()
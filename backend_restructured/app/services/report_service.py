@@ -2,17 +2,22 @@
 Report generation service for the Smart CRM SaaS application.
 """
 
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from io import BytesIO
+from typing import TYPE_CHECKING
+
+# ReportLab is imported when a report is built, not at application startup
+if TYPE_CHECKING:
+    from reportlab.platypus import Table
 
 def generate_pdf_report(title: str, content: list) -> BytesIO:
     """
     Generates a PDF report with the given title and content.
     Content should be a list of ReportLab flowables (e.g., Paragraph, Table).
     """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
@@ -32,11 +37,15 @@ def generate_pdf_report(title: str, content: list) -> BytesIO:
     buffer.seek(0)
     return buffer
 
-def create_table_flowable(data: list, col_widths: list = None) -> Table:
+def create_table_flowable(data: list, col_widths: list = None) -> "Table":
     """
     Creates a ReportLab Table flowable from a list of lists.
     The first sublist is assumed to be the header.
     """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Table, TableStyle
+
     styles = getSampleStyleSheet()
     table_style = TableStyle([
         ('BACKGROUND', (0,0), (-1,0), colors.grey),
@@ -0,0 +1,240 @@
+"""
+Data snapshot export and import for the Smart CRM SaaS application.
+This module streams every table to a compressed NDJSON archive from a single
+read transaction and loads such an archive back in foreign-key order, so CRM
+data can move between environments and database engines.
+"""
+
+import base64
+import enum
+import gzip
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import Date, DateTime, Enum, LargeBinary, Numeric, Table, Time, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..core.config import settings
+from ..core.database import Base
+# Register every model with Base.metadata
+from ..models import (  # noqa: F401
+    user_model, client_model, project_model, financial_model, api_key_model,
+    user_preference_model, client_history_model, client_note_model,
+    automated_task_model, notification_model, project_milestone_model,
+    report_template_model, scheduled_report_model, email_outbox_model,
+    client_ai_analysis_model
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "smartcrm-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """Raised when an archive cannot be imported."""
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode()
+    return value
+
+
+def _decoder(column) -> Optional[Callable[[Any], Any]]:
+    """Return the function that turns an exported value back into the column's type."""
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat
+    if isinstance(column_type, Date):
+        return date.fromisoformat
+    if isinstance(column_type, Time):
+        return time.fromisoformat
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        return lambda name: column_type.enum_class[name]
+    if isinstance(column_type, Numeric) and column_type.asdecimal:
+        return Decimal
+    if isinstance(column_type, LargeBinary):
+        return base64.b64decode
+    return None
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, default=_encode, separators=(",", ":")) + "\n").encode()
+
+
+def _begin_snapshot(connection: Connection):
+    """Start a transaction that sees one consistent state of every table."""
+    if connection.dialect.name == "sqlite":
+        # pysqlite does not open a transaction for SELECTs on its own
+        connection.exec_driver_sql("BEGIN")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+
+
+def export_snapshot(engine: Engine, output_path: Path, chunk_rows: Optional[int] = None) -> Dict[str, int]:
+    """
+    Write every table in ``Base.metadata`` to a gzip-compressed NDJSON archive.
+
+    All tables are read inside one transaction, so the archive is a
+    consistent snapshot even while the application keeps writing. Rows are
+    fetched and written ``chunk_rows`` at a time, in foreign-key order, so
+    memory use does not grow with the size of the data.
+
+    The archive holds a manifest line, then for each table a header line with
+    its columns, one line per chunk with the rows as value lists, and an end
+    line with the row count.
+
+    Returns:
+        Dict[str, int]: Rows exported per table
+    """
+    chunk_rows = chunk_rows or settings.SNAPSHOT_CHUNK_ROWS
+    tables = Base.metadata.sorted_tables
+    counts: Dict[str, int] = {}
+    with engine.connect() as connection, gzip.open(output_path, "wb") as output:
+        _begin_snapshot(connection)
+        try:
+            output.write(_line({
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "created_at": datetime.utcnow(),
+                "dialect": connection.dialect.name,
+                "tables": [table.name for table in tables],
+            }))
+            for table in tables:
+                columns = [column.name for column in table.columns]
+                output.write(_line({"table": table.name, "columns": columns}))
+                query = select(table).order_by(*table.primary_key.columns)
+                result = connection.execution_options(stream_results=True, yield_per=chunk_rows).execute(query)
+                count = 0
+                for rows in result.partitions(chunk_rows):
+                    output.write(_line({"table": table.name, "rows": [list(row) for row in rows]}))
+                    count += len(rows)
+                output.write(_line({"table": table.name, "end": True, "count": count}))
+                counts[table.name] = count
+        finally:
+            connection.rollback()
+    logger.info(f"Exported {sum(counts.values())} rows from {len(counts)} tables to {output_path}")
+    return counts
+
+
+def _read_records(input_path: Path) -> Iterator[Dict[str, Any]]:
+    with gzip.open(input_path, "rb") as source:
+        for line in source:
+            yield json.loads(line)
+
+
+def _guard_truncation(records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    try:
+        yield from records
+    except (EOFError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"The archive is truncated or corrupt: {e}") from e
+
+
+def _clear_tables(connection: Connection, tables: List[Table]):
+    for table in reversed(tables):
+        connection.execute(table.delete())
+
+
+def _reset_sequences(connection: Connection, tables: List[Table]):
+    """Move Postgres id sequences past the imported ids."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        if "id" not in table.columns or not table.columns["id"].autoincrement:
+            continue
+        connection.execute(
+            text("SELECT setval(pg_get_serial_sequence(:table, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM " + table.name),
+            {"table": table.name},
+        )
+
+
+def import_snapshot(
+    engine: Engine,
+    input_path: Path,
+    batch_size: Optional[int] = None,
+    replace: bool = False,
+) -> Dict[str, int]:
+    """
+    Load an archive written by ``export_snapshot`` into the database.
+
+    Tables are loaded in the order they were exported, which is foreign-key
+    order, with multi-row inserts of ``batch_size`` rows; only one chunk is
+    held in memory at a time. The whole import is one transaction. Target
+    tables must be empty unless ``replace`` is set, in which case their rows
+    are deleted first. Tables or columns the current schema does not know
+    are skipped.
+
+    Raises:
+        SnapshotError: If the archive is not a snapshot or the target is not empty
+
+    Returns:
+        Dict[str, int]: Rows imported per table
+    """
+    batch_size = batch_size or settings.SNAPSHOT_IMPORT_BATCH_SIZE
+    tables = Base.metadata.tables
+    records = _read_records(input_path)
+    manifest = next(records, None)
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{input_path} is not a {SNAPSHOT_FORMAT} archive")
+    if manifest.get("version", 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {manifest['version']}")
+
+    targets = [tables[name] for name in manifest["tables"] if name in tables]
+    counts: Dict[str, int] = {}
+    with engine.begin() as connection:
+        if replace:
+            _clear_tables(connection, Base.metadata.sorted_tables)
+        else:
+            for table in targets:
+                if connection.scalar(select(func.count()).select_from(table)):
+                    raise SnapshotError(f"Table '{table.name}' is not empty; import with replace to overwrite it")
+
+        table = None
+        open_table: Optional[str] = None
+        keep: List[int] = []
+        names: List[str] = []
+        decoders: List[Optional[Callable[[Any], Any]]] = []
+        for record in _guard_truncation(records):
+            if "columns" in record:
+                if open_table is not None:
+                    raise SnapshotError(f"Table '{open_table}' is truncated in the archive")
+                open_table = record["table"]
+                table = tables.get(record["table"])
+                if table is None:
+                    logger.warning(f"Skipping table '{record['table']}', which is not in the current schema")
+                    continue
+                keep = [index for index, name in enumerate(record["columns"]) if name in table.columns]
+                names = [record["columns"][index] for index in keep]
+                decoders = [_decoder(table.columns[name]) for name in names]
+                counts[table.name] = 0
+            elif "rows" in record and table is not None and table.name == record["table"]:
+                rows = []
+                for values in record["rows"]:
+                    row = {}
+                    for name, index, decode in zip(names, keep, decoders):
+                        value = values[index]
+                        row[name] = decode(value) if decode is not None and value is not None else value
+                    rows.append(row)
+                for start in range(0, len(rows), batch_size):
+                    connection.execute(table.insert(), rows[start:start + batch_size])
+                counts[table.name] += len(rows)
+            elif record.get("end") and "table" in record:
+                open_table = None
+                if table is not None and table.name == record["table"] and counts[table.name] != record["count"]:
+                    raise SnapshotError(f"Table '{table.name}' is truncated in the archive")
+        if open_table is not None:
+            raise SnapshotError(f"Table '{open_table}' is truncated in the archive")
+        _reset_sequences(connection, targets)
+    logger.info(f"Imported {sum(counts.values())} rows into {len(counts)} tables from {input_path}")
+    return counts
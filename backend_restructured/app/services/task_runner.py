@@ -0,0 +1,261 @@
+"""
+Automated task runner for the Smart CRM SaaS application.
+This module polls due AutomatedTask rows, claims them atomically and executes
+them in the background with bounded concurrency. It only starts when
+TASK_RUNNER_ENABLED is set.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.executors import run_blocking
+from ..models.automated_task_model import AutomatedTask
+from ..models.notification_model import Notification
+
+logger = logging.getLogger(__name__)
+
+# Handlers keyed by AutomatedTask.task_type. A handler receives an open session
+# and the claimed task; raising marks the attempt as failed.
+TASK_HANDLERS: Dict[str, Callable[[Session, AutomatedTask], None]] = {}
+
+
+def task_handler(task_type: str):
+    """Register a function as the handler for a task type."""
+    def decorator(func: Callable[[Session, AutomatedTask], None]):
+        TASK_HANDLERS[task_type] = func
+        return func
+    return decorator
+
+
+@task_handler("reminder")
+@task_handler("follow_up")
+def notify_task_owner(db: Session, task: AutomatedTask):
+    """Deliver reminder and follow-up tasks as in-app notifications to their creator."""
+    target = f" for {task.target_type} #{task.target_id}" if task.target_type and task.target_id else ""
+    db.add(Notification(
+        user_id=task.created_by_id,
+        title=f"{task.task_type.replace('_', ' ').capitalize()}{target}",
+        message=task.details or "Scheduled task is due."
+    ))
+
+
+class TaskRunnerMetrics:
+    """Counters and latency totals for the task runner."""
+
+    def __init__(self):
+        self.claimed = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.total_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def record_completion(self, lag_seconds: float, run_seconds: float):
+        self.completed += 1
+        self.total_lag_seconds += lag_seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+        self.total_run_seconds += run_seconds
+        self.max_run_seconds = max(self.max_run_seconds, run_seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.running,
+            "average_lag_seconds": self.total_lag_seconds / self.completed if self.completed else None,
+            "max_lag_seconds": self.max_lag_seconds,
+            "average_run_seconds": self.total_run_seconds / self.completed if self.completed else None,
+            "max_run_seconds": self.max_run_seconds,
+        }
+
+
+class AutomatedTaskRunner:
+    """
+    In-process asyncio scheduler for automated tasks.
+
+    Every poll selects due tasks through the (is_completed, scheduled_time)
+    index and claims them with a single conditional UPDATE, so several
+    workers or processes can poll the same table without running a task
+    twice. A claim is a lease: if a worker dies mid-task, the task becomes
+    claimable again once ``lease_seconds`` have passed. Failed attempts are
+    retried after the lease expires, up to ``max_attempts`` times.
+
+    All database work runs in the threadpool so the event loop serving API
+    requests is never blocked by the runner.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.TASK_RUNNER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.TASK_RUNNER_POLL_INTERVAL
+        self.batch_size = batch_size or settings.TASK_RUNNER_BATCH_SIZE
+        self.lease_seconds = lease_seconds or settings.TASK_RUNNER_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.TASK_RUNNER_MAX_ATTEMPTS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.metrics = TaskRunnerMetrics()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: set = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _claim_due_tasks(self, limit: int) -> List[int]:
+        """Atomically claim up to ``limit`` due tasks and return their IDs."""
+        now = datetime.utcnow()
+        lease_cutoff = now - timedelta(seconds=self.lease_seconds)
+        claimable = (
+            AutomatedTask.is_completed == False,  # noqa: E712
+            AutomatedTask.scheduled_time <= now,
+            AutomatedTask.attempts < self.max_attempts,
+            or_(AutomatedTask.claimed_at.is_(None), AutomatedTask.claimed_at < lease_cutoff),
+        )
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+        db = self.session_factory()
+        try:
+            candidates = select(AutomatedTask.id).where(*claimable)\
+                .order_by(AutomatedTask.scheduled_time)\
+                .limit(limit)\
+                .scalar_subquery()
+            # Re-check the claim conditions in the UPDATE itself so that a
+            # concurrent worker that claimed the same row first wins.
+            db.execute(
+                update(AutomatedTask)
+                .where(AutomatedTask.id.in_(candidates), *claimable)
+                .values(claimed_by=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return list(db.scalars(select(AutomatedTask.id).where(AutomatedTask.claimed_by == token)))
+        finally:
+            db.close()
+
+    def _execute_task(self, task_id: int):
+        """Run the handler for a claimed task and record the outcome."""
+        db = self.session_factory()
+        started = time.perf_counter()
+        try:
+            task = db.get(AutomatedTask, task_id)
+            if task is None or task.is_completed:
+                return
+            try:
+                handler = TASK_HANDLERS.get(task.task_type)
+                if handler is None:
+                    raise LookupError(f"No handler registered for task type '{task.task_type}'")
+                handler(db, task)
+                completed_at = datetime.utcnow()
+                task.is_completed = True
+                task.completed_at = completed_at
+                task.claimed_by = None
+                task.last_error = None
+                task.attempts = (task.attempts or 0) + 1
+                db.commit()
+                self.metrics.record_completion(
+                    lag_seconds=max((completed_at - task.scheduled_time).total_seconds(), 0.0),
+                    run_seconds=time.perf_counter() - started,
+                )
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Automated task {task_id} failed: {e}")
+                # Keep claimed_at so the retry waits for the lease to expire
+                db.execute(
+                    update(AutomatedTask)
+                    .where(AutomatedTask.id == task_id)
+                    .values(
+                        claimed_by=None,
+                        attempts=AutomatedTask.attempts + 1,
+                        last_error=str(e)[:2000],
+                    )
+                )
+                db.commit()
+                self.metrics.failed += 1
+        finally:
+            db.close()
+
+    async def _run_task(self, task_id: int):
+        try:
+            await run_blocking("db", self._execute_task, task_id)
+        finally:
+            self.metrics.running -= 1
+            self._semaphore.release()
+
+    async def run_once(self) -> int:
+        """
+        Claim as many due tasks as there is free capacity for and start them.
+
+        Returns:
+            int: Number of tasks claimed in this poll
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        capacity = min(self.batch_size, self.concurrency - self.metrics.running)
+        if capacity <= 0:
+            return 0
+        task_ids = await run_blocking("db", self._claim_due_tasks, capacity)
+        self.metrics.claimed += len(task_ids)
+        for task_id in task_ids:
+            await self._semaphore.acquire()
+            self.metrics.running += 1
+            job = asyncio.create_task(self._run_task(task_id))
+            self._in_flight.add(job)
+            job.add_done_callback(self._in_flight.discard)
+        return len(task_ids)
+
+    async def drain(self):
+        """Wait for all started tasks to finish."""
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+
+    async def _poll_loop(self):
+        while not self._stopping:
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Automated task poll failed: {e}")
+                claimed = 0
+            # Poll again immediately while there is a backlog
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """Start polling in the background on the running event loop."""
+        if self._loop_task is None:
+            self._stopping = False
+            self._loop_task = asyncio.create_task(self._poll_loop())
+            logger.info(f"Automated task runner started ({self.worker_id}, concurrency={self.concurrency})")
+
+    async def stop(self):
+        """Stop polling and wait for running tasks to finish."""
+        self._stopping = True
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        await self.drain()
+
+
+task_runner = AutomatedTaskRunner()
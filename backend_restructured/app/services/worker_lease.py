@@ -0,0 +1,66 @@
+"""
+Leader leases for background jobs in the Smart CRM SaaS application.
+This module lets one process among all serve.py workers (on any host sharing
+the database) own a background job, through a row in the worker_leases table.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.worker_lease_model import WorkerLease
+
+
+class LeaderLease:
+    """
+    Time-limited ownership of a named background job.
+
+    The lease is taken and renewed with a conditional UPDATE that only
+    succeeds for the current holder or once the lease has expired, the same
+    scheme the task runner and email outbox use to claim rows. A holder must
+    renew it more often than every ``ttl`` seconds; if it dies, another
+    worker takes over when the lease expires.
+    """
+
+    def __init__(self, name: str, holder: str, ttl: float):
+        self.name = name
+        self.holder = holder
+        self.ttl = ttl
+
+    def acquire(self, db: Session, now: Optional[datetime] = None) -> bool:
+        """Take or renew the lease. Returns True if this worker holds it."""
+        now = now or datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        renewed = db.execute(
+            update(WorkerLease)
+            .where(
+                WorkerLease.name == self.name,
+                or_(WorkerLease.holder == self.holder, WorkerLease.expires_at < now),
+            )
+            .values(holder=self.holder, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if renewed:
+            db.commit()
+            return True
+        try:
+            db.execute(insert(WorkerLease).values(name=self.name, holder=self.holder, expires_at=expires_at))
+            db.commit()
+        except IntegrityError:
+            # Another worker holds a live lease
+            db.rollback()
+            return False
+        return True
+
+    def release(self, db: Session):
+        """Give the lease up so another worker can take over without waiting for it to expire."""
+        db.execute(
+            update(WorkerLease)
+            .where(WorkerLease.name == self.name, WorkerLease.holder == self.holder)
+            .values(expires_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
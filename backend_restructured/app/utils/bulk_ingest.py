@@ -0,0 +1,150 @@
+"""Streaming bulk ingestion utilities.
+
+Parses NDJSON or CSV uploads incrementally from an async byte stream so that
+large imports never hold the whole payload in memory.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+# Content types accepted for each upload format
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+
+class IngestFormatError(ValueError):
+    """Raised when the upload format cannot be determined."""
+
+
+def detect_format(content_type: Optional[str], requested_format: Optional[str] = None) -> str:
+    """Determine the upload format from an explicit format or the Content-Type header.
+
+    Args:
+        content_type: Value of the request Content-Type header
+        requested_format: Explicit format override ('ndjson' or 'csv')
+
+    Returns:
+        str: Either NDJSON or CSV
+
+    Raises:
+        IngestFormatError: If the format is not supported
+    """
+    if requested_format:
+        requested_format = requested_format.lower()
+        if requested_format in (NDJSON, "jsonl"):
+            return NDJSON
+        if requested_format == CSV:
+            return CSV
+        raise IngestFormatError(f"Unsupported format: {requested_format}")
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        return NDJSON
+    if media_type in CSV_CONTENT_TYPES:
+        return CSV
+    raise IngestFormatError(f"Unsupported content type: {content_type or 'none'}")
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode an async byte stream into text lines, normalising endings to LF.
+
+    Only LF ends a line, and a CR directly before it is dropped. ``splitlines``
+    is avoided because it also breaks on U+2028 and other characters that
+    JSON allows unescaped inside strings.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        # The last piece may be a partial line; hold it back for the next chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r") + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """Yield (line_number, record, error) tuples from an NDJSON byte stream.
+
+    Blank lines are skipped. Lines that are not valid JSON objects are yielded
+    with ``record`` set to the raw line and ``error`` describing the problem.
+    """
+    line_number = 0
+    async for line in _iter_lines(stream):
+        line_number += 1
+        text = line.strip()
+        if not text:
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line_number, text, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, record, "Each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+async def iter_csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """Yield (line_number, record, error) tuples from a CSV byte stream.
+
+    The first row is the header. Quoted fields may span several lines; a
+    record is complete once it contains an even number of quote characters.
+    Empty cells are returned as None so optional fields fall back to defaults.
+    """
+    header: Optional[List[str]] = None
+    buffer = ""
+    start_line = 0
+    line_number = 0
+    async for line in _iter_lines(stream):
+        line_number += 1
+        if not buffer:
+            start_line = line_number
+        buffer += line
+        if buffer.count('"') % 2:
+            continue
+        raw, buffer = buffer, ""
+        if not raw.strip():
+            continue
+        row = next(csv.reader([raw]))
+        if header is None:
+            header = [column.strip() for column in row]
+            continue
+        if len(row) != len(header):
+            yield start_line, raw.rstrip("\r\n"), f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        yield start_line, {key: (value if value != "" else None) for key, value in zip(header, row)}, None
+    if buffer.strip():
+        yield start_line, buffer.rstrip("\r\n"), "Unterminated quoted field"
+
+
+def iter_records(stream: AsyncIterator[bytes], upload_format: str) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """Return the record iterator for the given upload format."""
+    if upload_format == CSV:
+        return iter_csv_records(stream)
+    return iter_ndjson_records(stream)
+
+
+def format_validation_error(error: Exception) -> str:
+    """Flatten a pydantic ValidationError into a single readable message."""
+    errors = getattr(error, "errors", None)
+    if not callable(errors):
+        return str(error)
+    messages = []
+    for item in errors():
+        location = ".".join(str(part) for part in item.get("loc", ())) or "record"
+        messages.append(f"{location}: {item.get('msg')}")
+    return "; ".join(messages)
+
+
+def error_entry(line_number: int, message: str, record: Any = None) -> Dict[str, Any]:
+    """Build a row-level error entry returned to API callers."""
+    return {"line": line_number, "error": message, "record": record}
@@ -0,0 +1,223 @@
+"""Minimal Redis serialization protocol (RESP2) helpers.
+
+Just enough of the protocol for publish/subscribe and shared counters:
+encoding commands, reading replies from an asyncio stream, a pipelining
+client, and a small in-memory server that speaks the same protocol for tests
+and benchmarks.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+RespValue = Union[None, int, bytes, str, list]
+
+
+class RespError(Exception):
+    """Error reply returned by the server."""
+
+
+def encode_command(*args: Union[str, bytes, int]) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> RespValue:
+    """Read one reply from the stream.
+
+    Raises:
+        RespError: If the reply is an error
+        asyncio.IncompleteReadError: If the connection closes mid-reply
+    """
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RespError(f"Unexpected reply type: {line!r}")
+
+
+class RespClient:
+    """
+    Single-connection client that sends commands in pipelined batches.
+
+    The connection is opened on first use and reopened once if it turns out
+    to be stale.
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.ssl = parsed.scheme == "rediss"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self._connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        if self.password:
+            args = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            writer.write(encode_command(*args))
+            await writer.drain()
+            await read_reply(reader)
+        return reader, writer
+
+    async def pipeline(self, commands: Sequence[Sequence[Union[str, bytes, int]]]) -> List[RespValue]:
+        """Send all ``commands`` in one write and return their replies in order."""
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._connection is None:
+                        self._connection = await self._connect()
+                    reader, writer = self._connection
+                    writer.write(b"".join(encode_command(*command) for command in commands))
+                    await writer.drain()
+                    return [await read_reply(reader) for _ in commands]
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    self._drop()
+                    if attempt:
+                        raise
+
+    def _drop(self) -> Optional[asyncio.StreamWriter]:
+        writer = None
+        if self._connection is not None:
+            writer = self._connection[1]
+            writer.close()
+            self._connection = None
+        return writer
+
+    async def close(self):
+        writer = self._drop()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+class FakeRedisServer:
+    """
+    In-memory server implementing the pub/sub and counter subset of Redis.
+
+    Supports PING, AUTH, SELECT, PUBLISH, SUBSCRIBE, UNSUBSCRIBE, GET, INCRBY,
+    EXPIRE and DEL, which is what the pub/sub and rate limit backends use.
+    Intended for tests and benchmarks.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self._values: Dict[bytes, Tuple[int, Optional[float]]] = {}
+
+    def _get(self, key: bytes) -> Optional[int]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry[0]
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> "FakeRedisServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writers in self._subscribers.values():
+                for writer in writers:
+                    writer.close()
+            self._subscribers.clear()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: List[bytes] = []
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR protocol error\r\n")
+                    continue
+                name = command[0].upper()
+                if name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name in (b"AUTH", b"SELECT"):
+                    writer.write(b"+OK\r\n")
+                elif name == b"PUBLISH":
+                    channel, message = command[1], command[2]
+                    receivers = list(self._subscribers.get(channel, ()))
+                    payload = encode_command(b"message", channel, message)
+                    for receiver in receivers:
+                        receiver.write(payload)
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        self._subscribers.setdefault(channel, set()).add(writer)
+                        subscribed.append(channel)
+                        writer.write(b"*3\r\n$9\r\nsubscribe\r\n" + encode_command(channel)[4:] + b":%d\r\n" % len(subscribed))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in command[1:] or list(subscribed):
+                        self._subscribers.get(channel, set()).discard(writer)
+                        if channel in subscribed:
+                            subscribed.remove(channel)
+                        writer.write(b"*3\r\n$11\r\nunsubscribe\r\n" + encode_command(channel)[4:] + b":%d\r\n" % len(subscribed))
+                elif name == b"GET":
+                    value = self._get(command[1])
+                    writer.write(b"$-1\r\n" if value is None else encode_command(str(value))[4:])
+                elif name == b"INCRBY":
+                    key = command[1]
+                    value = (self._get(key) or 0) + int(command[2])
+                    expires = self._values[key][1] if key in self._values else None
+                    self._values[key] = (value, expires)
+                    writer.write(b":%d\r\n" % value)
+                elif name == b"EXPIRE":
+                    key = command[1]
+                    value = self._get(key)
+                    if value is not None:
+                        self._values[key] = (value, time.monotonic() + int(command[2]))
+                    writer.write(b":%d\r\n" % (value is not None))
+                elif name == b"DEL":
+                    removed = sum(self._values.pop(key, None) is not None for key in command[1:])
+                    writer.write(b":%d\r\n" % removed)
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._subscribers.get(channel, set()).discard(writer)
+            writer.close()
@@ -0,0 +1,65 @@
+"""
+AI completion client load test for the Smart CRM SaaS application.
+
+Drives ``AICompletionClient`` with the offline stub transport to show the
+effect of the concurrency limit and the response cache:
+
+    python benchmarks/ai_client_load.py --requests 500 --unique 50 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(requests: int, unique: int, concurrency: int, latency: float, cache_ttl: float):
+    from app.services.openai_client import AICompletionClient, StubTransport
+
+    transport = StubTransport(latency=latency)
+    client = AICompletionClient(
+        transport=transport, max_concurrency=concurrency, timeout=60, cache_ttl=cache_ttl
+    )
+    latencies = []
+
+    async def one(i):
+        started = time.perf_counter()
+        await client.complete(f"Analyze client {i % unique}")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{requests} requests ({unique} unique prompts), concurrency {concurrency}, "
+        f"stub latency {latency * 1000:.0f} ms, cache ttl {cache_ttl:g}s"
+    )
+    print(
+        f"{elapsed:.2f}s total, {requests / elapsed:.0f} req/s, provider calls {transport.calls}, "
+        f"cache hits {client.cache_hits}"
+    )
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--unique", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--cache-ttl", type=float, default=3600)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.unique, args.concurrency, args.latency, args.cache_ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Full vs incremental backup benchmark for the Smart CRM SaaS application.
+
+Grows a scratch SQLite database in rounds (inserting new rows and updating a
+slice of existing ones) and after each round takes a full and an incremental
+backup, reporting time and size of both and the time of the online snapshot
+both start from (which copies the whole database, so it bounds how fast an
+incremental can be), then checks a point-in-time restore:
+
+    python benchmarks/backup_incremental.py --rounds 5 --rows 200000 --updates 0.01
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def grow(db_path: Path, rows: int, update_fraction: float):
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS clients (id INTEGER PRIMARY KEY, company_name TEXT, email TEXT, general_notes TEXT)"
+    )
+    start = connection.execute("SELECT COALESCE(MAX(id), 0) FROM clients").fetchone()[0]
+    connection.executemany(
+        "INSERT INTO clients (company_name, email, general_notes) VALUES (?, ?, ?)",
+        ((f"Company {i}", f"contact{i}@example.com", "x" * random.randint(50, 300)) for i in range(start, start + rows)),
+    )
+    total = start + rows
+    updates = random.sample(range(1, total + 1), int(total * update_fraction))
+    connection.executemany("UPDATE clients SET general_notes = ? WHERE id = ?", (("updated", i) for i in updates))
+    connection.commit()
+    connection.close()
+    return total
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run(rounds: int, rows: int, update_fraction: float, compression: str):
+    from app.core.config import settings
+    from app.services.backup_service import (
+        BackupJob, _take_snapshot, create_database_backup, create_incremental_backup, restore_database
+    )
+
+    settings.BACKUP_STEP_PAUSE = 0
+    workdir = Path(tempfile.mkdtemp(prefix="backup_bench_"))
+    db_path = workdir / "bench.db"
+    full_dir, incremental_dir = workdir / "full", workdir / "incremental"
+
+    print(
+        f"{'round':>5} {'rows':>10} {'db MB':>8} | {'snap s':>7} | {'full s':>7} {'full MB':>8} | "
+        f"{'incr s':>7} {'incr MB':>8} {'pages':>14}"
+    )
+    for round_number in range(1, rounds + 1):
+        total = grow(db_path, rows, update_fraction)
+        snapshot_path = workdir / "snapshot.db"
+        _, snapshot_seconds = timed(_take_snapshot, db_path, snapshot_path, BackupJob())
+        snapshot_path.unlink()
+        full, full_seconds = timed(create_database_backup, db_path=db_path, backup_dir=full_dir, compression=compression)
+        job = BackupJob()
+        incremental, incremental_seconds = timed(
+            create_incremental_backup, job, db_path=db_path, backup_dir=incremental_dir, compression=compression
+        )
+        changed = job.pages_changed if job.pages_changed is not None else job.pages_total
+        print(
+            f"{round_number:>5} {total:>10} {db_path.stat().st_size / 1e6:>8.1f} | {snapshot_seconds:>7.2f} | "
+            f"{full_seconds:>7.2f} {full.stat().st_size / 1e6:>8.2f} | "
+            f"{incremental_seconds:>7.2f} {incremental.stat().st_size / 1e6:>8.2f} {changed:>6}/{job.pages_total:<7}"
+        )
+
+    restored = workdir / "restored.db"
+    (applied, restore_seconds) = timed(restore_database, restored, incremental_dir, db_path.stem)
+    source = sqlite3.connect(db_path).execute("SELECT COUNT(*), SUM(LENGTH(general_notes)) FROM clients").fetchone()
+    copy = sqlite3.connect(restored).execute("SELECT COUNT(*), SUM(LENGTH(general_notes)) FROM clients").fetchone()
+    print(f"restored {len(applied)} backup(s) in {restore_seconds:.2f}s, matches source: {source == copy}")
+    print(f"scratch files in {workdir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=200000, help="Rows inserted per round")
+    parser.add_argument("--updates", type=float, default=0.01, help="Fraction of rows updated per round")
+    parser.add_argument("--compression", default="gzip")
+    args = parser.parse_args()
+    run(args.rounds, args.rows, args.updates, args.compression)
+
+
+if __name__ == "__main__":
+    main()
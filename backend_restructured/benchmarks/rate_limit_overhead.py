@@ -0,0 +1,95 @@
+"""
+Rate limit overhead benchmark for the Smart CRM SaaS application.
+
+Calls ``RateLimitMiddleware`` directly around a no-op ASGI app, once with
+and once without the limiter, and reports the added time per request:
+
+    python benchmarks/rate_limit_overhead.py --requests 200000 --users 1000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def noop_app(scope, receive, send):
+    pass
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure(app, scopes) -> float:
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+async def run(requests: int, users: int, api_keys: bool):
+    from app.auth.auth import create_access_token
+    from app.core.limiter import RateLimiter, RateLimitMiddleware
+    from app.services.api_key_service import APIKeyAuthenticator, hash_api_key
+
+    # Budgets large enough that every request is allowed and fully processed
+    limiter = RateLimiter(classes={"default": [1e9, 1e9]})
+    authenticator = APIKeyAuthenticator()
+    middleware = RateLimitMiddleware(noop_app, limiter=limiter, authenticator=authenticator)
+    if api_keys:
+        # Resolved keys are served from the authenticator cache; seed it as if each key had been looked up
+        for i in range(users):
+            authenticator._cache[hash_api_key(f"key-{i}")] = (i, i, float("inf"))
+        headers = [[(b"x-api-key", f"key-{i}".encode())] for i in range(users)]
+    else:
+        headers = [
+            [(b"authorization", f"Bearer {create_access_token({'sub': f'user{i}@example.com'})}".encode())]
+            for i in range(users)
+        ]
+    scopes = [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/clients",
+            "client": ("127.0.0.1", 50000),
+            "headers": [(b"host", b"localhost"), (b"accept", b"application/json")] + headers[i % users],
+        }
+        for i in range(requests)
+    ]
+
+    # Warm the token cache and buckets
+    await measure(middleware, scopes[:users])
+    baseline = await measure(noop_app, scopes)
+    limited = await measure(middleware, scopes)
+    overhead = (limited - baseline) / requests * 1e6
+    identity = "API keys" if api_keys else "bearer tokens"
+    print(f"{requests} requests from {users} {identity}, {len(limiter._buckets)} buckets")
+    print(f"overhead {overhead:.2f} µs per request ({requests / limited:.0f} req/s through the limiter)")
+    await limiter.stop()
+    return overhead
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--api-keys", action="store_true")
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    args = parser.parse_args()
+    overhead = asyncio.run(run(args.requests, args.users, args.api_keys))
+    if overhead > args.budget_us:
+        print(f"❌ Overhead exceeds the {args.budget_us:g} µs budget")
+        sys.exit(1)
+    print(f"✅ Within the {args.budget_us:g} µs budget")
+
+
+if __name__ == "__main__":
+    main()
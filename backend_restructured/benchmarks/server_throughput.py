@@ -0,0 +1,128 @@
+"""
+Server throughput benchmark for the Smart CRM SaaS application.
+
+Starts the development launcher (single uvicorn process with reload, as
+``python main.py`` does) and the production launcher (``serve.py``) in turn,
+drives ``/health`` over keep-alive connections from an asyncio load
+generator, and compares requests per second and latency:
+
+    python benchmarks/server_throughput.py --duration 10 --connections 64 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the benchmark off the background workers and the rate limiter
+SERVER_ENV = {
+    "TASK_RUNNER_ENABLED": "false",
+    "REPORT_SCHEDULER_ENABLED": "false",
+    "EMAIL_OUTBOX_ENABLED": "false",
+    "NOTIFICATION_PRUNE_ENABLED": "false",
+    "API_KEY_USAGE_FLUSH_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_ready(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as connection:
+                connection.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                if connection.recv(12).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+async def connection_loop(port: int, path: str, until: float, latencies: List[float]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            writer.write(request)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def drive(port: int, path: str, connections: int, duration: float) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    until = started + duration
+    await asyncio.gather(*(connection_loop(port, path, until, latencies) for _ in range(connections)))
+    return time.perf_counter() - started, latencies
+
+
+def run_launcher(name: str, command: List[str], port: int, args) -> Tuple[str, float, float, float]:
+    env = dict(os.environ, **SERVER_ENV)
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_until_ready(port)
+        # Warm up imports, caches and connections
+        asyncio.run(drive(port, args.path, args.connections, 1))
+        elapsed, latencies = asyncio.run(drive(port, args.path, args.connections, args.duration))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    return name, len(latencies) / elapsed, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--workers", type=int, help="serve.py workers (default: one per available CPU)")
+    parser.add_argument("--path", default="/health")
+    args = parser.parse_args()
+
+    dev_port = free_port()
+    prod_port = free_port()
+    serve_command = [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(prod_port)]
+    if args.workers:
+        serve_command += ["--workers", str(args.workers)]
+    launchers = [
+        ("main.py (uvicorn, reload)",
+         [sys.executable, "-m", "uvicorn", "main:app", "--port", str(dev_port), "--reload", "--log-level", "warning"],
+         dev_port),
+        ("serve.py (prefork)", serve_command, prod_port),
+    ]
+
+    print(f"{args.connections} keep-alive connections for {args.duration:g}s against {args.path}")
+    results = [run_launcher(name, command, port, args) for name, command, port in launchers]
+    for name, rate, p50, p99 in results:
+        print(f"  {name:<28} {rate:8.0f} req/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms")
+    print(f"  speedup {results[1][1] / results[0][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+API process startup benchmark for the Smart CRM SaaS application.
+
+Imports ``main`` in fresh interpreters under ``python -X importtime`` and
+reports the import time of the application, the slowest modules, and any
+heavy integration that was imported eagerly:
+
+    python benchmarks/startup_time.py --runs 5 --top 15 --budget-ms 6000
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Integrations that must only be imported when first used
+LAZY_MODULES = ("reportlab", "openai", "sendgrid", "slowapi", "alembic")
+
+# Import budget for ``import main``, enforced by tests/test_startup.py
+DEFAULT_BUDGET_MS = 6000
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Return ``{module: (self µs, cumulative µs)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    """Import ``module`` in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def eager_lazy_modules(modules: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(name for name in modules if name.split(".")[0] in LAZY_MODULES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    # One untimed run so every run reads source and bytecode from the page cache
+    measure(args.module)
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = [modules[args.module][1] / 1000 for modules in runs]
+    print(f"import {args.module}: median {statistics.median(totals):.0f} ms, "
+          f"min {min(totals):.0f} ms, max {max(totals):.0f} ms over {args.runs} runs")
+
+    fastest = runs[totals.index(min(totals))]
+    print("\nSlowest modules by self time (fastest run):")
+    for name, (self_us, cumulative_us) in sorted(fastest.items(), key=lambda item: item[1][0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms total  {name}")
+
+    failed = False
+    eager = eager_lazy_modules(fastest)
+    if eager:
+        print(f"\n❌ Imported at startup: {', '.join(eager)}")
+        failed = True
+    if min(totals) > args.budget_ms:
+        print(f"\n❌ Startup exceeds the {args.budget_ms:g} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\n✅ Within the {args.budget_ms:g} ms budget, no heavy integrations imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+WebSocket notification fan-out benchmark for the Smart CRM SaaS application.
+
+In-process mode (default) registers N fake sockets with a NotificationHub,
+a fraction of which are slow, and measures how long it takes for a pushed
+message to reach every fast socket:
+
+    python benchmarks/websocket_fanout.py --sockets 10000 --slow-fraction 0.01
+
+Server mode opens N real WebSocket connections for one user against a running
+server, creates a notification through the API and measures the time until
+every socket has received it (raise ``ulimit -n`` above N first):
+
+    python benchmarks/websocket_fanout.py --url http://localhost:8000 \\
+        --user-id 1 --token <access token> --sockets 10000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class BenchmarkSocket:
+    """Fake socket that records when each message arrives."""
+
+    delivered = 0
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received_at = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received_at.append(time.perf_counter())
+        BenchmarkSocket.delivered += 1
+
+    async def close(self, code=1000):
+        pass
+
+
+async def run_in_process(sockets: int, slow_fraction: float, slow_delay: float, rounds: int):
+    from app.services.notification_hub import NotificationHub
+
+    hub = NotificationHub(max_queue=100, send_timeout=slow_delay / 2)
+    slow_count = int(sockets * slow_fraction)
+    fake_sockets = [BenchmarkSocket(slow_delay if i < slow_count else 0.0) for i in range(sockets)]
+    for index, socket in enumerate(fake_sockets):
+        hub.register(index % 1000, socket)
+    fast_sockets = fake_sockets[slow_count:]
+
+    print(f"{sockets} sockets ({slow_count} slow, {slow_delay}s per send)")
+    for round_number in range(1, rounds + 1):
+        started = time.perf_counter()
+        queued = hub.broadcast({"type": "notification", "round": round_number})
+        enqueue_seconds = time.perf_counter() - started
+        while BenchmarkSocket.delivered < len(fast_sockets) * round_number:
+            await asyncio.sleep(0.001)
+        latencies = [socket.received_at[round_number - 1] - started for socket in fast_sockets]
+        print(
+            f"round {round_number}: queued on {queued} sockets in {enqueue_seconds * 1000:.1f} ms, "
+            f"fast sockets p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms"
+        )
+    await asyncio.sleep(slow_delay)
+    print(f"connections left after slow sockets timed out: {hub.connection_count}")
+    await hub.close_all()
+
+
+async def run_against_server(url: str, user_id: int, token: str, sockets: int):
+    import httpx
+    import websockets
+
+    ws_url = url.replace("http", "ws", 1) + f"/api/v1/notifications/ws/{user_id}?token={token}"
+    connections = []
+    started = time.perf_counter()
+    for start in range(0, sockets, 500):
+        connections += await asyncio.gather(*(websockets.connect(ws_url) for _ in range(min(500, sockets - start))))
+    print(f"opened {len(connections)} sockets in {time.perf_counter() - started:.1f}s")
+
+    async with httpx.AsyncClient(base_url=url, headers={"Authorization": f"Bearer {token}"}) as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/notifications/in-app",
+            json={"user_id": user_id, "title": "Benchmark", "message": "fan-out"}
+        )
+        response.raise_for_status()
+
+        async def receive(connection):
+            await connection.recv()
+            return time.perf_counter() - started
+
+        latencies = await asyncio.gather(*(receive(connection) for connection in connections))
+    print(
+        f"delivered to {len(latencies)} sockets: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+    )
+    await asyncio.gather(*(connection.close() for connection in connections))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--url")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--token")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run_against_server(args.url, args.user_id, args.token, args.sockets))
+    else:
+        asyncio.run(run_in_process(args.sockets, args.slow_fraction, args.slow_delay, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
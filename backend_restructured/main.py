@@ -15,6 +15,16 @@ import time
 from app.core.config import settings
 from app.core.database import create_database_tables
 from app.api import api_router
+from app.api.routing import install_route_index
+from app.services.task_runner import task_runner
+from app.services.report_scheduler import report_scheduler
+from app.services.email_service import email_outbox
+from app.services.notification_hub import notification_hub
+from app.services.pubsub import create_pubsub_backend
+from app.services.notification_service import notification_pruner
+from app.services.openai_client import ai_client
+from app.services.api_key_service import api_key_authenticator
+from app.services.import_service import import_jobs
 
 from app.core.logging_config import setup_logging
 
@@ -33,20 +43,59 @@ async def lifespan(app: FastAPI):
     
     # Create database tables
     try:
-        create_database_tables()
-        logger.info("Database tables created successfully")
+        if create_database_tables():
+            logger.info("Database tables created successfully")
+        else:
+            logger.info("Database is at the latest migration; skipped table creation")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         raise
     
+    # Route notifications published by any worker to this worker's sockets
+    await notification_hub.start_pubsub(create_pubsub_backend())
+    
+    # Start background workers
+    if settings.TASK_RUNNER_ENABLED:
+        task_runner.start()
+    if settings.REPORT_SCHEDULER_ENABLED:
+        report_scheduler.start()
+    if settings.EMAIL_OUTBOX_ENABLED:
+        email_outbox.start()
+    if settings.NOTIFICATION_PRUNE_ENABLED:
+        notification_pruner.start()
+    if settings.RATE_LIMIT_ENABLED:
+        rate_limiter.start()
+    if settings.API_KEY_USAGE_FLUSH_ENABLED:
+        api_key_authenticator.start()
+    
     logger.info("Application startup completed")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Smart CRM SaaS application...")
+    if settings.TASK_RUNNER_ENABLED:
+        await task_runner.stop()
+    if settings.REPORT_SCHEDULER_ENABLED:
+        await report_scheduler.stop()
+    if settings.EMAIL_OUTBOX_ENABLED:
+        await email_outbox.stop()
+    if settings.NOTIFICATION_PRUNE_ENABLED:
+        await notification_pruner.stop()
+    if settings.RATE_LIMIT_ENABLED:
+        await rate_limiter.stop()
+    if settings.API_KEY_USAGE_FLUSH_ENABLED:
+        await api_key_authenticator.stop()
+    await import_jobs.stop()
+    executors.shutdown()
+    await ai_client.close()
+    await notification_hub.stop_pubsub()
+    await notification_hub.close_all()
 
-from app.core.limiter import limiter
+from app.core.admission import AdmissionControlMiddleware
+from app.core.executors import executors
+from app.core.singleflight import single_flight_stats
+from app.core.limiter import RateLimitMiddleware, rate_limiter
 
 # Create FastAPI application instance
 tags_metadata = [
@@ -123,12 +172,14 @@ app = FastAPI(
     openapi_tags=tags_metadata,
 )
 
-from slowapi.errors import RateLimitExceeded
-from slowapi.errors import RateLimitExceeded
-from slowapi import _rate_limit_exceeded_handler
+# Per-route-class concurrency caps with load shedding; added first so it is
+# the innermost middleware and rate-limited requests never take a slot
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Per-user and per-API-key rate limits; added before CORS so it runs inside it
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, authenticator=api_key_authenticator)
 
 # Configure CORS middleware
 app.add_middleware(
@@ -286,17 +337,22 @@ async def api_status():
             "swagger": "/docs",
             "redoc": "/redoc",
             "openapi": "/openapi.json"
-        }
+        },
+        "executors": executors.stats(),
+        "single_flight": single_flight_stats()
     }
 
 # Include API routes
 app.include_router(api_router)
 
+# Drop unreachable duplicate routes and dispatch through a prefix index
+install_route_index(app.router)
+
 # Development server configuration
 if __name__ == "__main__":
     import uvicorn
     
-    logger.info("Starting development server...")
+    logger.info("Starting development server (use serve.py in production)...")
     uvicorn.run(
         "backend_restructured.main:app",
         host="0.0.0.0",
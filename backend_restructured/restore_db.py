@@ -0,0 +1,58 @@
+"""
+Point-in-time database restore for the Smart CRM SaaS application.
+
+Rebuilds the SQLite database from the newest full backup at or before the
+chosen time plus the incremental backups that follow it:
+
+    python restore_db.py --list
+    python restore_db.py --until "2024-03-01 14:30" --output restored.db
+    python restore_db.py --output smartcrm.db --force     # latest state
+
+Stop the application before restoring over the live database file.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from app.services.backup_service import backup_directory, database_path, list_backups, restore_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--backup-dir", type=Path, help="Directory holding the backups (default: BACKUP_DIR)")
+    parser.add_argument("--prefix", help="Database name the backups were taken from (default: from DATABASE_URL)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Restore the state as of this local time")
+    parser.add_argument("--output", type=Path, help="Where to write the restored database")
+    parser.add_argument("--force", action="store_true", help="Overwrite the output file if it exists")
+    parser.add_argument("--list", action="store_true", help="List the available backups and exit")
+    args = parser.parse_args()
+
+    backup_dir = args.backup_dir or backup_directory()
+    prefix = args.prefix or database_path().stem
+
+    if args.list:
+        for entry in list_backups(backup_dir, prefix):
+            kind = "full" if entry.kind == "backup" else "incremental"
+            print(f"{entry.created_at:%Y-%m-%d %H:%M:%S}  {kind:<11}  {entry.path.stat().st_size:>12}  {entry.path.name}")
+        return 0
+
+    if args.output is None:
+        parser.error("--output is required unless --list is given")
+    if args.output.exists() and not args.force:
+        parser.error(f"{args.output} exists; pass --force to overwrite it")
+
+    try:
+        applied = restore_database(args.output, backup_dir, prefix, args.until)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Restore failed: {e}", file=sys.stderr)
+        return 1
+    for path in applied:
+        print(f"Applied {path.name}")
+    print(f"✅ Restored {len(applied)} backup(s) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
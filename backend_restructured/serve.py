@@ -0,0 +1,54 @@
+"""
+Production server for the Smart CRM SaaS application.
+
+Imports the app once, then serves it from preforked uvicorn workers using
+uvloop and httptools when they are installed:
+
+    python serve.py                          # one worker per available CPU
+    python serve.py --workers 4 --port 8080
+    python serve.py --print-config           # show what would be used
+
+Send SIGTERM to the master process to drain in-flight requests and stop.
+For local development with auto-reload, run ``python main.py`` instead.
+"""
+
+import argparse
+import sys
+
+from app.core.config import settings
+from app.core.server import PreforkServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: one per available CPU)")
+    parser.add_argument("--graceful-timeout", type=int, help="Seconds to let requests finish on shutdown")
+    parser.add_argument("--loop", choices=["uvloop", "asyncio"], help="Event loop (default: uvloop if installed)")
+    parser.add_argument("--http", choices=["httptools", "h11"], help="HTTP parser (default: httptools if installed)")
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    parser.add_argument("--print-config", action="store_true", help="Print the server settings and exit")
+    args = parser.parse_args()
+
+    # Imported before forking so every worker shares the loaded app
+    from main import app
+
+    server = PreforkServer(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        graceful_timeout=args.graceful_timeout,
+        loop=args.loop,
+        http=args.http,
+        access_log=args.access_log,
+    )
+    if args.print_config:
+        print(f"host={server.host} port={server.port} workers={server.workers} loop={server.loop} http={server.http}")
+        return 0
+    return server.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
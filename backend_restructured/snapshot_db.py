@@ -0,0 +1,48 @@
+"""
+Data snapshot export and import for the Smart CRM SaaS application.
+
+Moves all CRM data between environments, including between SQLite and
+Postgres, through a compressed NDJSON archive:
+
+    python snapshot_db.py export crm_snapshot.ndjson.gz
+    DATABASE_URL=postgresql://... python snapshot_db.py import crm_snapshot.ndjson.gz
+
+The target schema must already exist (run the Alembic migrations first).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.core.database import engine
+from app.services.snapshot_service import SnapshotError, export_snapshot, import_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write a snapshot of the database named by DATABASE_URL")
+    export_parser.add_argument("archive", type=Path)
+    export_parser.add_argument("--chunk-rows", type=int, help="Rows per archive chunk (default: SNAPSHOT_CHUNK_ROWS)")
+    import_parser = commands.add_parser("import", help="Load a snapshot into the database named by DATABASE_URL")
+    import_parser.add_argument("archive", type=Path)
+    import_parser.add_argument("--batch-size", type=int, help="Rows per insert (default: SNAPSHOT_IMPORT_BATCH_SIZE)")
+    import_parser.add_argument("--replace", action="store_true", help="Delete existing rows before importing")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            counts = export_snapshot(engine, args.archive, args.chunk_rows)
+        else:
+            counts = import_snapshot(engine, args.archive, args.batch_size, args.replace)
+    except (OSError, SnapshotError) as e:
+        print(f"❌ {args.command.capitalize()} failed: {e}", file=sys.stderr)
+        return 1
+    for table, count in counts.items():
+        print(f"{table:<30} {count:>10}")
+    print(f"✅ {args.command.capitalize()}ed {sum(counts.values())} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,14 @@ from datetime import datetime, timedelta
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
 
+# Background workers poll the application database; keep them off under test
+os.environ.setdefault("TASK_RUNNER_ENABLED", "false")
+os.environ.setdefault("REPORT_SCHEDULER_ENABLED", "false")
+os.environ.setdefault("EMAIL_OUTBOX_ENABLED", "false")
+os.environ.setdefault("NOTIFICATION_PRUNE_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("API_KEY_USAGE_FLUSH_ENABLED", "false")
+
 # Now we can import from the app module
 from app.core.database import Base, get_database_session
 from app.models.user_model import User
@@ -33,6 +41,8 @@ def engine():
     from app.models import user_model, client_model, project_model, financial_model
     from app.models import client_note_model, client_history_model, project_milestone_model
     from app.models import api_key_model, user_preference_model
+    # The application imports the remaining models through its routers
+    import main  # noqa: F401
     
     # Drop all tables first to ensure clean state
     Base.metadata.drop_all(bind=test_engine)
@@ -251,6 +261,22 @@ def seed_database(db_session: Session):
         "test_client_2": test_client_2
     }
 
+@pytest.fixture
+def admin_user(db_session: Session):
+    """Create the admin user referenced by ``admin_token`` without hashing a password."""
+    user = User(
+        email="admin@example.com",
+        hashed_password="not-a-real-hash",
+        full_name="Admin User",
+        role="admin",
+        is_admin=True,
+        is_active=True
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
 @pytest.fixture
 def admin_token():
     """Create a JWT token for the admin user."""
@@ -0,0 +1,99 @@
+"""Tests for admission control and load shedding."""
+
+import asyncio
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.core import admission
+from app.core.admission import AdmissionClass, AdmissionControlMiddleware
+
+
+def _app(release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/clients")
+    async def clients():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/api/v1/reports/summary")
+    async def report():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        classes={"default": [1, 1, 0.3], "reports": [1, 0, 0]},
+        route_classes={"/api/v1/reports": "reports"},
+        exempt_paths=["/health"],
+    )
+    return app
+
+
+def test_saturated_class_sheds_while_others_are_served():
+    """Test that requests over the cap queue, then get 503 with Retry-After, without affecting other classes."""
+    async def scenario():
+        release = asyncio.Event()
+        async with AsyncClient(app=_app(release), base_url="http://test") as client:
+            running = asyncio.create_task(client.get("/api/v1/clients"))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(client.get("/api/v1/clients"))
+            await asyncio.sleep(0.05)
+            rejected = await client.get("/api/v1/clients")
+            other_class = await client.get("/api/v1/reports/summary")
+            exempt = await client.get("/health")
+            timed_out = await queued
+            release.set()
+            return await running, timed_out, rejected, other_class, exempt
+
+    running, timed_out, rejected, other_class, exempt = asyncio.run(scenario())
+    assert running.status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    assert timed_out.status_code == 503
+    assert other_class.status_code == 200
+    assert exempt.status_code == 200
+
+
+def test_queued_request_runs_when_a_slot_frees():
+    """Test that a queued request is admitted as soon as the running one finishes."""
+    async def scenario():
+        release = asyncio.Event()
+        app = _app(release)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/v1/clients"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.get("/api/v1/clients"))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert second.status_code == 200
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_kept(monkeypatch):
+    """Test that a waiter resolved just before its timeout fires is admitted rather than leaking the slot."""
+    async def wait_for_resolved_then_timeout(waiter, timeout):
+        # What wait_for can do on Python 3.12+: the slot arrives, yet TimeoutError is raised
+        admission_class.release()
+        assert waiter.done()
+        raise asyncio.TimeoutError
+
+    async def scenario():
+        assert await admission_class.acquire()
+        monkeypatch.setattr(admission.asyncio, "wait_for", wait_for_resolved_then_timeout)
+        admitted = await admission_class.acquire()
+        monkeypatch.undo()
+        admission_class.release()
+        return admitted
+
+    admission_class = AdmissionClass("default", max_in_flight=1, max_queue=1, queue_timeout=1)
+    assert asyncio.run(scenario()) is True
+    assert admission_class.in_flight == 0
+    assert admission_class.waiting == 0
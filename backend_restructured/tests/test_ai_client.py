@@ -0,0 +1,209 @@
+"""Tests for the async AI completion client."""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.client_model import Client
+from app.models.client_note_model import ClientNote
+from app.services import openai_client
+from app.services.client_analysis_service import client_analysis
+from app.services.openai_client import AICompletionClient, AITimeoutError, StubTransport
+
+
+class CountingTransport(StubTransport):
+    """Stub transport that tracks how many completions run at once."""
+
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self.running = 0
+        self.peak = 0
+
+    async def complete(self, model, prompt):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            return await super().complete(model, prompt)
+        finally:
+            self.running -= 1
+
+
+def test_completions_are_cached_and_deduplicated():
+    """Test that repeated and concurrent identical prompts cost one provider call."""
+    transport = StubTransport(latency=0.01)
+    client = AICompletionClient(transport=transport, model="test-model", max_concurrency=4, timeout=1, cache_ttl=60)
+
+    async def scenario():
+        results = await asyncio.gather(*(client.complete("Summarize Acme") for _ in range(5)))
+        results.append(await client.complete("Summarize Acme"))
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(set(results)) == 1 and results[0].startswith("[test-model stub")
+    assert transport.calls == 1
+    assert client.cache_misses == 1 and client.cache_hits == 5
+
+    # A different model is a different cache entry
+    asyncio.run(client.complete("Summarize Acme", model="other-model"))
+    assert transport.calls == 2
+
+
+def test_cancelled_caller_does_not_fail_shared_request():
+    """Test that callers sharing a request still get its result when the first caller is cancelled."""
+    transport = StubTransport(latency=0.05)
+    client = AICompletionClient(transport=transport, timeout=1, cache_ttl=60)
+
+    async def scenario():
+        leader = asyncio.ensure_future(client.complete("Summarize Acme"))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(client.complete("Summarize Acme")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(set(results)) == 1 and results[0].startswith("[")
+    assert transport.calls == 1
+    assert client._cached(client.cache_key(client.model, "Summarize Acme")) == results[0]
+
+
+def test_concurrency_is_bounded():
+    """Test that no more than max_concurrency completions run at once."""
+    transport = CountingTransport(latency=0.02)
+    client = AICompletionClient(transport=transport, max_concurrency=3, timeout=1, cache_ttl=0)
+
+    async def scenario():
+        await asyncio.gather(*(client.complete(f"prompt {i}") for i in range(12)))
+
+    asyncio.run(scenario())
+    assert transport.calls == 12
+    assert transport.peak == 3
+
+
+def test_slow_completion_times_out():
+    """Test that a completion exceeding the timeout raises AITimeoutError and is not cached."""
+    transport = StubTransport(latency=0.5)
+    client = AICompletionClient(transport=transport, timeout=0.05, cache_ttl=60)
+
+    with pytest.raises(AITimeoutError):
+        asyncio.run(client.complete("slow"))
+    assert client._cached(client.cache_key(client.model, "slow")) is None
+
+
+@pytest.fixture
+def stub_ai(db_session, monkeypatch):
+    """Route completions to a stub transport and store analyses in the test database."""
+    transport = StubTransport(latency=0)
+    monkeypatch.setattr(openai_client, "ai_client", AICompletionClient(transport=transport, cache_ttl=0))
+    monkeypatch.setattr(client_analysis, "session_factory", sessionmaker(bind=db_session.get_bind()))
+    return transport
+
+
+def test_client_analysis_endpoint_uses_stub(override_dependency, db_session, admin_user, admin_headers, stub_ai):
+    """Test the client analysis endpoint end to end against the stub transport."""
+    client = Client(company_name="Acme Corp", contact_person_name="Jane Roe", email="jane@acme.example",
+                    industry="Technology", assigned_user_id=admin_user.id)
+    db_session.add(client)
+    db_session.commit()
+
+    response = override_dependency.post(
+        "/api/v1/ai/client-analysis",
+        json={"client_id": client.id, "analysis_type": "summary"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert "Acme Corp" in response.json()["result"]
+
+
+def test_batch_client_analysis_streams_and_skips_unchanged(override_dependency, db_session, admin_user, admin_headers, stub_ai):
+    """Test that the batch endpoint streams one line per client and reuses unchanged summaries."""
+    transport = stub_ai
+    clients = [
+        Client(company_name=f"Company {i}", contact_person_name="Contact", email=f"c{i}@example.com",
+               assigned_user_id=admin_user.id)
+        for i in range(3)
+    ]
+    db_session.add_all(clients)
+    db_session.commit()
+    ids = [client.id for client in clients]
+
+    def run_batch():
+        response = override_dependency.post(
+            "/api/v1/ai/client-analysis/batch",
+            json={"client_ids": ids + [999999]},
+            headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return {item["client_id"]: item for item in map(json.loads, response.text.splitlines())}
+
+    first = run_batch()
+    assert first[999999]["error"] == "Client not found"
+    assert all(first[i]["result"] and not first[i]["cached"] for i in ids)
+    assert transport.calls == 3
+
+    clients[0].general_notes = "Renewal due next month"
+    db_session.commit()
+    second = run_batch()
+    assert not second[ids[0]]["cached"]
+    assert second[ids[1]]["cached"] and second[ids[2]]["cached"]
+    assert transport.calls == 4
+
+
+def test_batch_client_analysis_reports_unexpected_errors_per_client(
+    override_dependency, db_session, admin_user, admin_headers, stub_ai, monkeypatch
+):
+    """Test that a failure other than the model's becomes an error line instead of cutting the stream."""
+    clients = [
+        Client(company_name=f"Savefail {i}", contact_person_name="Contact", email=f"savefail{i}@example.com",
+               assigned_user_id=admin_user.id)
+        for i in range(3)
+    ]
+    db_session.add_all(clients)
+    db_session.commit()
+    ids = [client.id for client in clients]
+    save = client_analysis.save
+
+    def failing_save(snapshot, *args):
+        if snapshot.client_id == ids[1]:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        return save(snapshot, *args)
+
+    monkeypatch.setattr(client_analysis, "save", failing_save)
+    response = override_dependency.post(
+        "/api/v1/ai/client-analysis/batch", json={"client_ids": ids}, headers=admin_headers
+    )
+    items = {item["client_id"]: item for item in map(json.loads, response.text.splitlines())}
+    assert sorted(items) == sorted(ids)
+    assert items[ids[1]]["error"] == "Analysis failed"
+    assert items[ids[0]]["result"] and items[ids[2]]["result"]
+
+
+def test_stored_analysis_is_served_and_refreshed_when_stale(override_dependency, db_session, admin_user, admin_headers, stub_ai):
+    """Test that GET serves the stored analysis and regenerates it in the background after a change."""
+    client = Client(company_name="Globex", contact_person_name="Hank", email="hank@globex.example",
+                    assigned_user_id=admin_user.id)
+    db_session.add(client)
+    db_session.commit()
+    url = f"/api/v1/ai/client-analysis/{client.id}"
+
+    first = override_dependency.get(url, headers=admin_headers).json()
+    assert first["stale"] is False and stub_ai.calls == 1
+    second = override_dependency.get(url, headers=admin_headers).json()
+    assert second["result"] == first["result"] and stub_ai.calls == 1
+
+    db_session.add(ClientNote(client_id=client.id, user_id=admin_user.id, content="Asked about a discount"))
+    db_session.commit()
+    stale = override_dependency.get(url, headers=admin_headers).json()
+    assert stale["stale"] is True and stale["result"] == first["result"]
+    # The refresh ran as a background task after the response
+    assert stub_ai.calls == 2
+    fresh = override_dependency.get(url, headers=admin_headers).json()
+    assert fresh["stale"] is False
+    assert "Asked about a discount" in fresh["result"]
+    assert stub_ai.calls == 2
@@ -0,0 +1,82 @@
+"""Tests for API key authentication."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.api_key_model import APIKey
+from app.services.api_key_service import APIKeyAuthenticator, api_key_authenticator, hash_api_key
+
+
+@pytest.fixture
+def authenticator(db_session, monkeypatch):
+    """Point the shared authenticator at the test database with an empty cache."""
+    monkeypatch.setattr(api_key_authenticator, "session_factory", sessionmaker(bind=db_session.get_bind()))
+    api_key_authenticator.clear_cache()
+    api_key_authenticator._last_used.clear()
+    yield api_key_authenticator
+    api_key_authenticator.clear_cache()
+    api_key_authenticator._last_used.clear()
+
+
+def test_api_key_authenticates_until_revoked(override_dependency, admin_user, admin_headers, db_session, authenticator):
+    """Test that a created key authenticates, is stored hashed, and stops working once revoked."""
+    response = override_dependency.post("/api/v1/api-keys/", headers=admin_headers)
+    assert response.status_code == 201
+    key = response.json()["api_key"]
+    stored = db_session.query(APIKey).one()
+    assert stored.key_hash == hash_api_key(key)
+    assert response.json()["prefix"] == key[:8]
+
+    response = override_dependency.get("/api/v1/users/me", headers={"X-API-Key": key})
+    assert response.status_code == 200
+    assert response.json()["email"] == "admin@example.com"
+
+    assert override_dependency.delete(f"/api/v1/api-keys/{key}", headers=admin_headers).status_code == 204
+    response = override_dependency.get("/api/v1/users/me", headers={"X-API-Key": key})
+    assert response.status_code == 401
+    assert override_dependency.get("/api/v1/users/me").status_code == 401
+
+
+def test_lookups_are_cached_and_usage_is_flushed_in_batches(admin_user, db_session, authenticator):
+    """Test that repeated use costs one query and last_used_at is written only on flush."""
+    keys = []
+    for key in ("key-one", "key-two"):
+        db_session.add(APIKey(key_hash=hash_api_key(key), prefix=key[:8], user_id=admin_user.id))
+        keys.append(key)
+    db_session.commit()
+
+    queries = []
+    original_query = db_session.query
+
+    def counting_query(*args, **kwargs):
+        queries.append(args)
+        return original_query(*args, **kwargs)
+
+    db_session.query = counting_query
+    for _ in range(50):
+        for key in keys:
+            assert authenticator.authenticate(db_session, key) == admin_user.id
+    assert authenticator.authenticate(db_session, "unknown") is None
+    assert authenticator.authenticate(db_session, "unknown") is None
+    assert len(queries) == 3
+    del db_session.query
+
+    assert all(row.last_used_at is None for row in db_session.query(APIKey))
+    assert authenticator.flush() == 2
+    assert authenticator.flush() == 0
+    db_session.expire_all()
+    assert all(row.last_used_at is not None for row in db_session.query(APIKey))
+
+
+def test_full_cache_evicts_least_recently_used_key(admin_user, db_session):
+    """Test that a full cache drops only its least recently used entry instead of every cached key."""
+    for key in ("key-one", "key-two"):
+        db_session.add(APIKey(key_hash=hash_api_key(key), prefix=key[:8], user_id=admin_user.id))
+    db_session.commit()
+    authenticator = APIKeyAuthenticator(session_factory=sessionmaker(bind=db_session.get_bind()), cache_size=2)
+
+    authenticator.authenticate(db_session, "key-one")
+    authenticator.authenticate(db_session, "key-two")
+    authenticator.authenticate(db_session, "key-one")
+    assert authenticator.authenticate(db_session, "unknown") is None
+    assert list(authenticator._cache) == [hash_api_key("key-one"), hash_api_key("unknown")]
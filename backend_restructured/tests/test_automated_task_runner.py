@@ -0,0 +1,102 @@
+"""Tests for the automated task runner."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.automated_task_model import AutomatedTask
+from app.models.notification_model import Notification
+from app.services.task_runner import AutomatedTaskRunner, TASK_HANDLERS
+
+
+def _make_runner(engine, **kwargs):
+    options = {"concurrency": 2, "poll_interval": 0.01, "batch_size": 10, "lease_seconds": 60, "max_attempts": 2}
+    options.update(kwargs)
+    return AutomatedTaskRunner(session_factory=sessionmaker(bind=engine), **options)
+
+
+def _add_task(db_session, user, task_type="reminder", due_in=timedelta(minutes=-1), **kwargs):
+    task = AutomatedTask(
+        task_type=task_type,
+        scheduled_time=datetime.utcnow() + due_in,
+        created_by_id=user.id,
+        **kwargs
+    )
+    db_session.add(task)
+    db_session.commit()
+    return task.id
+
+
+async def _run(runner):
+    claimed = await runner.run_once()
+    await runner.drain()
+    return claimed
+
+
+def test_runner_executes_due_tasks_only(engine, db_session, admin_user):
+    """Test that due tasks are run and future tasks are left alone."""
+    due_id = _add_task(db_session, admin_user, details="Call Acme about renewal", target_type="client", target_id=7)
+    future_id = _add_task(db_session, admin_user, due_in=timedelta(hours=1))
+    runner = _make_runner(engine)
+
+    assert asyncio.run(_run(runner)) == 1
+
+    db_session.expire_all()
+    due_task = db_session.get(AutomatedTask, due_id)
+    assert due_task.is_completed is True
+    assert due_task.completed_at is not None
+    assert due_task.claimed_by is None
+    assert db_session.get(AutomatedTask, future_id).is_completed is False
+
+    notification = db_session.query(Notification).filter(Notification.user_id == admin_user.id).one()
+    assert notification.title == "Reminder for client #7"
+    assert notification.message == "Call Acme about renewal"
+
+    metrics = runner.metrics.snapshot()
+    assert metrics["completed"] == 1
+    assert metrics["running"] == 0
+    assert metrics["average_lag_seconds"] >= 0
+
+
+def test_runner_claims_are_exclusive(engine, db_session, admin_user):
+    """Test that two workers polling together never claim the same task."""
+    task_ids = {_add_task(db_session, admin_user) for _ in range(6)}
+    first = _make_runner(engine, worker_id="worker-a")
+    second = _make_runner(engine, worker_id="worker-b")
+
+    claimed_first = first._claim_due_tasks(4)
+    claimed_second = second._claim_due_tasks(4)
+
+    assert not set(claimed_first) & set(claimed_second)
+    assert set(claimed_first) | set(claimed_second) == task_ids
+
+
+def test_runner_retries_failed_tasks(engine, db_session, admin_user, monkeypatch):
+    """Test that failures are recorded and retried after the lease expires."""
+    def failing_handler(db, task):
+        raise RuntimeError("provider unavailable")
+
+    monkeypatch.setitem(TASK_HANDLERS, "flaky", failing_handler)
+    task_id = _add_task(db_session, admin_user, task_type="flaky")
+    runner = _make_runner(engine, lease_seconds=1)
+
+    assert asyncio.run(_run(runner)) == 1
+    db_session.expire_all()
+    task = db_session.get(AutomatedTask, task_id)
+    assert task.is_completed is False
+    assert task.attempts == 1
+    assert task.last_error == "provider unavailable"
+
+    # The failed claim holds the task until the lease expires
+    assert asyncio.run(_run(runner)) == 0
+    task.claimed_at = datetime.utcnow() - timedelta(seconds=5)
+    db_session.commit()
+    assert asyncio.run(_run(runner)) == 1
+
+    # max_attempts reached: the task is no longer picked up
+    task.claimed_at = datetime.utcnow() - timedelta(seconds=5)
+    db_session.commit()
+    assert asyncio.run(_run(runner)) == 0
+    assert runner.metrics.failed == 2
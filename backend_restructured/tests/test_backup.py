@@ -0,0 +1,180 @@
+"""Tests for database backups."""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.backup_service import (
+    BackupJob,
+    BackupManager,
+    acquire_backup_lock,
+    apply_retention,
+    create_database_backup,
+    create_incremental_backup,
+    list_backups,
+    open_decompressed,
+    restore_database,
+    verify_checksum,
+)
+
+
+def _make_database(path, rows=5000):
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(rows)])
+    connection.commit()
+    connection.close()
+
+
+def _restored_count(backup_path, tmp_path):
+    restored = tmp_path / "restored.db"
+    with open_decompressed(backup_path) as source:
+        restored.write_bytes(source.read())
+    connection = sqlite3.connect(restored)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_backup_is_compressed_checksummed_and_restorable(tmp_path, monkeypatch):
+    """Test that a backup is a gzip of a consistent copy with a matching checksum file."""
+    monkeypatch.setattr(settings, "BACKUP_PAGES_PER_STEP", 4)
+    db_path = tmp_path / "crm.db"
+    _make_database(db_path)
+
+    backup_path = create_database_backup(db_path=db_path, backup_dir=tmp_path / "backups", compression="gzip")
+
+    assert backup_path.name.endswith(".db.gz")
+    assert backup_path.stat().st_size < db_path.stat().st_size
+    assert verify_checksum(backup_path)
+    assert _restored_count(backup_path, tmp_path) == 5000
+    assert not list((tmp_path / "backups").glob(".*.tmp"))
+
+
+def test_retention_keeps_newest_backups(tmp_path):
+    """Test that retention removes backups beyond the count or age limits, with their checksums."""
+    now = time.time()
+    for age_days in range(6):
+        path = tmp_path / f"crm_backup_{age_days}.db.gz"
+        path.write_bytes(b"backup")
+        (tmp_path / f"{path.name}.sha256").write_text("checksum")
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+
+    deleted = apply_retention(tmp_path, "crm", keep=4, max_age_days=2, now=datetime.now() + timedelta(seconds=1))
+
+    assert sorted(path.name for path in deleted) == [f"crm_backup_{age}.db.gz" for age in (2, 3, 4, 5)]
+    assert sorted(path.name for path in tmp_path.glob("*.gz")) == ["crm_backup_0.db.gz", "crm_backup_1.db.gz"]
+    assert len(list(tmp_path.glob("*.sha256"))) == 2
+
+
+def test_backup_endpoint_returns_job_handle(override_dependency, admin_user, admin_headers, tmp_path, monkeypatch):
+    """Test that the endpoint returns immediately with a job that can be polled to completion."""
+    db_path = tmp_path / "crm.db"
+    _make_database(db_path)
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{db_path}")
+    monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+
+    response = override_dependency.post("/api/v1/backup/backup", headers=admin_headers)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.monotonic() + 10
+    while True:
+        job = override_dependency.get(f"/api/v1/backup/backup/{job_id}", headers=admin_headers).json()
+        if job["status"] not in ("pending", "running") or time.monotonic() > deadline:
+            break
+        time.sleep(0.02)
+    assert job["status"] == "completed", job
+    assert job["pages_done"] == job["pages_total"] > 0
+    assert verify_checksum(tmp_path / "backups" / os.path.basename(job["path"]))
+
+    assert override_dependency.get("/api/v1/backup/backup/unknown", headers=admin_headers).status_code == 404
+
+    # Another worker process has its own manager but reads the same job
+    assert BackupManager().get(job_id).to_dict()["path"] == job["path"]
+
+
+def _count(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def _insert(path, rows):
+    connection = sqlite3.connect(path)
+    connection.executemany("INSERT INTO items (name) VALUES (?)", [(f"extra {i}",) for i in range(rows)])
+    connection.commit()
+    connection.close()
+
+
+def test_incremental_backups_restore_to_a_point_in_time(tmp_path):
+    """Test that incrementals store only changed pages and replay up to the chosen time."""
+    db_path, backup_dir = tmp_path / "crm.db", tmp_path / "backups"
+    _make_database(db_path, rows=20000)
+    create_database_backup(db_path=db_path, backup_dir=backup_dir)
+
+    _insert(db_path, 100)
+    job = BackupJob()
+    create_incremental_backup(job, db_path=db_path, backup_dir=backup_dir)
+    assert 0 < job.pages_changed < job.pages_total / 4
+    point_in_time = datetime.now()
+
+    _insert(db_path, 50)
+    create_incremental_backup(db_path=db_path, backup_dir=backup_dir)
+    assert [entry.kind for entry in list_backups(backup_dir, "crm")] == ["backup", "incr", "incr"]
+
+    applied = restore_database(tmp_path / "at_point.db", backup_dir, "crm", until=point_in_time)
+    assert len(applied) == 2
+    assert _count(tmp_path / "at_point.db") == 20100
+
+    restore_database(tmp_path / "latest.db", backup_dir, "crm")
+    assert _count(tmp_path / "latest.db") == 20150
+
+
+def test_incremental_without_base_is_full_and_orphans_are_pruned(tmp_path):
+    """Test the fallback to a full backup and that retention removes incrementals of deleted bases."""
+    db_path, backup_dir = tmp_path / "crm.db", tmp_path / "backups"
+    _make_database(db_path, rows=100)
+    first = create_incremental_backup(db_path=db_path, backup_dir=backup_dir)
+    assert "_backup_" in first.name
+
+    _insert(db_path, 10)
+    orphan = create_incremental_backup(db_path=db_path, backup_dir=backup_dir)
+    time.sleep(0.01)
+    create_database_backup(db_path=db_path, backup_dir=backup_dir)
+
+    deleted = apply_retention(backup_dir, "crm", keep=1, max_age_days=30)
+    assert set(deleted) == {first, orphan}
+    assert not os.path.exists(f"{orphan}.pagemap")
+    assert [entry.kind for entry in list_backups(backup_dir, "crm")] == ["backup"]
+
+
+def test_backups_are_serialized_across_managers(tmp_path, monkeypatch):
+    """Test that a second worker's backup request returns the running job instead of forking the chain."""
+    db_path = tmp_path / "crm.db"
+    _make_database(db_path, rows=100)
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{db_path}")
+    monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+    first, second = BackupManager(), BackupManager()
+
+    # Hold the lock as another process would while its backup runs
+    lock = acquire_backup_lock(tmp_path / "backups")
+    try:
+        running = BackupJob(mode="incremental", store=first._store())
+        running.status = "running"
+        running.save()
+        assert second.start(mode="incremental").id == running.id
+    finally:
+        lock.close()
+
+    # Once the lock is free, the dead process's job is marked failed and a new one runs
+    job = second.start(mode="incremental")
+    assert job.id != running.id
+    assert first.get(running.id).status == "failed"
+    second._executor.shutdown(wait=True)
+    assert first.get(job.id).status == "completed"
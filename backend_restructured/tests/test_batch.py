@@ -0,0 +1,146 @@
+"""Tests for the batch request endpoint."""
+
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints.batch_endpoints import router as batch_router
+from app.core.admission import AdmissionControlMiddleware
+from app.core.database import create_snapshot_session, get_database_session, shared_session
+from app.core.limiter import RateLimiter, RateLimitMiddleware
+
+
+def test_batch_runs_sub_requests_as_the_caller(override_dependency, admin_headers, admin_user):
+    """Test that sub-requests are authenticated as the batch caller and come back in request order."""
+    response = override_dependency.post(
+        "/api/v1/batch/",
+        json={"requests": [
+            {"id": "me", "path": "/api/v1/users/me"},
+            {"id": "stats", "path": "/api/v1/dashboard/stats"},
+            {"id": "missing", "path": "/api/v1/clients/999999"},
+            {"id": "search", "path": "/api/v1/clients/?limit=5"},
+            {"id": "unknown", "path": "/api/v1/no-such-resource"},
+        ]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [item["id"] for item in responses] == ["me", "stats", "missing", "search", "unknown"]
+    assert responses[0]["status"] == 200
+    assert responses[0]["body"]["email"] == admin_user.email
+    assert responses[1]["status"] == 200
+    assert "totalClients" in responses[1]["body"]
+    assert responses[2]["status"] == 404
+    assert responses[3]["status"] == 200
+    assert responses[4]["status"] == 404
+
+
+def test_batch_streams_results_as_ndjson(override_dependency, admin_headers, admin_user):
+    """Test that stream=true returns one JSON line per sub-request."""
+    response = override_dependency.post(
+        "/api/v1/batch/?stream=true",
+        json={"requests": [{"path": "/api/v1/dashboard/stats"}, {"path": "/api/v1/users/me"}]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["status"] == 200 for line in lines)
+
+
+def test_batch_rejects_writes_nesting_and_anonymous_callers(override_dependency, admin_headers, admin_user):
+    """Test that only authenticated, non-nested GET requests are accepted."""
+    post = override_dependency.post(
+        "/api/v1/batch/", json={"requests": [{"method": "POST", "path": "/api/v1/clients/"}]}, headers=admin_headers
+    )
+    nested = override_dependency.post(
+        "/api/v1/batch/", json={"requests": [{"path": "/api/v1/batch/"}]}, headers=admin_headers
+    )
+    anonymous = override_dependency.post("/api/v1/batch/", json={"requests": [{"path": "/api/v1/users/me"}]})
+    assert post.status_code == 400
+    assert nested.status_code == 400
+    assert anonymous.status_code == 401
+
+
+def test_session_dependency_yields_the_shared_snapshot(engine):
+    """Test that the session dependency hands out the batch session while one is set, and refuses writes to it."""
+    session = create_snapshot_session(engine)
+    token = shared_session.set(session)
+    try:
+        dependency = get_database_session()
+        assert next(dependency) is session
+        dependency.close()
+    finally:
+        shared_session.reset(token)
+    dependency = get_database_session()
+    assert next(dependency) is not session
+    dependency.close()
+    session.close()
+
+
+def _limited_app(db_session):
+    """An app with a batch endpoint and a report route behind per-class rate and admission limits."""
+    app = FastAPI()
+    app.include_router(batch_router, prefix="/api/v1/batch")
+
+    @app.get("/api/v1/reports/render")
+    async def render():
+        await asyncio.sleep(0.1)
+        return {"ok": True}
+
+    @app.get("/api/v1/clients/")
+    async def clients():
+        return {"ok": True}
+
+    app.dependency_overrides[get_database_session] = lambda: db_session
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        classes={"default": [64, 128, 2.0], "reports": [1, 0, 0]},
+        route_classes={"/api/v1/reports": "reports"},
+    )
+    limiter = RateLimiter(classes={"default": [0, 100], "heavy": [0, 3]}, route_classes={"/api/v1/reports": "heavy"})
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+def test_batch_sub_requests_count_against_their_route_limits(db_session, admin_headers, admin_user):
+    """Test that a batch cannot run more report renders than the reports rate limit and in-flight cap allow."""
+    with TestClient(_limited_app(db_session)) as client:
+        response = client.post(
+            "/api/v1/batch/",
+            json={"requests": [{"path": "/api/v1/reports/render"}] * 4 + [{"path": "/api/v1/clients/"}]},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        statuses = [item["status"] for item in response.json()["responses"]]
+        # The heavy bucket holds 3 renders and the reports class runs 1 at a time without a queue
+        assert sorted(statuses[:4]) == [200, 429, 503, 503]
+        assert statuses[4] == 200
+        limited = next(item for item in response.json()["responses"] if item["status"] == 429)
+        assert int(limited["headers"]["retry-after"]) >= 1
+
+        # The renders were charged to the caller, whose heavy budget is now spent
+        direct = client.get("/api/v1/reports/render", headers=admin_headers)
+        assert direct.status_code == 429
+
+
+def test_batch_does_not_hold_an_admission_slot_its_sub_requests_need(db_session, admin_headers, admin_user):
+    """Test that the batch itself is not admitted, so a one-slot default class still serves its sub-requests."""
+    app = FastAPI()
+    app.include_router(batch_router, prefix="/api/v1/batch")
+
+    @app.get("/api/v1/clients/")
+    async def clients():
+        return {"ok": True}
+
+    app.dependency_overrides[get_database_session] = lambda: db_session
+    app.add_middleware(AdmissionControlMiddleware, classes={"default": [1, 0, 0]}, route_classes={})
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/batch/", json={"requests": [{"path": "/api/v1/clients/"}]}, headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["responses"][0]["status"] == 200
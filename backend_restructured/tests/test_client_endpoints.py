@@ -172,3 +172,87 @@ def test_bulk_operations(test_client, seed_database, admin_headers):
     response = test_client.request("DELETE", "/api/v1/clients/bulk", json=bulk_delete_data, headers=admin_headers)
     
     assert response.status_code == 204
+
+def _wait_for_import(client, job_id, headers, timeout=10.0):
+    """Poll a background import job until it has finished."""
+    import time
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f"/api/v1/clients/import/jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        if response.json()["finished_at"] is not None or time.monotonic() > deadline:
+            return response.json()
+        time.sleep(0.02)
+
+def test_import_clients_ndjson(override_dependency, db_session, admin_user, admin_headers, tmp_path, monkeypatch):
+    """Test streaming NDJSON client import with progress counters and an error file."""
+    import json
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BULK_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_ERROR_DIR", str(tmp_path))
+    client = override_dependency
+
+    records = [
+        {"company_name": f"Imported {i}", "contact_person_name": "Contact", "email": f"imported{i}@example.com"}
+        for i in range(4)
+    ]
+    records.append({"company_name": "Duplicate", "contact_person_name": "Contact", "email": "imported0@example.com"})
+    records.append({"company_name": "X", "contact_person_name": "Contact", "email": "bad-email"})
+    records.append({"company_name": "Orphan", "contact_person_name": "Contact", "email": "orphan@example.com", "assigned_user_id": 9999})
+    body = "\n".join(json.dumps(record) for record in records)
+
+    response = client.post(
+        "/api/v1/clients/import",
+        content=body.encode(),
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 202
+    assert response.json()["status"] in ("queued", "running")
+    job = _wait_for_import(client, response.json()["job_id"], admin_headers)
+    assert job["status"] == "completed"
+    assert job["processed"] == 7
+    assert job["inserted"] == 4
+    assert job["failed"] == 3
+    assert job["has_error_file"] is True
+
+    # The original progress path still resolves
+    response = client.get(f"/api/v1/clients/import/{job['job_id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 4
+
+    response = client.get("/api/v1/clients/import/jobs", headers=admin_headers)
+    assert job["job_id"] in [item["job_id"] for item in response.json()]
+
+    # Job state is in the database, so another worker's registry sees it too
+    from app.services.import_service import ImportJobRegistry
+    db_session.expire_all()
+    assert ImportJobRegistry().get(db_session, job["job_id"]).inserted == 4
+
+    response = client.get(f"/api/v1/clients/import/jobs/{job['job_id']}/errors", headers=admin_headers)
+    assert response.status_code == 200
+    errors = [json.loads(line) for line in response.text.splitlines()]
+    errors_by_line = {error["line"]: error["error"] for error in errors}
+    assert sorted(errors_by_line) == [5, 6, 7]
+    assert "already exists" in errors_by_line[5]
+    assert "email" in errors_by_line[6]
+    assert "not found" in errors_by_line[7]
+
+def test_import_clients_csv(override_dependency, admin_user, admin_headers, tmp_path, monkeypatch):
+    """Test CSV client import maps the notes column to general notes."""
+    from app.core.config import settings
+    from app.models.client_model import Client
+    monkeypatch.setattr(settings, "IMPORT_ERROR_DIR", str(tmp_path))
+    client = override_dependency
+    body = "company_name,contact_person_name,email,notes\nCsv Corp,Jane Doe,jane@csvcorp.com,From old CRM\n"
+    response = client.post(
+        "/api/v1/clients/import?format=csv",
+        content=body.encode(),
+        headers=admin_headers
+    )
+    assert response.status_code == 202
+    job = _wait_for_import(client, response.json()["job_id"], admin_headers)
+    assert job["inserted"] == 1
+    assert job["has_error_file"] is False
+
+    response = client.get(f"/api/v1/clients/import/jobs/{job['job_id']}/errors", headers=admin_headers)
+    assert response.status_code == 404
@@ -0,0 +1,146 @@
+"""Tests for the durable email outbox."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.email_outbox_model import EmailOutbox, EmailOutboxContent
+from app.services.email_service import EmailOutboxWorker, TokenBucket
+from app.services.email_transport import InMemoryTransport
+from app.services.worker_lease import LeaderLease
+
+
+class FlakyTransport(InMemoryTransport):
+    """In-memory transport that fails a given number of times first."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, recipients, subject, html_content, plain_text_content=None, attachments=()):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider unavailable")
+        super().send(recipients, subject, html_content, plain_text_content, attachments)
+
+
+def _make_worker(engine, transport, **kwargs):
+    options = {"batch_size": 50, "rate_limit": 0, "max_attempts": 2, "retry_base_seconds": 60}
+    options.update(kwargs)
+    return EmailOutboxWorker(session_factory=sessionmaker(bind=engine), transport=transport, **options)
+
+
+def test_outbox_sends_identical_messages_in_batches(engine, db_session):
+    """Test that queued messages are grouped by content and sent in transport-sized batches."""
+    transport = InMemoryTransport(max_batch_size=3)
+    worker = _make_worker(engine, transport)
+    recipients = [f"user{i}@example.com" for i in range(5)]
+    worker.enqueue(db_session, recipients, "Weekly digest", "<p>Digest</p>", attachments=[("d.txt", b"data", "text/plain")])
+    worker.enqueue(db_session, "solo@example.com", "Welcome", "<p>Hi</p>")
+    db_session.commit()
+    # The body and attachment are stored once per message, not once per recipient
+    digest = db_session.query(EmailOutbox).filter(EmailOutbox.to_email.in_(recipients)).all()
+    assert len({message.content_id for message in digest}) == 1
+    assert digest[0].content.attachments[0]["filename"] == "d.txt"
+    assert db_session.query(EmailOutboxContent).filter(EmailOutboxContent.subject == "Weekly digest").count() == 1
+
+    assert asyncio.run(worker.run_once()) == 6
+
+    digest_calls = [call for call in transport.sent if call["subject"] == "Weekly digest"]
+    assert [len(call["recipients"]) for call in digest_calls] == [3, 2]
+    assert digest_calls[0]["attachments"] == [("d.txt", b"data", "text/plain")]
+    assert db_session.query(EmailOutbox).filter(EmailOutbox.status == "sent").count() == 6
+    assert asyncio.run(worker.run_once()) == 0
+
+
+def test_outbox_retries_with_backoff_then_fails(engine, db_session):
+    """Test that failed sends are rescheduled with backoff and give up after max attempts."""
+    worker = _make_worker(engine, FlakyTransport(failures=5))
+    message = worker.enqueue(db_session, "a@example.com", "Hello", "<p>Hello</p>")[0]
+    db_session.commit()
+    message_id = message.id
+
+    before = datetime.utcnow()
+    asyncio.run(worker.run_once())
+    db_session.expire_all()
+    message = db_session.get(EmailOutbox, message_id)
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.last_error == "provider unavailable"
+    assert message.next_attempt_at >= before + timedelta(seconds=60)
+
+    # Not due yet, so the next poll leaves it alone
+    assert asyncio.run(worker.run_once()) == 0
+
+    message.next_attempt_at = datetime.utcnow()
+    db_session.commit()
+    asyncio.run(worker.run_once())
+    db_session.expire_all()
+    assert db_session.get(EmailOutbox, message_id).status == "failed"
+    assert worker.retried == 1 and worker.failed == 1
+
+
+def test_token_bucket_limits_rate():
+    """Test that sends beyond the bucket wait for tokens to refill."""
+    bucket = TokenBucket(rate=100, capacity=5)
+
+    async def consume():
+        started = asyncio.get_running_loop().time()
+        for _ in range(3):
+            await bucket.acquire(5)
+        return asyncio.get_running_loop().time() - started
+
+    # 15 messages at 100/s with 5 available up front take at least 0.1s
+    assert asyncio.run(consume()) >= 0.09
+
+
+def test_send_email_endpoint_queues_message(override_dependency, db_session, admin_user, admin_headers):
+    """Test that the send-email endpoint stores the message and returns immediately."""
+    response = override_dependency.post(
+        "/api/v1/notifications/send-email",
+        json={"to_email": "client@example.com", "subject": "Invoice", "html_content": "<p>Attached</p>"},
+        headers=admin_headers
+    )
+    assert response.status_code == 202
+    message = db_session.get(EmailOutbox, response.json()["outbox_id"])
+    assert message.to_email == "client@example.com"
+    assert message.status == "pending"
+
+
+def test_leader_lease_lets_one_worker_send(db_session):
+    """Test that only one worker holds the lease until it is released or expires."""
+    now = datetime.utcnow()
+    first, second = LeaderLease("test_sender", "worker-a", ttl=30), LeaderLease("test_sender", "worker-b", ttl=30)
+
+    assert first.acquire(db_session, now)
+    assert not second.acquire(db_session, now)
+    assert first.acquire(db_session, now + timedelta(seconds=10))  # Renewal
+    # A holder that stops renewing loses the lease once it expires
+    assert second.acquire(db_session, now + timedelta(seconds=41))
+    assert not first.acquire(db_session, now + timedelta(seconds=41))
+
+    second.release(db_session)
+    assert first.acquire(db_session)
+
+
+def test_prune_deletes_old_messages_and_their_content(engine, db_session):
+    """Test that old sent messages and unreferenced content are deleted while pending mail is kept."""
+    worker = _make_worker(engine, InMemoryTransport(), retention_days=30)
+    old = datetime.utcnow() - timedelta(days=31)
+    sent = worker.enqueue(db_session, ["p1@example.com", "p2@example.com"], "Old newsletter", "<p>Old</p>")
+    pending = worker.enqueue(db_session, "p3@example.com", "Old but unsent", "<p>Later</p>")
+    for message in sent + pending:
+        message.created_at = old
+        message.content.created_at = old
+    for message in sent:
+        message.status = "sent"
+    db_session.commit()
+    sent_content, pending_content = sent[0].content_id, pending[0].content_id
+
+    assert worker.prune(batch_size=1) >= 2
+
+    db_session.expire_all()
+    assert db_session.get(EmailOutboxContent, sent_content) is None
+    assert db_session.get(EmailOutboxContent, pending_content) is not None
+    assert db_session.get(EmailOutbox, pending[0].id).status == "pending"
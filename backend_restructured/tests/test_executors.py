@@ -0,0 +1,100 @@
+"""Tests for the named blocking-work executors."""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from app.core import executors as executors_module
+from app.core.executors import ExecutorRegistry, NamedExecutor, run_blocking
+
+
+def test_busy_pool_does_not_block_other_pools(monkeypatch):
+    """Test that work queued behind a saturated pool leaves other pools free, and is counted as queued."""
+    registry = ExecutorRegistry({"crypto": 1, "db": 2})
+    monkeypatch.setattr(executors_module, "executors", registry)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(run_blocking("crypto", release.wait))
+        queued = asyncio.ensure_future(run_blocking("crypto", lambda: "hashed"))
+        await asyncio.sleep(0.05)
+        crypto = registry.get("crypto").stats()
+        other = await asyncio.wait_for(run_blocking("db", lambda: "rows"), 1)
+        release.set()
+        return crypto, other, await blocked, await queued
+
+    crypto, other, _, queued = asyncio.run(scenario())
+    registry.shutdown()
+    assert other == "rows"
+    assert queued == "hashed"
+    assert crypto["running"] == 1
+    assert crypto["queued"] == 1
+    stats = registry.stats()
+    assert stats["crypto"]["completed"] == 2
+    assert stats["crypto"]["queued"] == 0
+    assert stats["crypto"]["max_wait_ms"] >= 40
+    assert stats["db"]["completed"] == 1
+
+
+def test_run_blocking_propagates_context_and_errors(monkeypatch):
+    """Test that context variables reach the worker thread and exceptions reach the caller."""
+    registry = ExecutorRegistry({"db": 1})
+    monkeypatch.setattr(executors_module, "executors", registry)
+    principal = contextvars.ContextVar("principal")
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        principal.set("user-1")
+        seen = await run_blocking("db", principal.get)
+        with pytest.raises(ValueError):
+            await run_blocking("db", fail)
+        return seen
+
+    assert asyncio.run(scenario()) == "user-1"
+    stats = registry.stats()["db"]
+    registry.shutdown()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    with pytest.raises(KeyError):
+        registry.get("gpu")
+
+
+def test_threads_are_created_on_first_use():
+    """Test that a pool starts no threads until work is submitted."""
+    executor = NamedExecutor("render", 2)
+    assert executor._pool is None
+    assert executor.submit(sum, [1, 2]).result() == 3
+    executor.shutdown()
+    assert executor._pool is None
+
+
+def test_cancelled_queued_work_is_not_counted_as_queued(monkeypatch):
+    """Test that callers cancelled while their work waits for a thread do not leave it counted as queued."""
+    registry = ExecutorRegistry({"db": 1})
+    monkeypatch.setattr(executors_module, "executors", registry)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(run_blocking("db", release.wait))
+        waiting = [asyncio.ensure_future(run_blocking("db", lambda: "rows")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        queued_before = registry.get("db").queued
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        queued_after = registry.get("db").queued
+        release.set()
+        await blocked
+        return queued_before, queued_after
+
+    queued_before, queued_after = asyncio.run(scenario())
+    stats = registry.stats()["db"]
+    registry.shutdown()
+    assert queued_before == 3
+    assert queued_after == 0
+    assert stats["queued"] == 0
+    assert stats["submitted"] == stats["completed"] == 1
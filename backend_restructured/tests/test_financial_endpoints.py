@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+import json
 
 from main import app
 
@@ -197,3 +198,119 @@ def test_financial_endpoint_errors(db_session, seed_database, admin_headers):
     }
     response = client.post("/api/v1/payments/", json=payment_data, headers=admin_headers)
     assert response.status_code == 422
+
+# Expense Tests
+def _expense_payload(user_id, **overrides):
+    payload = {
+        "title": "Cloud hosting",
+        "amount": 120.5,
+        "category": "software",
+        "created_by_id": user_id,
+        "notes": "Monthly bill"
+    }
+    payload.update(overrides)
+    return payload
+
+def test_expense_crud(override_dependency, admin_user, admin_headers):
+    """Test creating, reading, updating and deleting an expense."""
+    client = override_dependency
+    response = client.post("/api/v1/expenses/", json=_expense_payload(admin_user.id), headers=admin_headers)
+    assert response.status_code == 201
+    expense_id = response.json()["id"]
+    assert response.json()["category"] == "software"
+
+    response = client.get(f"/api/v1/expenses/{expense_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Cloud hosting"
+
+    response = client.put(f"/api/v1/expenses/{expense_id}", json={"amount": 99.0, "category": "services"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["amount"] == 99.0
+    assert response.json()["category"] == "services"
+
+    response = client.get("/api/v1/expenses/", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+
+    response = client.delete(f"/api/v1/expenses/{expense_id}", headers=admin_headers)
+    assert response.status_code == 204
+    response = client.get(f"/api/v1/expenses/{expense_id}", headers=admin_headers)
+    assert response.status_code == 404
+
+def test_expense_bulk_operations(override_dependency, admin_user, admin_headers):
+    """Test bulk create, update and delete of expenses."""
+    client = override_dependency
+    payload = {"expenses": [_expense_payload(admin_user.id, title=f"Expense {i}") for i in range(3)]}
+    response = client.post("/api/v1/expenses/bulk", json=payload, headers=admin_headers)
+    assert response.status_code == 201
+    ids = [expense["id"] for expense in response.json()]
+    assert len(ids) == 3
+
+    updates = {"expenses": [{"id": expense_id, "amount": 10.0} for expense_id in ids]}
+    response = client.put("/api/v1/expenses/bulk", json=updates, headers=admin_headers)
+    assert response.status_code == 200
+    assert [expense["amount"] for expense in response.json()] == [10.0, 10.0, 10.0]
+
+    response = client.request("DELETE", "/api/v1/expenses/bulk", json={"expense_ids": ids + [9999]}, headers=admin_headers)
+    assert response.status_code == 404
+    response = client.request("DELETE", "/api/v1/expenses/bulk", json={"expense_ids": ids}, headers=admin_headers)
+    assert response.status_code == 204
+
+    response = client.get("/api/v1/expenses/stats", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["total_expenses"] == 0
+
+def test_expense_import_ndjson(override_dependency, admin_user, admin_headers, monkeypatch):
+    """Test streaming NDJSON import with chunked inserts and row-level errors."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BULK_IMPORT_CHUNK_SIZE", 2)
+    client = override_dependency
+    lines = [json.dumps(_expense_payload(admin_user.id, title=f"Row {i}")) for i in range(5)]
+    lines.insert(2, json.dumps(_expense_payload(admin_user.id, amount=-1)))
+    lines.insert(4, "{not json")
+    body = "\n".join(lines) + "\n"
+    response = client.post(
+        "/api/v1/expenses/import",
+        content=body.encode(),
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["processed"] == 7
+    assert result["inserted"] == 5
+    assert result["failed"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 5]
+
+def test_expense_import_csv(override_dependency, admin_user, admin_headers):
+    """Test streaming CSV import, including quoted multi-line fields."""
+    client = override_dependency
+    body = (
+        "title,amount,category,notes\n"
+        "Laptop,1500,hardware,\n"
+        "\"Conference, travel\",300.25,travel,\"Flights\nand hotel\"\n"
+        "Ads,abc,marketing,\n"
+    )
+    response = client.post(
+        "/api/v1/expenses/import",
+        content=body.encode(),
+        headers={**admin_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["line"] == 5
+
+    response = client.get("/api/v1/expenses/?category=travel", headers=admin_headers)
+    assert response.json()["expenses"][0]["notes"] == "Flights\nand hotel"
+    assert response.json()["expenses"][0]["created_by_id"] == admin_user.id
+
+def test_expense_import_rejects_unknown_format(override_dependency, admin_user, admin_headers):
+    """Test that unsupported upload formats are rejected."""
+    client = override_dependency
+    response = client.post(
+        "/api/v1/expenses/import",
+        content=b"<xml/>",
+        headers={**admin_headers, "Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
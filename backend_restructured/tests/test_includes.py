@@ -0,0 +1,122 @@
+"""Tests for embedding related records with the ``include`` parameter."""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.client_model import Client
+from app.models.financial_model import Expense, Invoice, Payment
+from app.models.project_milestone_model import ProjectMilestone
+from app.models.project_model import Project
+
+
+@contextmanager
+def count_selects(engine):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def _add_projects(db_session, user, count=3):
+    client = Client(
+        company_name="Include Test Co",
+        contact_person_name="Ada Lovelace",
+        email="ada@include.example",
+        assigned_user_id=user.id,
+    )
+    db_session.add(client)
+    db_session.flush()
+    now = datetime.now()
+    projects = []
+    for number in range(count):
+        project = Project(
+            title=f"Project {number}",
+            status="in_progress",
+            priority="medium",
+            budget=1000.0,
+            client_id=client.id,
+            developer_id=user.id,
+            start_date=now,
+            end_date=now + timedelta(days=30),
+        )
+        db_session.add(project)
+        db_session.flush()
+        db_session.add_all([
+            ProjectMilestone(project_id=project.id, title="Design", due_date=now + timedelta(days=7)),
+            ProjectMilestone(project_id=project.id, title="Launch", due_date=now + timedelta(days=28)),
+            Invoice(invoice_number=f"INC-{number}", client_id=client.id, project_id=project.id, amount=500.0,
+                    status="sent", issue_date=now, due_date=now + timedelta(days=30), items="[]"),
+            Expense(title="Hosting", amount=50.0, category="software", linked_project_id=project.id,
+                    created_by_id=user.id),
+            Payment(amount=250.0, status="completed", method="credit_card", project_id=project.id,
+                    client_id=client.id, transaction_id=f"txn-include-{number}"),
+        ])
+        projects.append(project)
+    db_session.commit()
+    return client, projects
+
+
+def test_project_detail_embeds_includes_in_fixed_queries(override_dependency, admin_headers, admin_user, db_session, engine):
+    """Test that a fully included project loads in a constant number of queries."""
+    _, projects = _add_projects(db_session, admin_user, count=1)
+    project_id = projects[0].id
+    with count_selects(engine) as statements:
+        response = override_dependency.get(
+            f"/api/v1/projects/{project_id}?include=client,developer,milestones,invoices",
+            headers=admin_headers,
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["client"]["company_name"] == "Include Test Co"
+    assert body["developer"]["email"] == admin_user.email
+    assert [milestone["title"] for milestone in body["milestones"]] == ["Design", "Launch"]
+    assert body["invoices"][0]["invoice_number"] == "INC-0"
+    assert body["total_expenses"] == 50.0
+    assert body["expenses"] is None
+    assert "hashed_password" not in body["developer"]
+    # Project with client and developer, then expenses, payments, milestones and invoices
+    assert len(statements) == 5
+
+
+def test_project_list_query_count_does_not_grow_with_page_size(override_dependency, admin_headers, admin_user, db_session, engine):
+    """Test that listing projects with includes costs the same queries for one project or many."""
+    _add_projects(db_session, admin_user, count=4)
+    with count_selects(engine) as statements:
+        response = override_dependency.get("/api/v1/projects/?include=milestones&limit=1", headers=admin_headers)
+    single_page = len(statements)
+    with count_selects(engine) as statements:
+        response = override_dependency.get("/api/v1/projects/?include=milestones&limit=4", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()["projects"]) == 4
+    assert all(len(project["milestones"]) == 2 for project in response.json()["projects"])
+    assert len(statements) == single_page
+
+
+def test_client_and_invoice_includes(override_dependency, admin_headers, admin_user, db_session):
+    """Test includes on client and invoice endpoints, and that unknown names are rejected."""
+    client, projects = _add_projects(db_session, admin_user, count=2)
+    client_response = override_dependency.get(
+        f"/api/v1/clients/{client.id}?include=projects,assigned_user", headers=admin_headers
+    )
+    assert client_response.status_code == 200
+    assert len(client_response.json()["projects"]) == 2
+    assert client_response.json()["assigned_user"]["id"] == admin_user.id
+    assert client_response.json()["invoices"] is None
+
+    invoices = override_dependency.get("/api/v1/invoices/?include=project,client", headers=admin_headers)
+    assert invoices.status_code == 200
+    invoice = invoices.json()["invoices"][0]
+    assert invoice["project"]["id"] in {project.id for project in projects}
+    assert invoice["client"]["id"] == client.id
+
+    rejected = override_dependency.get(f"/api/v1/projects/{projects[0].id}?include=secrets", headers=admin_headers)
+    assert rejected.status_code == 400
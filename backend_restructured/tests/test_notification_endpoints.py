@@ -0,0 +1,110 @@
+"""Tests for in-app notification listing, counters and bulk operations."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+
+from app.models.notification_model import Notification
+from app.services.notification_service import count_unread, prune_read_notifications
+
+
+def _add_notifications(db_session, user, count, is_read=False, age=timedelta(0)):
+    created_at = datetime.utcnow() - age
+    notifications = [
+        Notification(user_id=user.id, title=f"Notice {i}", message="body", is_read=is_read,
+                     created_at=created_at + timedelta(seconds=i))
+        for i in range(count)
+    ]
+    db_session.add_all(notifications)
+    db_session.commit()
+    return [notification.id for notification in notifications]
+
+
+def test_listing_is_paginated_newest_first(override_dependency, db_session, admin_user, admin_headers):
+    """Test that notifications are returned in pages, newest first."""
+    ids = _add_notifications(db_session, admin_user, 5)
+
+    response = override_dependency.get("/api/v1/notifications/in-app?limit=2", headers=admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [ids[4], ids[3]]
+
+    response = override_dependency.get("/api/v1/notifications/in-app?limit=2&skip=4", headers=admin_headers)
+    assert [item["id"] for item in response.json()] == [ids[0]]
+
+
+def test_unread_count_follows_changes(override_dependency, db_session, admin_user, admin_headers):
+    """Test that the unread count follows creates, reads and deletes."""
+    ids = _add_notifications(db_session, admin_user, 3)
+    _add_notifications(db_session, admin_user, 2, is_read=True)
+
+    def unread_count():
+        response = override_dependency.get("/api/v1/notifications/in-app/unread-count", headers=admin_headers)
+        assert response.status_code == 200
+        return response.json()["unread_count"]
+
+    assert unread_count() == 3
+    override_dependency.post(
+        "/api/v1/notifications/in-app",
+        json={"user_id": admin_user.id, "title": "New", "message": "body"},
+        headers=admin_headers
+    )
+    assert unread_count() == 4
+    override_dependency.put(f"/api/v1/notifications/in-app/{ids[0]}", json={"is_read": True}, headers=admin_headers)
+    assert unread_count() == 3
+    override_dependency.delete(f"/api/v1/notifications/in-app/{ids[1]}", headers=admin_headers)
+    assert unread_count() == 2
+    assert count_unread(db_session, admin_user.id) == 2
+
+    # Rows written outside this process, e.g. by another worker, show up at once
+    _add_notifications(db_session, admin_user, 1)
+    assert unread_count() == 3
+
+
+def test_bulk_mark_read_and_delete(override_dependency, db_session, admin_user, admin_headers):
+    """Test that bulk mark-read and delete update the rows and the unread count."""
+    ids = _add_notifications(db_session, admin_user, 6)
+
+    response = override_dependency.post(
+        "/api/v1/notifications/in-app/mark-read", json={"ids": ids[:3]}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 3, "unread_count": 3}
+
+    response = override_dependency.request(
+        "DELETE", "/api/v1/notifications/in-app/bulk", json={"ids": ids[2:4]}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 2, "unread_count": 2}
+
+    response = override_dependency.post(
+        "/api/v1/notifications/in-app/mark-read", json={"all": True}, headers=admin_headers
+    )
+    assert response.json() == {"affected": 2, "unread_count": 0}
+    assert db_session.query(Notification).filter(Notification.is_read == False).count() == 0  # noqa: E712
+
+    response = override_dependency.post("/api/v1/notifications/in-app/mark-read", json={}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+def test_prune_deletes_only_old_read_notifications(db_session, admin_user):
+    """Test that retention pruning removes old read notifications in batches and keeps the rest."""
+    _add_notifications(db_session, admin_user, 5, is_read=True, age=timedelta(days=120))
+    kept_unread = _add_notifications(db_session, admin_user, 2, age=timedelta(days=120))
+    kept_recent = _add_notifications(db_session, admin_user, 2, is_read=True)
+
+    deleted = prune_read_notifications(db_session, datetime.utcnow() - timedelta(days=90), batch_size=2)
+
+    assert deleted == 5
+    remaining = {notification.id for notification in db_session.query(Notification).all()}
+    assert remaining == set(kept_unread + kept_recent)
+
+
+def test_prune_query_uses_retention_index(db_session):
+    """Test that the pruning scan is served by the (is_read, created_at) index."""
+    query = select(Notification.id).where(
+        Notification.is_read == True,  # noqa: E712
+        Notification.created_at < datetime.utcnow()
+    ).limit(10)
+    compiled = query.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "ix_notifications_read_created" in plan
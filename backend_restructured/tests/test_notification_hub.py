@@ -0,0 +1,270 @@
+"""Tests for real-time notification delivery."""
+
+import asyncio
+
+from app.services.notification_hub import NotificationHub
+from app.services.pubsub import InProcessBackend, PostgresBackend, RedisBackend
+from app.utils.resp import FakeRedisServer
+
+
+class FakeSocket:
+    """Minimal stand-in for a WebSocket that records sent messages."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_send_to_user_targets_only_that_user():
+    """Test that a message reaches every socket of one user and no one else."""
+    async def scenario():
+        hub = NotificationHub(max_queue=10, send_timeout=1)
+        first, second, other = FakeSocket(), FakeSocket(), FakeSocket()
+        await hub.connect(1, first)
+        await hub.connect(1, second)
+        await hub.connect(2, other)
+        assert hub.send_to_user(1, {"type": "notification"}) == 2
+        assert hub.send_to_user(3, "nobody") == 0
+        await asyncio.sleep(0.01)
+        await hub.close_all()
+        return first, second, other, hub
+
+    first, second, other, hub = asyncio.run(scenario())
+    assert first.sent == second.sent == ['{"type": "notification"}']
+    assert other.sent == []
+    assert hub.connection_count == 0
+
+
+def test_slow_socket_does_not_delay_others_and_times_out():
+    """Test that fan-out is concurrent and a stuck socket is dropped after the timeout."""
+    async def scenario():
+        hub = NotificationHub(max_queue=10, send_timeout=0.05)
+        stuck, fast = FakeSocket(delay=10), FakeSocket()
+        await hub.connect(1, stuck)
+        await hub.connect(2, fast)
+        hub.broadcast("hello")
+        await asyncio.sleep(0.01)
+        fast_received = list(fast.sent)
+        await asyncio.sleep(0.1)
+        return stuck, fast_received, hub
+
+    stuck, fast_received, hub = asyncio.run(scenario())
+    assert fast_received == ["hello"]
+    assert stuck.sent == [] and stuck.closed_with == 1000
+    assert not hub.is_connected(1)
+    assert hub.is_connected(2)
+
+
+def test_queue_overflow_drops_oldest_and_coalesces():
+    """Test that a full queue drops the oldest message and coalesced messages replace each other."""
+    async def scenario():
+        hub = NotificationHub(max_queue=3, send_timeout=1)
+        socket = FakeSocket()
+        connection = hub.register(1, socket)
+        for i in range(5):
+            hub.send_to_user(1, f"message {i}")
+        for count in range(3):
+            hub.send_to_user(1, {"unread": count}, coalesce_key="unread")
+        queued = connection.queued
+        await asyncio.sleep(0.01)
+        await hub.close_all()
+        return socket, connection, queued
+
+    socket, connection, queued = asyncio.run(scenario())
+    assert queued == 3
+    assert socket.sent == ["message 3", "message 4", '{"unread": 2}']
+    assert connection.dropped == 3
+
+
+def test_creating_notification_pushes_to_user_socket(override_dependency, admin_user, admin_token, admin_headers):
+    """Test that the in-app endpoint pushes the new notification over the user's WebSocket."""
+    with override_dependency.websocket_connect(
+        f"/api/v1/notifications/ws/{admin_user.id}?token={admin_token}"
+    ) as websocket:
+        response = override_dependency.post(
+            "/api/v1/notifications/in-app",
+            json={"user_id": admin_user.id, "title": "Invoice paid", "message": "INV-1 was paid"},
+            headers=admin_headers
+        )
+        assert response.status_code == 201
+        pushed = websocket.receive_json()
+    assert pushed["type"] == "notification"
+    assert pushed["data"]["title"] == "Invoice paid"
+    assert pushed["data"]["id"] == response.json()["id"]
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for delivery"
+        await asyncio.sleep(0.005)
+
+
+def test_redis_pubsub_reaches_sockets_on_other_workers():
+    """Test that a message published on one worker is delivered by the worker holding the socket."""
+    async def scenario():
+        server = await FakeRedisServer().start()
+        worker_a = NotificationHub(max_queue=10, send_timeout=1, channel="test")
+        worker_b = NotificationHub(max_queue=10, send_timeout=1, channel="test")
+        await worker_a.start_pubsub(RedisBackend(server.url))
+        await worker_b.start_pubsub(RedisBackend(server.url))
+        socket_on_b = FakeSocket()
+        worker_b.register(7, socket_on_b)
+
+        await worker_a.publish_to_user(7, {"type": "notification", "id": 1})
+        await worker_a.publish_to_user(None, "announcement")
+        await _wait_for(lambda: len(socket_on_b.sent) == 2)
+
+        for worker in (worker_a, worker_b):
+            await worker.stop_pubsub()
+            await worker.close_all()
+        await server.stop()
+        return socket_on_b
+
+    socket_on_b = asyncio.run(scenario())
+    assert socket_on_b.sent == ['{"type": "notification", "id": 1}', "announcement"]
+
+
+def test_redis_pubsub_resubscribes_after_connection_loss():
+    """Test that the subscriber reconnects and resubscribes when the server restarts."""
+    async def scenario():
+        server = await FakeRedisServer().start()
+        hub = NotificationHub(max_queue=10, send_timeout=1, channel="test")
+        backend = RedisBackend(server.url, reconnect_delay=0.01)
+        await hub.start_pubsub(backend)
+        socket = FakeSocket()
+        hub.register(1, socket)
+
+        await server.stop()
+        await _wait_for(lambda: not backend._subscribed.is_set())
+        server = await FakeRedisServer(port=server.port).start()
+        await asyncio.wait_for(backend._subscribed.wait(), timeout=2)
+        await hub.publish_to_user(1, "after restart")
+        await _wait_for(lambda: socket.sent == ["after restart"])
+
+        await hub.stop_pubsub()
+        await hub.close_all()
+        await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_redis_publish_times_out_on_unresponsive_server():
+    """Test that a server that never replies fails the publish instead of holding the lock forever."""
+    async def scenario():
+        async def silent(reader, writer):
+            await reader.read()
+        server = await asyncio.start_server(silent, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RedisBackend(f"redis://127.0.0.1:{port}/0", publish_timeout=0.05)
+        results = await asyncio.gather(
+            backend.publish("test", "first"), backend.publish("test", "second"), return_exceptions=True
+        )
+        await backend.close()
+        server.close()
+        await server.wait_closed()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+
+
+class FakeAsyncpgConnection:
+    """The part of an asyncpg connection the Postgres backend listens with."""
+
+    def __init__(self):
+        self.channels = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.channels[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query, *args):
+        pass
+
+    def notify(self, channel, payload):
+        self.channels[channel](self, 1, channel, payload)
+
+    def terminate(self):
+        if not self.closed:
+            self.closed = True
+            for callback in self.termination_listeners:
+                callback(self)
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeAsyncpg:
+    PostgresError = type("PostgresError", (Exception,), {})
+    InterfaceError = type("InterfaceError", (Exception,), {})
+
+    def __init__(self):
+        self.connections = []
+        self.refuse = 0
+
+    async def connect(self, dsn):
+        if self.refuse:
+            self.refuse -= 1
+            raise ConnectionRefusedError("refused")
+        self.connections.append(FakeAsyncpgConnection())
+        return self.connections[-1]
+
+
+def test_postgres_pubsub_relistens_after_connection_loss(monkeypatch):
+    """Test that the Postgres listener reconnects with backoff and LISTENs on every channel again."""
+    asyncpg = FakeAsyncpg()
+    monkeypatch.setattr(PostgresBackend, "_asyncpg", staticmethod(lambda: asyncpg))
+
+    async def scenario():
+        received = []
+        backend = PostgresBackend("postgresql://localhost/crm", reconnect_delay=0.01)
+        await backend.subscribe("first", lambda channel, payload: received.append((channel, payload)))
+        await backend.subscribe("second", lambda channel, payload: received.append((channel, payload)))
+        assert set(asyncpg.connections[0].channels) == {"first", "second"}
+
+        asyncpg.refuse = 2
+        asyncpg.connections[0].terminate()
+        await _wait_for(lambda: not backend._listening.is_set())
+        await asyncio.wait_for(backend._listening.wait(), timeout=2)
+        asyncpg.connections[-1].notify("second", "after reconnect")
+        await backend.close()
+        return received
+
+    received = asyncio.run(scenario())
+    assert len(asyncpg.connections) == 2
+    assert set(asyncpg.connections[1].channels) == {"first", "second"}
+    assert received == [("second", "after reconnect")]
+
+
+def test_publish_without_backend_delivers_locally():
+    """Test that the in-process backend and the no-backend fallback both reach local sockets."""
+    async def scenario():
+        hub = NotificationHub(max_queue=10, send_timeout=1)
+        socket = FakeSocket()
+        hub.register(3, socket)
+        await hub.publish_to_user(3, "direct")
+        await hub.start_pubsub(InProcessBackend())
+        await hub.publish_to_user(3, "via backend")
+        await asyncio.sleep(0.01)
+        await hub.stop_pubsub()
+        await hub.close_all()
+        return socket
+
+    assert asyncio.run(scenario()).sent == ["direct", "via backend"]
@@ -1,18 +1,61 @@
 """Test rate limiting functionality."""
 
-import pytest
-from httpx import AsyncClient
-from slowapi.errors import RateLimitExceeded
-from main import app
-
-@pytest.mark.asyncio
-async def test_rate_limit():
-    """Test rate limiting on endpoints."""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        # Make multiple requests to trigger rate limit
-        for _ in range(5):
-            response = await ac.get("/api/v1/users/me")
-        
-        # Next request should be rate limited
-        response = await ac.get("/api/v1/users/me")
-        assert response.status_code == 429  # Too Many Requests
\ No newline at end of file
+import secrets
+
+from fastapi import FastAPI, Form
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.limiter import RateLimiter, RateLimitMiddleware
+from app.services.api_key_service import APIKeyAuthenticator
+
+
+def _login_client(engine, trust_forwarded=False):
+    """An app with the login route behind the rate limiter and the configured budgets."""
+    app = FastAPI()
+
+    @app.post("/api/v1/auth/login")
+    async def login(username: str = Form(None)):
+        return {"username": username}
+
+    authenticator = APIKeyAuthenticator(session_factory=sessionmaker(bind=engine))
+    app.add_middleware(
+        RateLimitMiddleware, limiter=RateLimiter(), authenticator=authenticator, trust_forwarded=trust_forwarded
+    )
+    return TestClient(app)
+
+
+def test_rate_limit(engine):
+    """Test that login is limited per client, even with a different made-up API key on every attempt."""
+    client = _login_client(engine)
+    statuses = [
+        client.post("/api/v1/auth/login", headers={"X-API-Key": secrets.token_urlsafe(16)}).status_code
+        for _ in range(8)
+    ]
+    assert statuses == [200] * 5 + [429] * 3
+
+
+def test_rate_limit_uses_address_added_by_load_balancer(engine):
+    """Test that behind a proxy clients are told apart by the last forwarded address, which they cannot forge."""
+    client = _login_client(engine, trust_forwarded=True)
+    for attempt in range(5):
+        # A forged first entry does not buy a new bucket
+        headers = {"X-Forwarded-For": f"10.0.0.{attempt}, 203.0.113.7"}
+        assert client.post("/api/v1/auth/login", headers=headers).status_code == 200
+    assert client.post("/api/v1/auth/login", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 429
+    assert client.post("/api/v1/auth/login", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 200
+
+
+def test_login_limit_is_per_username_behind_an_untrusted_proxy(engine):
+    """Test that logins through a proxy whose address is not trusted do not share one bucket across accounts."""
+    client = _login_client(engine)
+    proxied = {"X-Forwarded-For": "203.0.113.7"}
+    for _ in range(5):
+        response = client.post("/api/v1/auth/login", data={"username": "alice", "password": "x"}, headers=proxied)
+        assert response.status_code == 200
+        # The form consumed by the limiter still reaches the endpoint
+        assert response.json() == {"username": "alice"}
+    locked = client.post("/api/v1/auth/login", data={"username": "Alice ", "password": "x"}, headers=proxied)
+    assert locked.status_code == 429
+    other = client.post("/api/v1/auth/login", data={"username": "bob", "password": "x"}, headers=proxied)
+    assert other.status_code == 200
@@ -0,0 +1,108 @@
+"""Tests for per-user and per-API-key rate limiting."""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.auth import create_access_token
+from app.core.limiter import RateLimiter, RateLimitMiddleware, RedisRateLimitBackend
+from app.services.api_key_service import APIKeyAuthenticator, create_api_key
+from app.utils.resp import FakeRedisServer
+
+CLASSES = {"default": [0, 3], "ai": [0, 1]}
+ROUTE_CLASSES = {"/api/v1/ai": "ai"}
+
+
+def _client(limiter, authenticator=None):
+    app = FastAPI()
+
+    @app.get("/api/v1/clients")
+    async def clients():
+        return {"ok": True}
+
+    @app.get("/api/v1/ai/summary")
+    async def summary():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, authenticator=authenticator)
+    return TestClient(app)
+
+
+def test_each_user_has_own_bucket():
+    """Test that one user exhausting their budget gets 429 while another user is unaffected."""
+    client = _client(RateLimiter(classes=CLASSES, route_classes=ROUTE_CLASSES))
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice@example.com'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob@example.com'})}"}
+
+    statuses = [client.get("/api/v1/clients", headers=alice).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    assert client.get("/api/v1/clients", headers=bob).status_code == 200
+
+    response = client.get("/api/v1/clients", headers=alice)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Rate limit exceeded"}
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_api_keys_and_route_classes_are_limited_separately(engine, db_session, admin_user):
+    """Test that API keys are keyed on their own and route classes have separate budgets."""
+    authenticator = APIKeyAuthenticator(session_factory=sessionmaker(bind=engine))
+    client = _client(RateLimiter(classes=CLASSES, route_classes=ROUTE_CLASSES), authenticator)
+    key_a = {"X-API-Key": create_api_key(db_session, admin_user.id)[1]}
+    key_b = {"X-API-Key": create_api_key(db_session, admin_user.id)[1]}
+
+    assert client.get("/api/v1/ai/summary", headers=key_a).status_code == 200
+    assert client.get("/api/v1/ai/summary", headers=key_a).status_code == 429
+    assert client.get("/api/v1/ai/summary", headers=key_b).status_code == 200
+    # The default class still has budget left for key A
+    assert client.get("/api/v1/clients", headers=key_a).status_code == 200
+
+
+def test_unknown_api_keys_do_not_get_their_own_bucket(engine):
+    """Test that requests with made-up API keys are limited by client address."""
+    authenticator = APIKeyAuthenticator(session_factory=sessionmaker(bind=engine))
+    client = _client(RateLimiter(classes=CLASSES, route_classes=ROUTE_CLASSES), authenticator)
+    statuses = [
+        client.get("/api/v1/clients", headers={"X-API-Key": f"made-up-{i}"}).status_code for i in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_tokens_refill_over_time():
+    """Test that a drained bucket refills at its rate."""
+    limiter = RateLimiter(classes={"default": [1000, 1]}, route_classes={})
+    assert limiter.check("default", "user:a") == 0
+    retry_after = limiter.check("default", "user:a")
+    assert 0 < retry_after <= 0.001
+    limiter._buckets["default:user:a"].updated -= 0.01
+    assert limiter.check("default", "user:a") == 0
+
+
+def test_workers_share_consumption_through_redis():
+    """Test that consumption on one worker is deducted from another worker's bucket after a sync."""
+    async def scenario():
+        server = await FakeRedisServer().start()
+        worker_a = RateLimiter(classes={"default": [0, 10]}, route_classes={}, backend=RedisRateLimitBackend(server.url))
+        worker_b = RateLimiter(classes={"default": [0, 10]}, route_classes={}, backend=RedisRateLimitBackend(server.url))
+
+        # Both workers see the key before the other one consumes from it
+        for worker in (worker_a, worker_b):
+            assert worker.check("default", "user:a") == 0
+            await worker.sync()
+        for _ in range(6):
+            assert worker_a.check("default", "user:a") == 0
+        await worker_a.sync()
+        await worker_b.sync()
+
+        allowed = 0
+        while worker_b.check("default", "user:a") == 0:
+            allowed += 1
+        for worker in (worker_a, worker_b):
+            await worker.stop()
+        await server.stop()
+        return allowed
+
+    # Worker B took 1 of its 10 tokens and learns of the 6 worker A took since B first synced
+    assert asyncio.run(scenario()) == 3
@@ -0,0 +1,50 @@
+"""Tests for role-based permission resolution."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.rbac import (
+    get_role_permissions,
+    has_permissions,
+    permission_mask,
+    require_permissions,
+)
+from app.core.security import check_user_permissions
+from app.models.user_model import User
+
+
+def test_roles_inherit_parent_permissions():
+    """Test that the precompiled map includes inherited permissions and merges the legacy verbs."""
+    admin = get_role_permissions("admin")
+    assert {"system:config", "projects:delete", "clients:read", "dashboard:read"} <= admin
+    assert "projects:create" not in get_role_permissions("user")
+    assert get_role_permissions("unknown") == frozenset()
+
+    assert check_user_permissions("admin", "manage_users")
+    assert check_user_permissions("manager", "delete")
+    assert not check_user_permissions("user", "delete")
+    assert check_user_permissions("viewer", "read")
+    assert not check_user_permissions("viewer", "create")
+
+
+def test_permission_masks():
+    """Test bitmask checks for single and combined permissions."""
+    create_and_read = permission_mask(["projects:create", "projects:read"])
+    assert has_permissions("manager", create_and_read)
+    assert not has_permissions("user", create_and_read)
+    assert has_permissions("user", permission_mask("projects:read"))
+    assert not has_permissions(None, permission_mask("read"))
+    with pytest.raises(ValueError):
+        permission_mask("projects:crate")
+
+
+def test_require_permissions_dependency():
+    """Test that the dependency accepts a string or list, is reused, and rejects missing permissions."""
+    dependency = require_permissions(["projects:create"])
+    assert dependency is require_permissions("projects:create")
+
+    manager = User(email="m@example.com", role="manager")
+    assert dependency(current_user=manager) is manager
+    with pytest.raises(HTTPException) as exc_info:
+        dependency(current_user=User(email="v@example.com", role="viewer"))
+    assert exc_info.value.status_code == 403
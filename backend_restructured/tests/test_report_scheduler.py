@@ -0,0 +1,146 @@
+"""Tests for the scheduled report engine."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.email_outbox_model import EmailOutbox
+from app.models.scheduled_report_model import ScheduledReport
+from app.services.email_service import EmailOutboxWorker
+from app.services.email_transport import InMemoryTransport
+from app.services import report_scheduler
+from app.services.report_scheduler import ReportScheduler, add_interval, catch_up
+
+
+def _make_scheduler(engine):
+    session_factory = sessionmaker(bind=engine)
+    outbox = EmailOutboxWorker(session_factory=session_factory, transport=InMemoryTransport(max_batch_size=2), rate_limit=0)
+    return ReportScheduler(
+        session_factory=session_factory,
+        outbox=outbox,
+        render_executor=ThreadPoolExecutor(max_workers=1),
+        poll_interval=0.01,
+        batch_size=50,
+    )
+
+
+def _add_report(db_session, user, report_type="financial", interval="weekly", next_run_at=None, recipients="a@example.com"):
+    report = ScheduledReport(
+        user_id=user.id,
+        report_name=f"{report_type} {interval}",
+        report_type=report_type,
+        schedule_interval=interval,
+        next_run_at=next_run_at or datetime(2024, 1, 8, 9, 0),
+        recipients=recipients,
+    )
+    db_session.add(report)
+    db_session.commit()
+    return report.id
+
+
+def test_interval_arithmetic_and_catch_up():
+    """Test schedule advancement, month clamping and catch-up after downtime."""
+    assert add_interval(datetime(2024, 1, 31), "monthly") == datetime(2024, 2, 29)
+    assert add_interval(datetime(2024, 3, 15), "monthly", -3) == datetime(2023, 12, 15)
+    # A clamped slot returns to the anchor day in longer months
+    assert add_interval(datetime(2024, 2, 29), "monthly", day=31) == datetime(2024, 3, 31)
+
+    slot, following, skipped = catch_up(datetime(2024, 1, 1, 9), "daily", datetime(2024, 1, 5, 12))
+    assert slot == datetime(2024, 1, 5, 9)
+    assert following == datetime(2024, 1, 6, 9)
+    assert skipped == 4
+
+
+def test_due_reports_are_coalesced_and_fanned_out(engine, db_session, admin_user):
+    """Test that identical reports are built once and mailed to all recipients in batches."""
+    now = datetime(2024, 1, 10, 12, 0)
+    first = _add_report(db_session, admin_user, recipients="a@example.com, b@example.com")
+    second = _add_report(db_session, admin_user, recipients=f"c@example.com,{admin_user.id}")
+    other = _add_report(db_session, admin_user, report_type="client", recipients="a@example.com")
+    future = _add_report(db_session, admin_user, next_run_at=now + timedelta(days=1))
+    scheduler = _make_scheduler(engine)
+
+    assert asyncio.run(scheduler.run_once(now)) == 3
+    assert scheduler.reports_rendered == 2
+    assert scheduler.reports_run == 3
+
+    assert db_session.query(EmailOutbox).count() == 5
+    outbox = scheduler.outbox
+    while asyncio.run(outbox.run_once()):
+        pass
+    financial_calls = [call for call in outbox.transport.sent if call["subject"].startswith("Financial")]
+    assert sorted(email for call in financial_calls for email in call["recipients"]) == [
+        "a@example.com", "admin@example.com", "b@example.com", "c@example.com"
+    ]
+    assert [len(call["recipients"]) for call in financial_calls] == [2, 2]
+    filename, content, mime_type = financial_calls[0]["attachments"][0]
+    assert content.startswith(b"%PDF") and mime_type == "application/pdf"
+    assert filename == "financial_report_20240108.pdf"
+
+    db_session.expire_all()
+    for report_id in (first, second, other):
+        report = db_session.get(ScheduledReport, report_id)
+        assert report.next_run_at == datetime(2024, 1, 15, 9, 0)
+        assert report.last_run_at == now
+    assert db_session.get(ScheduledReport, future).last_run_at is None
+
+    # Nothing is due any more, so a second tick sends nothing
+    assert asyncio.run(scheduler.run_once(now)) == 0
+    scheduler.render_executor.shutdown()
+
+
+def test_invalid_interval_deactivates_report(engine, db_session, admin_user):
+    """Test that a report with an unknown interval is disabled instead of retried forever."""
+    report_id = _add_report(db_session, admin_user, interval="hourly")
+    scheduler = _make_scheduler(engine)
+
+    assert asyncio.run(scheduler.run_once(datetime(2024, 1, 10))) == 0
+
+    db_session.expire_all()
+    assert db_session.get(ScheduledReport, report_id).is_active is False
+
+
+def test_monthly_schedule_keeps_its_anchor_day(engine, db_session, admin_user):
+    """Test that a report due on the 31st returns to month end after a short month."""
+    report_id = _add_report(db_session, admin_user, report_type="client", interval="monthly",
+                            next_run_at=datetime(2024, 1, 31, 9, 0))
+    scheduler = _make_scheduler(engine)
+
+    for now, expected in [
+        (datetime(2024, 1, 31, 12), datetime(2024, 2, 29, 9)),
+        (datetime(2024, 2, 29, 12), datetime(2024, 3, 31, 9)),
+        (datetime(2024, 3, 31, 12), datetime(2024, 4, 30, 9)),
+    ]:
+        assert asyncio.run(scheduler.run_once(now)) == 1
+        db_session.expire_all()
+        assert db_session.get(ScheduledReport, report_id).next_run_at == expected
+    scheduler.render_executor.shutdown()
+
+
+def test_failed_run_is_retried_then_skipped(engine, db_session, admin_user, monkeypatch):
+    """Test that a failed run keeps its period due until the attempt cap is reached."""
+    report_id = _add_report(db_session, admin_user, report_type="broken", next_run_at=datetime(2024, 1, 8, 9, 0))
+    scheduler = _make_scheduler(engine)
+    scheduler.max_attempts = 2
+    now = datetime(2024, 1, 10, 12, 0)
+
+    def fail(db, period_start, period_end):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setitem(report_scheduler.REPORT_BUILDERS, "broken", fail)
+    assert asyncio.run(scheduler.run_once(now)) == 1
+    db_session.expire_all()
+    report = db_session.get(ScheduledReport, report_id)
+    assert report.next_run_at == datetime(2024, 1, 8, 9, 0)
+    assert report.last_run_at is None and report.failed_runs == 1
+
+    # The second failure reaches the cap, so the period is given up
+    assert asyncio.run(scheduler.run_once(now)) == 1
+    db_session.expire_all()
+    report = db_session.get(ScheduledReport, report_id)
+    assert report.next_run_at == datetime(2024, 1, 15, 9, 0)
+    assert report.failed_runs == 0
+    assert scheduler.reports_failed == 2
+    scheduler.render_executor.shutdown()
@@ -0,0 +1,82 @@
+"""Tests for duplicate route collapsing and indexed dispatch."""
+
+import copy
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.routing import Router
+
+from app.api import api_router
+from app.api.routing import RouteIndex, collapse_duplicate_routes, install_route_index
+
+
+def _linear_match(routes, scope):
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match.name == "FULL":
+            return route
+        if match.name == "PARTIAL" and partial is None:
+            partial = route
+    return partial
+
+
+def test_duplicates_collapse_to_first_registration():
+    """Test that only the first of several identical registrations is kept and dispatched to."""
+    app = FastAPI()
+
+    @app.get("/items/stats")
+    async def first():
+        return "first"
+
+    @app.get("/items/stats")
+    async def second():
+        return "second"
+
+    @app.delete("/items/stats")
+    async def delete():
+        return "deleted"
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return item_id
+
+    install_route_index(app.router)
+    paths = [(route.path, tuple(sorted(route.methods))) for route in app.routes if route.path.startswith("/items")]
+    assert paths == [("/items/stats", ("GET",)), ("/items/stats", ("DELETE",)), ("/items/{item_id}", ("GET",))]
+
+    client = TestClient(app)
+    assert client.get("/items/stats").json() == "first"
+    assert client.delete("/items/stats").json() == "deleted"
+    assert client.get("/items/7").json() == 7
+    assert client.put("/items/7").status_code == 405
+    assert client.get("/items/7/", follow_redirects=False).status_code == 307
+    assert client.get("/missing").status_code == 404
+
+    # Routes added after the index was installed are picked up
+    @app.get("/later")
+    async def later():
+        return "later"
+
+    assert client.get("/later").json() == "later"
+
+
+def test_index_matches_linear_scan_for_api_router():
+    """Test that the index resolves every API route, a 405 and a 404 exactly like the linear scan."""
+    registered = list(api_router.routes)
+    router = Router(routes=copy.copy(registered))
+    removed = collapse_duplicate_routes(router)
+    assert removed and len(router.routes) + len(removed) == len(registered)
+    index = RouteIndex(router.routes)
+
+    scopes = []
+    for route in router.routes:
+        path = route.path.replace("{", "").replace("}", "")
+        if not hasattr(route, "methods"):
+            scopes.append({"type": "websocket", "path": path, "root_path": ""})
+            continue
+        for method in sorted(route.methods) + ["PATCH"]:
+            scopes.append({"type": "http", "method": method, "path": path, "root_path": ""})
+        scopes.append({"type": "http", "method": "GET", "path": path + "/extra", "root_path": ""})
+    for scope in scopes:
+        assert index.match(dict(scope))[0] is _linear_match(registered, dict(scope)), scope
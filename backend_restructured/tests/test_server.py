@@ -0,0 +1,125 @@
+"""Tests for the preforking production server."""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from app.core.server import available_cpus, cpu_quota, worker_count
+
+SERVER_SCRIPT = """
+import asyncio, os, sys
+from fastapi import FastAPI
+from app.core.server import PreforkServer
+
+app = FastAPI()
+
+@app.get("/slow")
+async def slow():
+    await asyncio.sleep(1)
+    return {"pid": os.getpid()}
+
+server = PreforkServer(app, host="127.0.0.1", port=int(sys.argv[1]), workers=2, graceful_timeout=5)
+sys.exit(server.run())
+"""
+
+
+FAILING_SERVER_SCRIPT = """
+import sys
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.core.server import PreforkServer
+
+@asynccontextmanager
+async def lifespan(app):
+    with open(sys.argv[2], "a") as attempts:
+        attempts.write("boot\\n")
+    raise RuntimeError("database unreachable")
+    yield
+
+server = PreforkServer(
+    FastAPI(lifespan=lifespan), host="127.0.0.1", port=int(sys.argv[1]), workers=1,
+    restart_backoff=0.2, restart_backoff_max=1, max_boot_failures=3,
+)
+sys.exit(server.run())
+"""
+
+
+def test_cpu_quota_from_cgroups(tmp_path):
+    """Test that cgroup v2 and v1 CPU limits are read and an unlimited quota is ignored."""
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cpu_quota(tmp_path) is None
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cpu_quota(tmp_path) == 1.5
+    assert available_cpus(tmp_path) == min(len(os.sched_getaffinity(0)), 2)
+
+    (tmp_path / "cpu.max").unlink()
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cpu_quota(tmp_path) is None
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+    assert cpu_quota(tmp_path) == 0.5
+    assert available_cpus(tmp_path) == 1
+
+    assert worker_count(3) == 3
+
+
+def test_sigterm_drains_in_flight_requests():
+    """Test that workers finish a running request after SIGTERM and the master exits cleanly."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, str(port)],
+        cwd=backend_dir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/slow"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(url, timeout=5).read()
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.2)
+
+        responses = []
+        request = threading.Thread(target=lambda: responses.append(urllib.request.urlopen(url, timeout=10).read()))
+        request.start()
+        time.sleep(0.3)
+        process.send_signal(signal.SIGTERM)
+        request.join()
+        assert process.wait(timeout=15) == 0
+        assert "pid" in json.loads(responses[0])
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def test_master_backs_off_and_exits_when_workers_fail_to_start(tmp_path):
+    """Test that a worker failing its startup is restarted with backoff and the master then gives up."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    attempts = tmp_path / "attempts"
+    started = time.monotonic()
+    process = subprocess.run(
+        [sys.executable, "-c", FAILING_SERVER_SCRIPT, "0", str(attempts)],
+        cwd=backend_dir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=30,
+    )
+    assert process.returncode == 1
+    assert attempts.read_text().count("boot") == 3
+    # Restarts waited 0s, then 0.2s, instead of fork-looping
+    assert time.monotonic() - started >= 0.2
@@ -0,0 +1,111 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.endpoints import dashboard_endpoints
+from app.core.singleflight import single_flight
+
+
+def _app(release: asyncio.Event, calls: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stats")
+    @single_flight("test.stats")
+    async def stats(period: str = "month"):
+        calls.append(period)
+        computed = len(calls)
+        await release.wait()
+        return {"period": period, "computed": computed}
+
+    app.state.group = stats.single_flight
+    return app
+
+
+def test_identical_concurrent_requests_share_one_computation():
+    """Test that concurrent requests with the same parameters run the endpoint once."""
+    async def scenario():
+        release = asyncio.Event()
+        calls = []
+        app = _app(release, calls)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            requests = [asyncio.create_task(client.get("/stats")) for _ in range(5)]
+            requests.append(asyncio.create_task(client.get("/stats", params={"period": "week"})))
+            await asyncio.sleep(0.05)
+            release.set()
+            responses = await asyncio.gather(*requests)
+            # Once finished, the next request computes afresh
+            later = await client.get("/stats")
+        return app.state.group.stats(), calls, responses, later
+
+    stats, calls, responses, later = asyncio.run(scenario())
+    assert sorted(calls) == ["month", "month", "week"]
+    assert all(response.status_code == 200 for response in responses)
+    assert {response.json()["computed"] for response in responses[:5]} == {1}
+    assert responses[5].json()["period"] == "week"
+    assert later.json()["computed"] == 3
+    assert stats["coalesced"] == 4
+    assert stats["executions"] == 3
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    """Test that a failing computation fails every coalesced caller, and the next call retries."""
+    attempts = []
+
+    @single_flight("test.failing")
+    async def compute():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return "ok"
+
+    async def scenario():
+        first = await asyncio.gather(compute(), compute(), return_exceptions=True)
+        return first, await compute()
+
+    first, second = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert second == "ok"
+    assert len(attempts) == 2
+
+
+def test_shared_call_outlives_a_cancelled_leader_on_its_own_session(engine, monkeypatch):
+    """Test that cancelling the first caller neither cancels the shared call nor leaves it on that caller's session."""
+    release = threading.Event()
+    sessions = []
+
+    def compute(db):
+        sessions.append(db)
+        release.wait(5)
+        return {"value": db.execute(text("SELECT 1")).scalar()}
+
+    monkeypatch.setattr(dashboard_endpoints, "_compute_dashboard_stats", compute)
+    leader_session = sessionmaker(bind=engine)()
+    follower_session = sessionmaker(bind=engine)()
+
+    async def scenario():
+        leader = asyncio.create_task(dashboard_endpoints.get_dashboard_stats(db=leader_session))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(dashboard_endpoints.get_dashboard_stats(db=follower_session))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        # FastAPI closes the leader's dependencies once the leader has gone
+        leader_session.close()
+        await asyncio.sleep(0.05)
+        release.set()
+        return leader, await follower
+
+    leader, result = asyncio.run(scenario())
+    follower_session.close()
+    assert leader.cancelled()
+    assert result == {"value": 1}
+    assert len(sessions) == 1
+    assert sessions[0] is not leader_session
+    assert sessions[0].get_bind() is engine
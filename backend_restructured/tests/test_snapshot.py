@@ -0,0 +1,74 @@
+"""Tests for data snapshot export and import."""
+
+import gzip
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.core.database import Base
+from app.models.client_model import Client
+from app.models.notification_model import Notification
+from app.models.user_preference_model import UserPreference
+from app.services.snapshot_service import SnapshotError, export_snapshot, import_snapshot
+
+
+@pytest.fixture
+def target_engine(tmp_path):
+    """An empty database with the application schema."""
+    target = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(bind=target)
+    yield target
+    target.dispose()
+
+
+def _counts(engine):
+    with engine.connect() as connection:
+        return {
+            table.name: connection.scalar(select(func.count()).select_from(table))
+            for table in Base.metadata.sorted_tables
+        }
+
+
+def test_export_and_import_round_trip(engine, db_session, admin_user, target_engine, tmp_path):
+    """Test that a snapshot reproduces every table, including dates and JSON, in another database."""
+    client = Client(company_name="Initech", contact_person_name="Bill", email="bill@initech.example",
+                    assigned_user_id=admin_user.id)
+    db_session.add(client)
+    db_session.add(UserPreference(user_id=admin_user.id, custom_settings={"theme": "dark", "widgets": [1, 2]}))
+    db_session.add_all(
+        Notification(user_id=admin_user.id, title=f"Note {i}", message="Hello") for i in range(5)
+    )
+    db_session.commit()
+    archive = tmp_path / "snapshot.ndjson.gz"
+
+    exported = export_snapshot(engine, archive, chunk_rows=2)
+    imported = import_snapshot(target_engine, archive, batch_size=3)
+
+    assert imported == exported
+    assert _counts(target_engine) == _counts(engine)
+    with target_engine.connect() as connection:
+        copied = connection.execute(select(Client.__table__).where(Client.__table__.c.id == client.id)).one()
+        preference = connection.execute(select(UserPreference.__table__)).first()
+    assert copied.company_name == "Initech"
+    assert copied.created_at is not None
+    assert preference.custom_settings == {"theme": "dark", "widgets": [1, 2]}
+    with gzip.open(archive, "rt") as lines:
+        assert sum('"rows"' in line for line in lines) >= 3  # five notifications in chunks of two
+
+
+def test_import_refuses_non_empty_target_and_truncated_archive(engine, admin_user, target_engine, tmp_path):
+    """Test that import requires replace for existing data and rejects a truncated archive."""
+    archive = tmp_path / "snapshot.ndjson.gz"
+    export_snapshot(engine, archive)
+    import_snapshot(target_engine, archive)
+
+    with pytest.raises(SnapshotError, match="not empty"):
+        import_snapshot(target_engine, archive)
+    assert import_snapshot(target_engine, archive, replace=True)["users"] == _counts(engine)["users"]
+
+    truncated = tmp_path / "truncated.ndjson.gz"
+    with gzip.open(archive, "rt") as source, gzip.open(truncated, "wt") as output:
+        lines = source.readlines()
+        output.writelines(line for line in lines if '"end"' not in line or '"users"' not in line)
+    with pytest.raises(SnapshotError, match="truncated"):
+        import_snapshot(target_engine, truncated, replace=True)
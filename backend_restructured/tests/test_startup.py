@@ -0,0 +1,35 @@
+"""Tests for application startup cost."""
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+
+from app.core.database import ALEMBIC_VERSIONS_DIR, database_at_head, get_migration_heads
+from benchmarks.startup_time import DEFAULT_BUDGET_MS, eager_lazy_modules, measure
+
+
+def test_import_stays_within_budget_without_heavy_integrations():
+    """Test that importing the app does not load lazy integrations and fits the startup budget."""
+    runs = [measure("main") for _ in range(2)]
+    fastest = min(runs, key=lambda modules: modules["main"][1])
+    assert eager_lazy_modules(fastest) == []
+    assert fastest["main"][1] / 1000 < DEFAULT_BUDGET_MS
+
+
+def test_migration_heads_match_alembic():
+    """Test that the text scan of the migration scripts finds the same heads as Alembic."""
+    script = ScriptDirectory(str(ALEMBIC_VERSIONS_DIR.parent))
+    assert get_migration_heads() == set(script.get_heads())
+
+
+def test_database_at_head_reads_alembic_version(tmp_path):
+    """Test that only a database stamped with the current head counts as migrated."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    assert not database_at_head(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES ('add_is_admin_field')"))
+    assert not database_at_head(engine)
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": get_migration_heads().pop()})
+    assert database_at_head(engine)
+    engine.dispose()
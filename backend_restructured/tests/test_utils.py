@@ -2,6 +2,7 @@
 
 import pytest
 from datetime import datetime, timedelta
+import asyncio
 import json
 from pathlib import Path
 import os
@@ -11,6 +12,7 @@ from app.utils.date_utils import format_date, calculate_date_difference, is_date
 from app.utils.file_utils import ensure_directory_exists, generate_unique_filename
 from app.utils.validation import validate_email, validate_phone_number
 from app.utils.security import hash_password, verify_password
+from app.utils.bulk_ingest import iter_csv_records, iter_ndjson_records
 
 # Pagination tests
 def test_paginate_results():
@@ -224,4 +226,37 @@ def test_password_hashing():
     hashed2 = hash_password(password2)
     assert hashed2 != hashed
     assert verify_password(password2, hashed2) is True
-    assert verify_password(password, hashed2) is False
\ No newline at end of file
+    assert verify_password(password, hashed2) is False
+# Bulk ingest tests
+def _collect(iterator_factory, chunks):
+    """Run a bulk ingest record iterator over the given byte chunks."""
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [item async for item in iterator_factory(stream())]
+
+    return asyncio.run(collect())
+
+def test_ndjson_keeps_unicode_line_separators_inside_records():
+    """Test that U+2028 and other splitlines() boundaries do not split a record."""
+    records = [{"title": "Line\u2028separator"}, {"title": "Form\x0cfeed\x85next"}]
+    body = "\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode()
+    results = _collect(iter_ndjson_records, [body])
+    assert [(line, record, error) for line, record, error in results] == [
+        (1, records[0], None),
+        (2, records[1], None),
+    ]
+
+def test_crlf_split_across_chunks_counts_as_one_line_break():
+    """Test that a CR ending one chunk and LF starting the next keep line numbers intact."""
+    chunks = [b'{"title": "One"}\r', b'\n{"title": "Two"}\r', b'\n{bad\r\n']
+    results = _collect(iter_ndjson_records, chunks)
+    assert [line for line, _, _ in results] == [1, 2, 3]
+    assert results[2][2].startswith("Invalid JSON")
+
+    csv_chunks = [b"title,amount\r", b"\nLaptop,1500\r", b"\nAds,1,extra\r\n"]
+    results = _collect(iter_csv_records, csv_chunks)
+    assert results[0] == (2, {"title": "Laptop", "amount": "1500"}, None)
+    assert results[1][0] == 3